@@ -0,0 +1,2 @@
+
+# Benchmark suite for the backend API, see "Benchmarks" in README.md
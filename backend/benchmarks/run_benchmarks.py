@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the backend API.
+
+Seeds a synthetic catalogue and mapping files, then measures throughput, p50/p95/p99 latency
+and memory for the mapping, metadata and save endpoints. Results are written as JSON so runs
+can be compared, and --baseline fails the run when a scenario regressed.
+
+By default the FastAPI app is driven in-process through its test client, against whatever
+DATABASE_BACKEND is configured. --sqlite runs it against a fresh embedded database, which
+needs no Azure SQL instance. --base-url drives a running server instead.
+
+Usage (from the backend directory):
+    python -m benchmarks.run_benchmarks --sqlite /tmp/bench.db --scale medium --output run.json
+    python -m benchmarks.run_benchmarks --base-url http://localhost:3001 --server-pid 4242 --skip-seed
+    python -m benchmarks.run_benchmarks --sqlite /tmp/bench.db --baseline run.json --max-regression 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
+
+from benchmarks.synthetic_data import (
+    SCALES, Scale, catalogue_csv, mapping_file, mapping_template_csv, malcode_name, table_name, column_name
+)
+
+PERCENTILES = (50, 95, 99)
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+def _rss_kb(pid: Optional[int] = None) -> Optional[int]:
+    """Current resident set size of a process (this one by default), if it can be read"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if pid is None:
+        import resource
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    return None
+
+class BenchmarkRunner:
+    def __init__(self, client, concurrency: int = 1, trace_memory: bool = False, server_pid: Optional[int] = None):
+        self.client = client
+        self.concurrency = concurrency
+        self.trace_memory = trace_memory
+        self.server_pid = server_pid
+        self.results = {}
+    
+    def run(self, name: str, request: Callable[[int], Any], iterations: int, warmup: int = 0,
+            items_per_request: Optional[int] = None):
+        """Time `iterations` calls of request(i) and record the scenario's statistics"""
+        for i in range(warmup):
+            request(i)
+        
+        memory_pid = self.server_pid
+        rss_before = _rss_kb(memory_pid)
+        if self.trace_memory:
+            tracemalloc.start()
+        
+        def timed(i: int) -> Tuple[float, bool]:
+            started = time.perf_counter()
+            response = request(i)
+            return (time.perf_counter() - started) * 1000, response.status_code < 400
+        
+        started = time.perf_counter()
+        if self.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                samples = list(pool.map(timed, range(iterations)))
+        else:
+            samples = [timed(i) for i in range(iterations)]
+        elapsed = time.perf_counter() - started
+        
+        memory = {'rss_before_kb': rss_before, 'rss_after_kb': _rss_kb(memory_pid),
+                  'measured_process': 'server' if memory_pid else 'benchmark'}
+        if self.trace_memory:
+            memory['tracemalloc_peak_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        
+        latencies = sorted(duration for duration, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        result = {
+            'requests': iterations,
+            'errors': errors,
+            'concurrency': self.concurrency,
+            'duration_s': round(elapsed, 3),
+            'throughput_rps': round((iterations - errors) / elapsed, 2) if elapsed > 0 else None,
+            'latency_ms': {
+                'min': round(latencies[0], 2),
+                'mean': round(sum(latencies) / len(latencies), 2),
+                **{f'p{p}': round(percentile(latencies, p), 2) for p in PERCENTILES},
+                'max': round(latencies[-1], 2)
+            },
+            'memory': memory
+        }
+        if items_per_request:
+            result['items_per_second'] = round(items_per_request * (iterations - errors) / elapsed, 1)
+        
+        self.results[name] = result
+        print(f"  {name:28} {result['throughput_rps']:>9} req/s  "
+              f"p50 {result['latency_ms']['p50']:>9} ms  p95 {result['latency_ms']['p95']:>9} ms  "
+              f"p99 {result['latency_ms']['p99']:>9} ms  errors {errors}")
+        return result
+
+def _check(response, action: str):
+    if response.status_code >= 400:
+        raise RuntimeError(f"{action} failed with HTTP {response.status_code}: {response.text[:200]}")
+    return response
+
+def seed(runner: BenchmarkRunner, scale: Scale, seed_value: int):
+    """Load the synthetic catalogue and mapping files, timing both as scenarios"""
+    client = runner.client
+    csv_bytes = catalogue_csv(scale, seed_value)
+    print(f"Seeding {scale.catalogue_columns} catalogue columns and {scale.mapping_files} mapping files "
+          f"of {scale.rows_per_file} rows")
+    
+    runner.run('metadata_import', lambda i: _check(client.post(
+        '/api/metadata/import',
+        files={'file': ('catalogue.csv', csv_bytes, 'text/csv')},
+        data={'created_by': 'benchmark'}
+    ), 'Metadata import'), iterations=1, items_per_request=scale.catalogue_columns)
+    
+    files = [mapping_file(scale, index, seed_value) for index in range(scale.mapping_files)]
+    runner.run('save_mapping_file_new', lambda i: _check(client.post('/api/mapping-files', json=files[i]),
+                                                         'Saving mapping file'),
+               iterations=len(files), items_per_request=scale.rows_per_file)
+
+def run_scenarios(runner: BenchmarkRunner, scale: Scale, iterations: int, warmup: int, seed_value: int):
+    client = runner.client
+    rng = random.Random(seed_value)
+    
+    malcodes = _check(client.get('/api/metadata/malcodes'), 'Listing malcodes').json()['malcodes']
+    if not malcodes:
+        raise RuntimeError("No malcodes found; run without --skip-seed to load the synthetic catalogue")
+    malcode_ids = [m['id'] for m in malcodes]
+    tables = _check(client.get('/api/metadata/tables', params={'malcode_id': malcode_ids[0]}),
+                    'Listing tables').json()['tables']
+    table_ids = [t['id'] for t in tables]
+    picks = [rng.randrange(1 << 30) for _ in range(iterations + warmup)]
+    
+    print(f"Running scenarios ({iterations} iterations, {warmup} warmup, concurrency {runner.concurrency})")
+    runner.run('list_mapping_files', lambda i: client.get(
+        '/api/mapping-files', headers={'Accept-Encoding': 'identity'}
+    ), iterations, warmup)
+    runner.run('list_mapping_files_gzip', lambda i: client.get(
+        '/api/mapping-files', headers={'Accept-Encoding': 'gzip'}
+    ), iterations, warmup)
+    runner.run('list_mapping_files_columnar', lambda i: client.get('/api/mapping-files', headers={
+        'Accept': 'application/vnd.data-mapping.columnar+json', 'Accept-Encoding': 'gzip'
+    }), iterations, warmup)
+    # Revalidating an unchanged listing only compares file versions; no rows are loaded or serialized
+    listing_etag = _check(client.get('/api/mapping-files'), 'Listing mapping files').headers.get('ETag')
+    runner.run('list_mapping_files_304', lambda i: client.get(
+        '/api/mapping-files', headers={'If-None-Match': listing_etag}
+    ), iterations, warmup)
+    runner.run('list_malcodes', lambda i: client.get('/api/metadata/malcodes'), iterations, warmup)
+    runner.run('get_malcode', lambda i: client.get(
+        f'/api/metadata/malcodes/{malcode_name(picks[i] % scale.malcodes)}'), iterations, warmup)
+    runner.run('list_tables', lambda i: client.get(
+        '/api/metadata/tables', params={'malcode_id': malcode_ids[picks[i] % len(malcode_ids)]}), iterations, warmup)
+    if table_ids:
+        runner.run('list_columns', lambda i: client.get(
+            '/api/metadata/columns', params={'table_id': table_ids[picks[i] % len(table_ids)]}), iterations, warmup)
+    runner.run('search_metadata', lambda i: client.get(
+        '/api/metadata/search', params={'term': column_name(picks[i] % scale.columns_per_table)}), iterations, warmup)
+    
+    # Re-saving existing files exercises the delete + insert + catalogue upsert path
+    files = [mapping_file(scale, index, seed_value) for index in range(min(scale.mapping_files, 20))]
+    runner.run('save_mapping_file_existing', lambda i: client.post('/api/mapping-files', json=files[i % len(files)]),
+               iterations, warmup, items_per_request=scale.rows_per_file)
+    
+    uploads = [mapping_template_csv(scale, index, seed_value) for index in range(min(scale.mapping_files, 20))]
+    runner.run('upload_mapping_file_csv', lambda i: client.post(
+        '/api/mapping-files/upload',
+        files={'file': (f'upload_{i % len(uploads)}.csv', uploads[i % len(uploads)], 'text/csv')},
+        data={'created_by': 'benchmark'}
+    ), iterations, warmup, items_per_request=scale.rows_per_file)
+    
+    names = [file['name'] for file in files]
+    runner.run('export_mapping_file_csv_gzip', lambda i: client.get(
+        f'/api/mapping-files/{names[i % len(names)]}/export', headers={'Accept-Encoding': 'gzip'}
+    ), iterations, warmup, items_per_request=scale.rows_per_file)
+    # The first lineage call builds the graph; later ones only traverse it
+    lineage_columns = [row['sourceColumn'] for file in files for row in file['rows'][:5]]
+    runner.run('lineage_downstream', lambda i: client.get('/api/lineage/downstream', params={
+        'malcode': lineage_columns[picks[i] % len(lineage_columns)]['malcode'],
+        'table': lineage_columns[picks[i] % len(lineage_columns)]['table'],
+        'column': lineage_columns[picks[i] % len(lineage_columns)]['column']
+    }), iterations, warmup)
+    
+    # Every catalogue column reported changed at once; the first page of grouped results
+    changed_columns = [{'malcode': malcode_name(m), 'table': table_name(m, t), 'column': column_name(c)}
+                       for m in range(scale.malcodes) for t in range(scale.tables_per_malcode)
+                       for c in range(scale.columns_per_table)][:10000]
+    runner.run('impact_analysis_batch', lambda i: client.post(
+        '/api/lineage/impact', json={'columns': changed_columns, 'pageSize': 100}
+    ), iterations, warmup, items_per_request=len(changed_columns))
+    
+    # Repeat exports of unchanged files are served from the ETag-keyed workbook cache
+    runner.run('export_mapping_file_xlsx', lambda i: client.get(
+        f'/api/mapping-files/{names[i % len(names)]}/export', params={'format': 'xlsx'}
+    ), iterations, warmup, items_per_request=scale.rows_per_file)
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Return a description of every scenario whose p95 latency or throughput regressed"""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        old_p95, new_p95 = previous['latency_ms']['p95'], result['latency_ms']['p95']
+        if old_p95 and new_p95 > old_p95 * (1 + max_regression):
+            regressions.append(f"{name}: p95 {old_p95} ms -> {new_p95} ms (+{(new_p95 / old_p95 - 1):.0%})")
+        old_rps, new_rps = previous.get('throughput_rps'), result.get('throughput_rps')
+        if old_rps and new_rps is not None and new_rps < old_rps * (1 - max_regression):
+            regressions.append(f"{name}: throughput {old_rps} -> {new_rps} req/s ({(new_rps / old_rps - 1):.0%})")
+        if result['errors'] > previous.get('errors', 0):
+            regressions.append(f"{name}: errors {previous.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _make_client(args):
+    if args.base_url:
+        import httpx
+        return httpx.Client(base_url=args.base_url, timeout=args.timeout), 'remote'
+    
+    if args.sqlite:
+        # Must be configured before the app (and with it the database package) is imported
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(args.sqlite + suffix):
+                os.remove(args.sqlite + suffix)
+        os.environ['DATABASE_BACKEND'] = 'sqlite'
+        os.environ['SQLITE_DATABASE_PATH'] = args.sqlite
+    
+    from fastapi.testclient import TestClient
+    from config import DATABASE_BACKEND
+    from main import app
+    return TestClient(app), DATABASE_BACKEND
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the backend API with synthetic data")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help="Synthetic data preset")
+    for field in Scale._fields:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, help=f"Override the preset's {field}")
+    parser.add_argument('--iterations', type=int, default=50, help="Measured requests per read scenario")
+    parser.add_argument('--warmup', type=int, default=5, help="Unmeasured requests before each scenario")
+    parser.add_argument('--concurrency', type=int, default=1, help="Concurrent client threads")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument('--base-url', help="Benchmark a running server instead of the in-process app")
+    parser.add_argument('--server-pid', type=int, help="Report RSS of this server process (with --base-url)")
+    parser.add_argument('--sqlite', metavar='PATH', help="Run in-process against a fresh SQLite database at PATH")
+    parser.add_argument('--skip-seed', action='store_true', help="Reuse data already in the database")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="Record tracemalloc peaks (in-process only; slows requests down)")
+    parser.add_argument('--timeout', type=float, default=300, help="HTTP timeout in seconds (with --base-url)")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare against a previous results file")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed relative p95/throughput regression against the baseline")
+    args = parser.parse_args()
+    
+    preset = SCALES[args.scale]
+    scale = Scale(*[getattr(args, field) or getattr(preset, field) for field in Scale._fields])
+    
+    client, backend = _make_client(args)
+    runner = BenchmarkRunner(client, args.concurrency, args.trace_memory and not args.base_url, args.server_pid)
+    
+    started_at = datetime.now().isoformat()
+    if not args.skip_seed:
+        seed(runner, scale, args.seed)
+    run_scenarios(runner, scale, args.iterations, args.warmup, args.seed)
+    
+    report = {
+        'meta': {
+            'started_at': started_at,
+            'git_commit': _git_commit(),
+            'mode': 'server' if args.base_url else 'in-process',
+            'backend': backend,
+            'scale': scale._asdict(),
+            'scale_preset': args.scale,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'scenarios': runner.results
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        for key in ('mode', 'backend', 'scale', 'concurrency'):
+            if baseline.get('meta', {}).get(key) != report['meta'][key]:
+                print(f"WARNING: baseline {key} differs ({baseline.get('meta', {}).get(key)} vs "
+                      f"{report['meta'][key]}); results are not directly comparable")
+        if args.trace_memory:
+            print("WARNING: --trace-memory slows requests down; compare against a baseline taken with it")
+        regressions = compare(report, baseline, args.max_regression)
+        if regressions:
+            print(f"REGRESSED against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"OK: no regressions beyond {args.max_regression:.0%} against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
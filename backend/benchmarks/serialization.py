@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for large JSON responses.
+
+Loads a synthetic mapping file listing of --rows rows into a fresh SQLite database, then times each stage
+of GET /api/mapping-files separately: building the rows, FastAPI's default encoding (jsonable_encoder plus
+JSONResponse) against the fast JSON path and the columnar formats, each content coding, parsing each body as
+a client would, and the whole request per Accept and Accept-Encoding. Every stage reports its median time
+and output size in bytes.
+
+Usage (from the backend directory):
+    python -m benchmarks.serialization --rows 100000 --output serialization.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import shutil
+import platform
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Tuple
+
+from benchmarks.synthetic_data import SCALES, mapping_template_csv
+from benchmarks.run_benchmarks import percentile, _check, _git_commit
+
+def _time(func: Callable[[], Any], iterations: int) -> Tuple[float, Any]:
+    """Median wall time of func() in milliseconds, and its last result"""
+    samples = []
+    result = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentile(sorted(samples), 50), result
+
+def _report(results: Dict[str, Any], name: str, ms: float, size: int = None, **extra):
+    results[name] = {'median_ms': round(ms, 1), 'bytes': size, **extra}
+    print(f"  {name:30} {ms:>10.1f} ms  {size if size is not None else '':>12} bytes")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark serialization of a large mapping file listing")
+    parser.add_argument('--rows', type=int, default=100000, help="Mapping rows in the listing")
+    parser.add_argument('--files', type=int, default=10, help="Mapping files the rows are spread over")
+    parser.add_argument('--iterations', type=int, default=3, help="Timed repetitions of each stage")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for reproducible data")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+    
+    # Must be configured before the app (and with it the database package) is imported
+    database_dir = tempfile.mkdtemp(prefix='serialization-bench-')
+    os.environ['DATABASE_BACKEND'] = 'sqlite'
+    os.environ['SQLITE_DATABASE_PATH'] = os.path.join(database_dir, 'bench.db')
+    
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+    from fastapi.testclient import TestClient
+    from main import app
+    from database import get_db_connection, load_mapping_files_from_single_table
+    import fast_json
+    import columnar
+    
+    client = TestClient(app)
+    scale = SCALES['small']._replace(rows_per_file=args.rows // args.files)
+    print(f"Seeding {args.files} mapping files of {scale.rows_per_file} rows")
+    for index in range(args.files):
+        _check(client.post('/api/mapping-files/upload', files={
+            'file': (f'serialization_{index}.csv', mapping_template_csv(scale, index, args.seed), 'text/csv')
+        }, data={'created_by': 'benchmark'}), 'Uploading mapping file')
+    
+    results: Dict[str, Any] = {}
+    encoder = 'orjson' if fast_json.orjson is not None else 'json'
+    print(f"Serializing {scale.rows_per_file * args.files} rows ({args.iterations} iterations, {encoder})")
+    
+    def load():
+        with get_db_connection() as conn:
+            return {'files': load_mapping_files_from_single_table(conn)}
+    ms, content = _time(load, args.iterations)
+    _report(results, 'load_rows', ms, rows=sum(len(file['rows']) for file in content['files']))
+    
+    ms, body = _time(lambda: JSONResponse(jsonable_encoder(content)).body, args.iterations)
+    _report(results, 'encode_default', ms, len(body))
+    ms, body = _time(lambda: fast_json.dumps(content), args.iterations)
+    _report(results, 'encode_fast', ms, len(body), encoder=encoder)
+    ms, columnar_body = _time(lambda: fast_json.dumps(
+        {'files': [{**file, 'rows': columnar.columnar_table(file['rows'])} for file in content['files']]}
+    ), args.iterations)
+    _report(results, 'encode_columnar', ms, len(columnar_body), encoder=encoder)
+    bodies = {'json': body, 'columnar': columnar_body}
+    if columnar.ARROW_STREAM in columnar.available_formats():
+        ms, arrow_body = _time(lambda: columnar.arrow_stream(columnar.record_columns(
+            [row for file in content['files'] for row in file['rows']]
+        )), args.iterations)
+        _report(results, 'encode_arrow', ms, len(arrow_body))
+        bodies['arrow'] = arrow_body
+    for name, encoded in bodies.items():
+        for encoding in fast_json.available_encodings():
+            ms, compressed = _time(lambda: fast_json.compress(encoded, encoding), args.iterations)
+            _report(results, f'compress_{name}_{encoding}', ms, len(compressed))
+    
+    # What a client pays to read each body back into memory
+    ms, _ = _time(lambda: fast_json.loads(body), args.iterations)
+    _report(results, 'parse_json', ms, len(body))
+    ms, _ = _time(lambda: fast_json.loads(columnar_body), args.iterations)
+    _report(results, 'parse_columnar', ms, len(columnar_body))
+    if 'arrow' in bodies:
+        import pyarrow
+        ms, _ = _time(lambda: pyarrow.ipc.open_stream(bodies['arrow']).read_all(), args.iterations)
+        _report(results, 'parse_arrow', ms, len(bodies['arrow']))
+    
+    # The whole request, with bytes as they went over the wire
+    labels = {columnar.JSON: 'json', columnar.COLUMNAR_JSON: 'columnar', columnar.ARROW_STREAM: 'arrow'}
+    for media_type in columnar.available_formats():
+        label = labels[media_type]
+        for encoding in ('identity', *fast_json.available_encodings()):
+            ms, response = _time(lambda: _check(client.get('/api/mapping-files', headers={
+                'Accept': media_type, 'Accept-Encoding': encoding
+            }), 'Listing mapping files'), args.iterations)
+            _report(results, f'request_{label}_{encoding}', ms, response.num_bytes_downloaded)
+    
+    if args.output:
+        report = {
+            'meta': {
+                'started_at': datetime.now().isoformat(),
+                'git_commit': _git_commit(),
+                'rows': scale.rows_per_file * args.files,
+                'files': args.files,
+                'iterations': args.iterations,
+                'encoder': encoder,
+                'python': platform.python_version(),
+                'platform': platform.platform()
+            },
+            'stages': results
+        }
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+    shutil.rmtree(database_dir, ignore_errors=True)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
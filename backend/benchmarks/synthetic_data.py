@@ -0,0 +1,119 @@
+
+import io
+import csv
+import random
+from typing import List, Dict, Any, Iterator, NamedTuple
+
+DATA_TYPES = ['string', 'integer', 'bigint', 'decimal', 'date', 'timestamp', 'boolean']
+SOURCE_SYSTEMS = ['Source_CRM', 'Source_ERP', 'Source_OMS', 'Source_HR']
+TARGET_SYSTEMS = ['Target_DW', 'Target_Lake']
+TRANSFORMATIONS = ['{column}', 'TRIM({column})', 'UPPER(TRIM({column}))', 'CAST({column} AS BIGINT)',
+                   'COALESCE({column}, \'N/A\')']
+
+class Scale(NamedTuple):
+    malcodes: int
+    tables_per_malcode: int
+    columns_per_table: int
+    mapping_files: int
+    rows_per_file: int
+    
+    @property
+    def catalogue_columns(self) -> int:
+        return self.malcodes * self.tables_per_malcode * self.columns_per_table
+
+# Named presets; 'large' approximates a mature production catalogue
+SCALES = {
+    'small': Scale(malcodes=5, tables_per_malcode=10, columns_per_table=20, mapping_files=10, rows_per_file=50),
+    'medium': Scale(malcodes=20, tables_per_malcode=25, columns_per_table=30, mapping_files=50, rows_per_file=200),
+    'large': Scale(malcodes=50, tables_per_malcode=40, columns_per_table=50, mapping_files=200, rows_per_file=500)
+}
+
+def malcode_name(m: int) -> str:
+    return f"MAL{m:03d}"
+
+def table_name(m: int, t: int) -> str:
+    return f"{malcode_name(m)}_TBL{t:03d}"
+
+def column_name(c: int) -> str:
+    return f"COL_{c:03d}"
+
+def iter_catalogue_records(scale: Scale, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    """Yield one metadata import record per catalogue column, in the metadata import field layout"""
+    rng = random.Random(seed)
+    for m in range(scale.malcodes):
+        for t in range(scale.tables_per_malcode):
+            for c in range(scale.columns_per_table):
+                yield {
+                    'malcode': malcode_name(m),
+                    'malcode_description': f"Synthetic application {m}",
+                    'table_name': table_name(m, t),
+                    'table_description': f"Synthetic table {t} of application {m}",
+                    'column_name': column_name(c),
+                    'column_description': f"Synthetic column {c}",
+                    'data_type': rng.choice(DATA_TYPES),
+                    'is_primary_key': 'true' if c == 0 else 'false',
+                    'is_nullable': 'false' if c == 0 else 'true',
+                    'default_value': ''
+                }
+
+def catalogue_csv(scale: Scale, seed: int = 42) -> bytes:
+    """Render the synthetic catalogue as a CSV file for POST /api/metadata/import"""
+    buffer = io.StringIO()
+    writer = None
+    for record in iter_catalogue_records(scale, seed):
+        if writer is None:
+            writer = csv.DictWriter(buffer, fieldnames=list(record))
+            writer.writeheader()
+        writer.writerow(record)
+    return buffer.getvalue().encode('utf-8')
+
+def _random_column(rng: random.Random, scale: Scale) -> Dict[str, str]:
+    m = rng.randrange(scale.malcodes)
+    return {
+        'malcode': malcode_name(m),
+        'table': table_name(m, rng.randrange(scale.tables_per_malcode)),
+        'column': column_name(rng.randrange(scale.columns_per_table)),
+        'dataType': rng.choice(DATA_TYPES)
+    }
+
+def mapping_file(scale: Scale, index: int, seed: int = 42) -> Dict[str, Any]:
+    """Build the POST /api/mapping-files payload for synthetic mapping file number index"""
+    rng = random.Random(seed * 100003 + index)
+    rows = []
+    for _ in range(scale.rows_per_file):
+        source = _random_column(rng, scale)
+        target = _random_column(rng, scale)
+        rows.append({
+            'sourceColumn': source,
+            'targetColumn': target,
+            'transformation': rng.choice(TRANSFORMATIONS).format(column=source['column']),
+            'status': 'draft',
+            'createdBy': 'benchmark'
+        })
+    
+    return {
+        'name': f"Benchmark Mapping {index:05d}",
+        'description': f"Synthetic mapping file {index}",
+        'sourceSystem': rng.choice(SOURCE_SYSTEMS),
+        'targetSystem': rng.choice(TARGET_SYSTEMS),
+        'status': 'draft',
+        'createdBy': 'benchmark',
+        'rows': rows
+    }
+
+def mapping_template_csv(scale: Scale, index: int, seed: int = 42) -> bytes:
+    """Render synthetic mapping file number index in the sample template layout for POST /api/mapping-files/upload"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['pod', 'malcode', 'source_column', 'source_table', 'target_column', 'target_table',
+                     'transformation'])
+    for row in mapping_file(scale, index, seed)['rows']:
+        source = row['sourceColumn']
+        target = row['targetColumn']
+        # The template has a single malcode column, so targets share the source's malcode
+        writer.writerow(['BENCH', source['malcode'], source['column'], source['table'], target['column'],
+                         target['table'], row['transformation']])
+    return buffer.getvalue().encode('utf-8')
+
+def mapping_files(scale: Scale, seed: int = 42) -> List[Dict[str, Any]]:
+    return [mapping_file(scale, index, seed) for index in range(scale.mapping_files)]
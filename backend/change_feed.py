@@ -0,0 +1,106 @@
+
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from fastapi import HTTPException
+
+from database import get_db_connection, get_mapping_changes_single_table, prune_mapping_changes_single_table
+from config import CHANGE_FEED_POLL_SECONDS, CHANGE_LOG_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+# Recent changes kept in memory for streaming clients; ones further behind read the database directly
+BUFFER_SIZE = 10000
+PRUNE_INTERVAL_SECONDS = 3600
+
+class ChangeFeed:
+    """Process-wide tail of mapping_change_log shared by every client of this process.
+    
+    The log is polled at most once per CHANGE_FEED_POLL_SECONDS however many clients are following it, and
+    recent changes are served from memory. Old entries are pruned after CHANGE_LOG_RETENTION_DAYS.
+    """
+    
+    def __init__(self, buffer_size: int = BUFFER_SIZE):
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self._buffer: deque = deque()
+        self._buffer_size = buffer_size
+        # The buffer holds every change with start < seq <= head
+        self._start: Optional[int] = None
+        self._head: Optional[int] = None
+        self._polled_at = 0.0
+        self._pruned_at = 0.0
+    
+    def _poll(self):
+        if time.monotonic() - self._polled_at < CHANGE_FEED_POLL_SECONDS:
+            return
+        # One thread reads the log; the others serve what is buffered rather than wait
+        if not self._poll_lock.acquire(blocking=False):
+            return
+        try:
+            with get_db_connection() as conn:
+                self._read_new_changes(conn)
+                if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL_SECONDS:
+                    self._pruned_at = time.monotonic()
+                    prune_mapping_changes_single_table(
+                        conn, datetime.now() - timedelta(days=CHANGE_LOG_RETENTION_DAYS)
+                    )
+            self._polled_at = time.monotonic()
+        finally:
+            self._poll_lock.release()
+    
+    def _read_new_changes(self, conn):
+        head = self._head
+        try:
+            while True:
+                page = get_mapping_changes_single_table(conn, head, MAX_PAGE_SIZE)
+                with self._lock:
+                    if self._start is None:
+                        self._start = page['next_since']
+                    for change in page['changes']:
+                        self._buffer.append(change)
+                        if len(self._buffer) > self._buffer_size:
+                            self._start = self._buffer.popleft()['seq']
+                    head = self._head = page['next_since']
+                if not page['has_more']:
+                    break
+        except HTTPException as e:
+            if e.status_code != 410:
+                raise
+            # Nobody followed the log for longer than its retention; start over from now
+            with self._lock:
+                self._buffer.clear()
+                self._start = self._head = None
+            self._read_new_changes(conn)
+    
+    def changes_after(self, since: Optional[int], limit: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """Up to limit changes after seq since, with next_since and has_more, as
+        get_mapping_changes_single_table returns them"""
+        self._poll()
+        with self._lock:
+            if self._head is not None and since is not None and self._start <= since:
+                # Followers are usually near the head, so walk back from the newest change
+                changes = []
+                for change in reversed(self._buffer):
+                    if change['seq'] <= since:
+                        break
+                    changes.append(change)
+                changes.reverse()
+                has_more = len(changes) > limit
+                changes = changes[:limit]
+                return {
+                    'changes': changes,
+                    'next_since': changes[-1]['seq'] if has_more else max(since, self._head),
+                    'has_more': has_more
+                }
+        
+        with get_db_connection() as conn:
+            return get_mapping_changes_single_table(conn, since, limit)
+
+change_feed = ChangeFeed()
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Query plan regression check for the database layer.
+
+Runs every function in database/ against the configured Azure SQL database inside a transaction
+that is rolled back at the end. Before each statement is executed its estimated plan is captured
+with SHOWPLAN_XML, and the check fails if any plan scans mapping_single, metadata_single, the
+mapping file revision rows or the mapping row archive.
+
+Plans depend on table statistics: on a near-empty database the optimizer will happily scan.
+Run it against production-like volumes, or pass --simulate-rows to make the optimizer cost the
+tables as if they held that many rows (the real statistics are restored afterwards).
+
+Usage:
+    python check_query_plans.py [--simulate-rows 1000000] [--verbose]
+"""
+
+import sys
+import argparse
+from datetime import datetime
+import xml.etree.ElementTree as ET
+
+from database import (
+    get_db_connection,
+    save_mapping_file_to_single_table,
+    load_mapping_files_from_single_table,
+    update_mapping_row_status_single_table,
+    bulk_update_mapping_row_status_single_table,
+    add_mapping_row_comment_single_table,
+    get_mapping_row_comments_single_table,
+    delete_mapping_file_rows_single_table,
+    bulk_insert_mapping_rows_single_table,
+    get_mapping_file_versions_single_table,
+    get_mapping_changes_single_table,
+    iter_mapping_rows_single_table,
+    iter_lineage_edges_single_table,
+    count_mappings_by_source_columns_single_table,
+    get_mappings_by_source_columns_single_table,
+    rollback_mapping_file_single_table,
+    get_mapping_file_revisions_single_table,
+    get_mapping_file_revision_single_table,
+    diff_mapping_file_revisions_single_table,
+    archive_inactive_mapping_rows_single_table,
+    get_archived_mapping_rows_single_table,
+    restore_archived_mapping_rows_single_table,
+    search_metadata_single_table,
+    get_all_malcodes_single_table,
+    get_malcode_single_table,
+    get_malcode_by_id_single_table,
+    get_tables_by_malcode_single_table,
+    get_table_by_id_single_table,
+    get_columns_by_table_single_table,
+    create_malcode_metadata_single_table,
+    create_table_metadata_single_table,
+    create_column_metadata_single_table,
+    bulk_merge_metadata_single_table
+)
+from models import MappingFileRequest
+from config import DATABASE_BACKEND
+
+SHOWPLAN_NS = {'sp': 'http://schemas.microsoft.com/sqlserver/2004/07/showplan'}
+WATCHED_TABLES = ('mapping_single', 'mapping_row_comments', 'metadata_single', 'mapping_file_revision_rows',
+                  'mapping_single_archive')
+FULL_SCAN_OPS = ('Table Scan', 'Clustered Index Scan', 'Index Scan')
+
+# Queries that scan by design, e.g. LIKE '%term%' searches which no B-tree index can seek, and the full
+# mapping file listing, which reads every active row
+EXPECTED_SCANS = {'search_metadata_single_table', 'load_mapping_files_from_single_table'}
+
+PLAN_CHECK_FILE = 'Query Plan Check Mapping'
+
+class PlanCapturingCursor:
+    """Cursor proxy that captures the estimated plan of every statement before executing it"""
+    
+    def __init__(self, checker, cursor):
+        self._checker = checker
+        self._cursor = cursor
+    
+    def execute(self, sql, *params):
+        self._checker.capture_plan(sql, params[0] if len(params) == 1 else params)
+        return self._cursor.execute(sql, *params)
+    
+    def executemany(self, sql, seq_of_params):
+        seq_of_params = list(seq_of_params)
+        if seq_of_params:
+            self._checker.capture_plan(sql, seq_of_params[0])
+        return self._cursor.executemany(sql, seq_of_params)
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+class PlanCapturingConnection:
+    """Connection proxy that defers all commits so the whole run can be rolled back"""
+    
+    def __init__(self, checker, conn):
+        self._checker = checker
+        self._conn = conn
+    
+    def cursor(self):
+        return PlanCapturingCursor(self._checker, self._conn.cursor())
+    
+    def commit(self):
+        pass
+    
+    def rollback(self):
+        self._conn.rollback()
+
+class QueryPlanChecker:
+    def __init__(self, conn, verbose: bool = False):
+        self.conn = conn
+        self.verbose = verbose
+        self.current_function = None
+        self.findings = []
+        self.statements_checked = 0
+    
+    def capture_plan(self, sql, params):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SET SHOWPLAN_XML ON")
+            try:
+                if params:
+                    cursor.execute(sql, params)
+                else:
+                    cursor.execute(sql)
+                plans = []
+                while True:
+                    if cursor.description:
+                        plans.extend(row[0] for row in cursor.fetchall())
+                    if not cursor.nextset():
+                        break
+            finally:
+                cursor.execute("SET SHOWPLAN_XML OFF")
+        except Exception as e:
+            self.findings.append((self.current_function, 'warning', f"Plan unavailable: {e}", sql))
+            return
+        finally:
+            cursor.close()
+        
+        self.statements_checked += 1
+        for plan in plans:
+            self._inspect_plan(plan, sql)
+    
+    def _inspect_plan(self, plan_xml: str, sql: str):
+        root = ET.fromstring(plan_xml)
+        for rel_op in root.iter(f"{{{SHOWPLAN_NS['sp']}}}RelOp"):
+            physical_op = rel_op.get('PhysicalOp')
+            if physical_op not in FULL_SCAN_OPS:
+                continue
+            for obj in rel_op.findall('./*/sp:Object', SHOWPLAN_NS):
+                table = (obj.get('Table') or '').strip('[]')
+                if table not in WATCHED_TABLES:
+                    continue
+                index = (obj.get('Index') or '').strip('[]')
+                # Scanning a filtered index reads only the rows it was built for (e.g. malcode rows)
+                if physical_op == 'Index Scan' and obj.get('Filtered') in ('1', 'true'):
+                    continue
+                severity = 'expected' if self.current_function in EXPECTED_SCANS else 'error'
+                self.findings.append((self.current_function, severity, f"{physical_op} on {table} ({index})", sql))
+        
+        if self.verbose:
+            print(f"  [{self.current_function}] {' '.join(sql.split())[:100]}")
+    
+    def run(self, name, func, *args):
+        self.current_function = name
+        wrapped = PlanCapturingConnection(self, self.conn)
+        return func(wrapped, *args)
+
+def _sample_mapping_file() -> MappingFileRequest:
+    return MappingFileRequest(
+        name=PLAN_CHECK_FILE,
+        description="Temporary mapping used by check_query_plans.py",
+        sourceSystem="Source_CRM",
+        targetSystem="Target_DW",
+        createdBy="plan-check",
+        rows=[{
+            'sourceColumn': {'malcode': 'PLANCHK', 'table': 'SRC_TABLE', 'column': f'SRC_COL_{i}'},
+            'targetColumn': {'malcode': 'PLANCHK', 'table': 'TGT_TABLE', 'column': f'TGT_COL_{i}'},
+            'createdBy': 'plan-check'
+        } for i in range(3)]
+    )
+
+def _table_sizes(cursor):
+    cursor.execute("""
+        SELECT OBJECT_NAME(object_id), SUM(row_count), SUM(used_page_count)
+        FROM sys.dm_db_partition_stats
+        WHERE object_id IN (OBJECT_ID('mapping_single'), OBJECT_ID('metadata_single'),
+                            OBJECT_ID('mapping_file_revision_rows'), OBJECT_ID('mapping_single_archive'))
+              AND index_id IN (0, 1)
+        GROUP BY object_id
+    """)
+    return {row[0]: (int(row[1]), max(int(row[2]), 1)) for row in cursor.fetchall()}
+
+def _set_statistics(cursor, sizes):
+    for table, (rows, pages) in sizes.items():
+        cursor.execute(f"UPDATE STATISTICS {table} WITH ROWCOUNT = {int(rows)}, PAGECOUNT = {int(pages)}")
+
+def run_checks(conn, verbose: bool = False) -> QueryPlanChecker:
+    checker = QueryPlanChecker(conn, verbose)
+    
+    # Mapping operations
+    checker.run('save_mapping_file_to_single_table', save_mapping_file_to_single_table, _sample_mapping_file())
+    files = checker.run('load_mapping_files_from_single_table', load_mapping_files_from_single_table)
+    saved = next((f for f in files if f['name'] == PLAN_CHECK_FILE), None)
+    if saved and saved['rows']:
+        row_id = saved['rows'][0]['id']
+        checker.run('update_mapping_row_status_single_table', update_mapping_row_status_single_table,
+                    row_id, 'pending', 'plan-check')
+        checker.run('add_mapping_row_comment_single_table', add_mapping_row_comment_single_table,
+                    row_id, 'plan check comment')
+        checker.run('get_mapping_row_comments_single_table', get_mapping_row_comments_single_table, row_id)
+        checker.run('bulk_update_mapping_row_status_single_table (ids)', bulk_update_mapping_row_status_single_table,
+                    'pending', 'plan-check', [row_id])
+    checker.run('bulk_update_mapping_row_status_single_table (filter)', bulk_update_mapping_row_status_single_table,
+                'pending', 'plan-check', None, PLAN_CHECK_FILE, 'SRC_TABLE', 'pending')
+    # The conditional save locks the file's rows while checking its version
+    checker.run('save_mapping_file_to_single_table (If-Match)', save_mapping_file_to_single_table,
+                _sample_mapping_file(), ['*'])
+    
+    # Mapping file revisions, recorded by the saves above
+    revisions = checker.run('get_mapping_file_revisions_single_table', get_mapping_file_revisions_single_table,
+                            PLAN_CHECK_FILE)['revisions']
+    if revisions:
+        latest, oldest = revisions[0]['revision'], revisions[-1]['revision']
+        checker.run('get_mapping_file_revision_single_table', get_mapping_file_revision_single_table,
+                    PLAN_CHECK_FILE, latest)
+        checker.run('diff_mapping_file_revisions_single_table', diff_mapping_file_revisions_single_table,
+                    PLAN_CHECK_FILE, oldest, latest)
+        checker.run('rollback_mapping_file_single_table', rollback_mapping_file_single_table,
+                    PLAN_CHECK_FILE, oldest, 'plan-check')
+    
+    # Mapping row archive; the cutoff is far enough back that only the plans run, not the moves
+    checker.run('archive_inactive_mapping_rows_single_table', archive_inactive_mapping_rows_single_table,
+                datetime(2000, 1, 1))
+    checker.run('get_archived_mapping_rows_single_table', get_archived_mapping_rows_single_table, PLAN_CHECK_FILE)
+    if saved and saved['rows']:
+        checker.run('restore_archived_mapping_rows_single_table', restore_archived_mapping_rows_single_table,
+                    [saved['rows'][0]['id']], None, 'plan-check')
+    
+    # Change feed; followers read from just behind the head
+    head = checker.run('get_mapping_changes_single_table (head)', get_mapping_changes_single_table)['next_since']
+    checker.run('get_mapping_changes_single_table', get_mapping_changes_single_table, max(head - 10, 0))
+    
+    # Export path
+    checker.run('get_mapping_file_versions_single_table', get_mapping_file_versions_single_table, [PLAN_CHECK_FILE])
+    checker.run('iter_mapping_rows_single_table',
+                lambda conn, names: list(iter_mapping_rows_single_table(conn, names)), [PLAN_CHECK_FILE])
+    checker.run('iter_lineage_edges_single_table',
+                lambda conn, names: list(iter_lineage_edges_single_table(conn, names)), [PLAN_CHECK_FILE])
+    
+    # Impact analysis reverse lookups
+    changed_columns = [('PLANCHK', 'SRC_TABLE', 'SRC_COL_0'), ('PLANCHK', 'SRC_TABLE', 'SRC_COL_1')]
+    checker.run('count_mappings_by_source_columns_single_table', count_mappings_by_source_columns_single_table,
+                changed_columns)
+    checker.run('get_mappings_by_source_columns_single_table', get_mappings_by_source_columns_single_table,
+                changed_columns)
+    
+    # Mapping upload path; these take a cursor because the caller owns the transaction
+    checker.run('delete_mapping_file_rows_single_table',
+                lambda conn, name: delete_mapping_file_rows_single_table(conn.cursor(), name), PLAN_CHECK_FILE)
+    checker.run('bulk_insert_mapping_rows_single_table',
+                lambda conn, rows: bulk_insert_mapping_rows_single_table(conn.cursor(), rows), [
+        (PLAN_CHECK_FILE, None, 'Source_CRM', 'Target_DW', 'draft', 'PLANCHK', 'SRC_TABLE', 'SRC_COL_0', 'VARCHAR',
+         'SRZ_ADLS', 'PLANCHK', 'TGT_TABLE', 'TGT_COL_0', 'VARCHAR', 'CZ_ADLS', None, None, 'plan-check', '[]')
+    ])
+    
+    # Metadata operations
+    checker.run('search_metadata_single_table', search_metadata_single_table, 'PLANCHK')
+    checker.run('get_all_malcodes_single_table', get_all_malcodes_single_table)
+    malcode = checker.run('get_malcode_single_table', get_malcode_single_table, 'PLANCHK')
+    if malcode:
+        checker.run('get_malcode_by_id_single_table', get_malcode_by_id_single_table, malcode['id'])
+    tables = checker.run('get_tables_by_malcode_single_table', get_tables_by_malcode_single_table, 'PLANCHK')
+    if tables:
+        checker.run('get_table_by_id_single_table', get_table_by_id_single_table, tables[0]['id'])
+    checker.run('get_columns_by_table_single_table', get_columns_by_table_single_table, 'PLANCHK', 'SRC_TABLE')
+    checker.run('create_malcode_metadata_single_table', create_malcode_metadata_single_table,
+                'PLANCHK2', 'Plan check malcode', 'plan-check')
+    checker.run('create_table_metadata_single_table', create_table_metadata_single_table,
+                'PLANCHK2', 'PLAN_TABLE', 'Plan check table', 'plan-check')
+    checker.run('create_column_metadata_single_table', create_column_metadata_single_table,
+                'PLANCHK2', 'PLAN_TABLE', 'PLAN_COLUMN', 'string', 'Plan check column', False, True, None,
+                'plan-check')
+    checker.run('bulk_merge_metadata_single_table', bulk_merge_metadata_single_table, [
+        ('PLANCHK', None, 'SRC_TABLE', None, 'SRC_COL_0', 'Imported', 'string', None, None, None, 'plan-check')
+    ])
+    
+    return checker
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Fail if any database/ query plan scans a hot table")
+    parser.add_argument('--simulate-rows', type=int, default=0,
+                        help="Cost mapping_single, metadata_single, mapping_file_revision_rows and "
+                             "mapping_single_archive as if they held this many rows")
+    parser.add_argument('--verbose', action='store_true', help="Print every statement as it is checked")
+    args = parser.parse_args()
+    
+    if DATABASE_BACKEND != 'sqlserver':
+        print(f"Query plan checks need the sqlserver backend (DATABASE_BACKEND={DATABASE_BACKEND})")
+        return 2
+    
+    with get_db_connection() as conn:
+        cursor = conn.cursor()
+        original_sizes = _table_sizes(cursor)
+        if args.simulate_rows:
+            _set_statistics(cursor, {t: (args.simulate_rows, args.simulate_rows // 20) for t in original_sizes})
+            conn.commit()
+        
+        try:
+            checker = run_checks(conn, args.verbose)
+        finally:
+            conn.rollback()
+            if args.simulate_rows:
+                _set_statistics(cursor, original_sizes)
+                conn.commit()
+    
+    errors = [f for f in checker.findings if f[1] == 'error']
+    print(f"Checked {checker.statements_checked} statements")
+    for function, severity, message, sql in checker.findings:
+        print(f"  {severity.upper():8} {function}: {message}")
+        if severity == 'error':
+            print(f"           {' '.join(sql.split())[:160]}")
+    
+    if errors:
+        print(f"FAILED: {len(errors)} full scan(s) on {', '.join(WATCHED_TABLES)}")
+        return 1
+    print("OK: no unexpected full scans")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
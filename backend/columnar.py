@@ -0,0 +1,144 @@
+
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+
+from fast_json import dumps, json_response, encoded_response
+
+# Opt-in representations of record lists, selected with the Accept header. Plain JSON stays the default.
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.data-mapping.columnar+json'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+# A string column is dictionary-encoded when it has at most this fraction of distinct values
+MAX_DICTIONARY_RATIO = 0.5
+
+@lru_cache(maxsize=None)
+def _pyarrow():
+    # Imported on first use: pyarrow is optional and slow to import
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+def available_formats() -> Sequence[str]:
+    """Media types record listings can be served as, most preferred first"""
+    return (JSON, COLUMNAR_JSON, ARROW_STREAM) if _pyarrow() is not None else (JSON, COLUMNAR_JSON)
+
+def negotiate_format(accept: Optional[str]) -> str:
+    """The available media type an Accept header prefers; raises a 406 if it accepts none of them"""
+    if not accept:
+        return JSON
+    ranges = []
+    for media_range in accept.split(','):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_type.lower(), quality))
+    
+    best, best_quality = None, 0.0
+    for media_type in available_formats():
+        # The most specific range that matches decides the quality: type/subtype, then type/*, then */*
+        candidates = (media_type, f"{media_type.split('/')[0]}/*", '*/*')
+        quality = next((quality for candidate in candidates for media_range, quality in ranges
+                        if media_range == candidate), 0.0)
+        # Ties go to the earlier format, so wildcards get plain JSON
+        if quality > best_quality:
+            best, best_quality = media_type, quality
+    if best is None:
+        raise HTTPException(status_code=406, detail=f"Supported media types: {', '.join(available_formats())}")
+    return best
+
+def record_columns(records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    """Split records into one list per field. Nested objects such as sourceColumn are flattened into dotted
+    fields (sourceColumn.malcode); the field layout is taken from the first record."""
+    if not records:
+        return {}
+    columns = {}
+    for key, value in records[0].items():
+        if isinstance(value, dict):
+            nested = [record.get(key) or {} for record in records]
+            for nested_key in value:
+                columns[f"{key}.{nested_key}"] = [fields.get(nested_key) for fields in nested]
+        else:
+            columns[key] = [record.get(key) for record in records]
+    return columns
+
+def dictionary_encode(values: List[Any]) -> Optional[Tuple[List[Any], List[Optional[int]]]]:
+    """(dictionary, indices) for a column of repeated strings or lists, or None if it is not worth encoding"""
+    try:
+        keys = values
+        distinct = dict(zip(values, values))
+        if not all(type(value) is str for value in distinct if value is not None):
+            return None
+    except TypeError:
+        # Lists such as row comments are unhashable, so they are told apart by their JSON text
+        keys = [dumps(value) if value is not None else None for value in values]
+        distinct = dict(zip(keys, values))
+    distinct.pop(None, None)
+    if len(distinct) > len(values) * MAX_DICTIONARY_RATIO:
+        return None
+    positions: Dict[Any, Optional[int]] = {key: position for position, key in enumerate(distinct)}
+    positions[None] = None
+    return list(distinct.values()), [positions[key] for key in keys]
+
+def columnar_table(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Columnar JSON form of a record list: {"length", "columns"} with one array per field.
+    
+    Columns of repeated values (malcodes, tables, types, statuses, comments, ...) become {"dictionary", "indices"},
+    where value i is dictionary[indices[i]] and a null index is a null value.
+    """
+    columns = {}
+    for name, values in record_columns(records).items():
+        encoded = dictionary_encode(values)
+        columns[name] = {'dictionary': encoded[0], 'indices': encoded[1]} if encoded else values
+    return {'length': len(records), 'columns': columns}
+
+def arrow_stream(columns: Dict[str, List[Any]], metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """Serialize columns as an Arrow IPC stream. Repeated strings become dictionary arrays, nested values JSON
+    strings, and metadata JSON-encoded schema metadata."""
+    pa = _pyarrow()
+    arrays = {}
+    for name, values in columns.items():
+        encoded = dictionary_encode(values)
+        if encoded:
+            dictionary = [value if isinstance(value, str) else json.dumps(value) for value in encoded[0]]
+            arrays[name] = pa.DictionaryArray.from_arrays(pa.array(encoded[1], type=pa.int32()),
+                                                          pa.array(dictionary, type=pa.string()))
+        elif any(isinstance(value, (dict, list)) for value in values):
+            arrays[name] = pa.array([json.dumps(value) if value is not None else None for value in values],
+                                    type=pa.string())
+        else:
+            arrays[name] = pa.array(values)
+    table = pa.table(arrays, metadata={key: json.dumps(value, default=str) for key, value in (metadata or {}).items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def records_response(content: Dict[str, Any], records_key: str, media_type: str, accept_encoding: Optional[str],
+                     headers: Optional[Dict[str, str]] = None) -> Response:
+    """Serve a document holding a record list under records_key in the negotiated media type.
+    
+    Columnar JSON replaces the list with a columnar table; an Arrow stream carries the records as its table and
+    the document's other fields as schema metadata.
+    """
+    headers = {**(headers or {}), 'Vary': 'Accept'}
+    if media_type == ARROW_STREAM:
+        metadata = {key: value for key, value in content.items() if key != records_key}
+        return encoded_response(arrow_stream(record_columns(content[records_key]), metadata), ARROW_STREAM,
+                                accept_encoding, headers)
+    if media_type == COLUMNAR_JSON:
+        content = {**content, records_key: columnar_table(content[records_key])}
+    return json_response(content, accept_encoding, headers, media_type=media_type)
@@ -1,5 +1,6 @@
 
 import os
+import tempfile
 import logging
 from openai import AzureOpenAI
 
@@ -8,12 +9,46 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Database configuration
+# Storage backend: 'sqlserver' (Azure SQL, the default) or 'sqlite' (embedded, for local runs and benchmarks)
+DATABASE_BACKEND = os.getenv("DATABASE_BACKEND", "sqlserver").lower()
+SQLITE_DATABASE_PATH = os.getenv("SQLITE_DATABASE_PATH", "mapping_mastermind.db")
+
 AZURE_SQL_SERVER = os.getenv("AZURE_SQL_SERVER")
 AZURE_SQL_DATABASE = os.getenv("AZURE_SQL_DATABASE")
 AZURE_SQL_USERNAME = os.getenv("AZURE_SQL_USERNAME")
 AZURE_SQL_PASSWORD = os.getenv("AZURE_SQL_PASSWORD")
 AZURE_SQL_DRIVER = os.getenv("AZURE_SQL_DRIVER", "{ODBC Driver 18 for SQL Server}")
 
+# Background SQL job configuration
+SQL_JOB_WORKERS = int(os.getenv("SQL_JOB_WORKERS", "2"))
+SQL_JOB_DEFAULT_TIMEOUT_SECONDS = int(os.getenv("SQL_JOB_DEFAULT_TIMEOUT_SECONDS", "0"))  # 0 = no timeout
+
+# Statements slower than this are written to the slow-query log
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+
+# Health checks: readiness results are cached, and each check must finish within the probe's timeout
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_CHECK_TIMEOUT_SECONDS = float(os.getenv("HEALTH_CHECK_TIMEOUT_SECONDS", "0.8"))
+
+# Generated XLSX exports are cached here, keyed by ETag
+EXPORT_CACHE_DIR = os.getenv("EXPORT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mapping_exports"))
+
+# Lineage graph: seconds between re-syncs with the database (0 = only on local saves), traversal limits
+LINEAGE_REFRESH_SECONDS = float(os.getenv("LINEAGE_REFRESH_SECONDS", "60"))
+LINEAGE_MAX_DEPTH = int(os.getenv("LINEAGE_MAX_DEPTH", "20"))
+LINEAGE_MAX_NODES = int(os.getenv("LINEAGE_MAX_NODES", "10000"))
+
+# Change feed: seconds between change log polls for streaming clients, days of change log to keep
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", "1"))
+CHANGE_LOG_RETENTION_DAYS = float(os.getenv("CHANGE_LOG_RETENTION_DAYS", "7"))
+
+# Mapping row archive: seconds between runs of the archiver (0 = only on request, the default: nothing in the app
+# deactivates rows yet), days a row must have been inactive before it is moved to mapping_single_archive, rows
+# moved per transaction
+MAPPING_ARCHIVE_INTERVAL_SECONDS = float(os.getenv("MAPPING_ARCHIVE_INTERVAL_SECONDS", "0"))
+MAPPING_ARCHIVE_AFTER_DAYS = float(os.getenv("MAPPING_ARCHIVE_AFTER_DAYS", "30"))
+MAPPING_ARCHIVE_BATCH_SIZE = int(os.getenv("MAPPING_ARCHIVE_BATCH_SIZE", "5000"))
+
 # Azure OpenAI Configuration
 AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_KEY = os.getenv("AZURE_OPENAI_KEY")
@@ -1,34 +1,163 @@
 
 # Import all functions from the refactored modules to maintain backward compatibility
-from .connection import get_db_connection
-from .mapping_operations import (
-    save_mapping_file_to_single_table,
-    load_mapping_files_from_single_table,
-    update_mapping_row_status_single_table,
-    add_mapping_row_comment_single_table
-)
-from .metadata_operations import (
-    search_metadata_single_table,
-    get_all_malcodes_single_table,
-    get_tables_by_malcode_single_table,
-    get_columns_by_table_single_table,
-    create_malcode_metadata_single_table,
-    create_table_metadata_single_table,
-    create_column_metadata_single_table
-)
+from config import DATABASE_BACKEND
+
+# Storage backends implement the same functions with the same signatures and return shapes;
+# the names in __all__ are the storage interface that routes and tools program against.
+if DATABASE_BACKEND == 'sqlite':
+    from .sqlite.connection import get_db_connection, set_statement_timeout, set_autocommit, is_statement_timeout
+    from .sqlite.mapping_operations import (
+        save_mapping_file_to_single_table,
+        load_mapping_files_from_single_table,
+        update_mapping_row_status_single_table,
+        bulk_update_mapping_row_status_single_table,
+        add_mapping_row_comment_single_table,
+        get_mapping_row_comments_single_table,
+        delete_mapping_file_rows_single_table,
+        bulk_insert_mapping_rows_single_table,
+        get_mapping_file_versions_single_table,
+        iter_mapping_rows_single_table,
+        iter_lineage_edges_single_table,
+        count_mappings_by_source_columns_single_table,
+        get_mappings_by_source_columns_single_table,
+        rollback_mapping_file_single_table,
+        archive_inactive_mapping_rows_single_table,
+        get_archived_mapping_rows_single_table,
+        restore_archived_mapping_rows_single_table
+    )
+    from .sqlite.metadata_operations import (
+        search_metadata_single_table,
+        get_all_malcodes_single_table,
+        get_malcode_single_table,
+        get_malcode_by_id_single_table,
+        get_tables_by_malcode_single_table,
+        get_table_by_id_single_table,
+        get_columns_by_table_single_table,
+        create_malcode_metadata_single_table,
+        create_table_metadata_single_table,
+        create_column_metadata_single_table,
+        upsert_column_metadata_single_table,
+        bulk_merge_metadata_single_table
+    )
+    from .sqlite.change_log_operations import (
+        record_mapping_changes_single_table,
+        get_mapping_changes_single_table,
+        prune_mapping_changes_single_table
+    )
+    from .sqlite.revision_operations import (
+        record_mapping_file_revision_single_table,
+        get_mapping_file_revisions_single_table,
+        get_mapping_file_revision_single_table,
+        get_mapping_file_revision_rows_single_table,
+        diff_mapping_file_revisions_single_table
+    )
+    from .sqlite.job_operations import (
+        insert_sql_job,
+        update_sql_job,
+        get_sql_job,
+        list_sql_jobs
+    )
+elif DATABASE_BACKEND == 'sqlserver':
+    from .connection import get_db_connection, set_statement_timeout, set_autocommit, is_statement_timeout
+    from .mapping_operations import (
+        save_mapping_file_to_single_table,
+        load_mapping_files_from_single_table,
+        update_mapping_row_status_single_table,
+        bulk_update_mapping_row_status_single_table,
+        add_mapping_row_comment_single_table,
+        get_mapping_row_comments_single_table,
+        delete_mapping_file_rows_single_table,
+        bulk_insert_mapping_rows_single_table,
+        get_mapping_file_versions_single_table,
+        iter_mapping_rows_single_table,
+        iter_lineage_edges_single_table,
+        count_mappings_by_source_columns_single_table,
+        get_mappings_by_source_columns_single_table,
+        rollback_mapping_file_single_table,
+        archive_inactive_mapping_rows_single_table,
+        get_archived_mapping_rows_single_table,
+        restore_archived_mapping_rows_single_table
+    )
+    from .metadata_operations import (
+        search_metadata_single_table,
+        get_all_malcodes_single_table,
+        get_malcode_single_table,
+        get_malcode_by_id_single_table,
+        get_tables_by_malcode_single_table,
+        get_table_by_id_single_table,
+        get_columns_by_table_single_table,
+        create_malcode_metadata_single_table,
+        create_table_metadata_single_table,
+        create_column_metadata_single_table,
+        upsert_column_metadata_single_table,
+        bulk_merge_metadata_single_table
+    )
+    from .change_log_operations import (
+        record_mapping_changes_single_table,
+        get_mapping_changes_single_table,
+        prune_mapping_changes_single_table
+    )
+    from .revision_operations import (
+        record_mapping_file_revision_single_table,
+        get_mapping_file_revisions_single_table,
+        get_mapping_file_revision_single_table,
+        get_mapping_file_revision_rows_single_table,
+        diff_mapping_file_revisions_single_table
+    )
+    from .job_operations import (
+        insert_sql_job,
+        update_sql_job,
+        get_sql_job,
+        list_sql_jobs
+    )
+else:
+    raise ValueError(f"Unknown DATABASE_BACKEND: {DATABASE_BACKEND}. Supported backends: sqlserver, sqlite")
 
 # Export all functions for backward compatibility
 __all__ = [
     'get_db_connection',
+    'set_statement_timeout',
+    'set_autocommit',
+    'is_statement_timeout',
     'save_mapping_file_to_single_table',
     'load_mapping_files_from_single_table',
     'update_mapping_row_status_single_table',
+    'bulk_update_mapping_row_status_single_table',
     'add_mapping_row_comment_single_table',
+    'get_mapping_row_comments_single_table',
+    'delete_mapping_file_rows_single_table',
+    'bulk_insert_mapping_rows_single_table',
+    'get_mapping_file_versions_single_table',
+    'iter_mapping_rows_single_table',
+    'iter_lineage_edges_single_table',
+    'count_mappings_by_source_columns_single_table',
+    'get_mappings_by_source_columns_single_table',
+    'rollback_mapping_file_single_table',
+    'archive_inactive_mapping_rows_single_table',
+    'get_archived_mapping_rows_single_table',
+    'restore_archived_mapping_rows_single_table',
     'search_metadata_single_table',
     'get_all_malcodes_single_table',
+    'get_malcode_single_table',
+    'get_malcode_by_id_single_table',
     'get_tables_by_malcode_single_table',
+    'get_table_by_id_single_table',
     'get_columns_by_table_single_table',
     'create_malcode_metadata_single_table',
     'create_table_metadata_single_table',
-    'create_column_metadata_single_table'
+    'create_column_metadata_single_table',
+    'upsert_column_metadata_single_table',
+    'bulk_merge_metadata_single_table',
+    'record_mapping_changes_single_table',
+    'get_mapping_changes_single_table',
+    'prune_mapping_changes_single_table',
+    'record_mapping_file_revision_single_table',
+    'get_mapping_file_revisions_single_table',
+    'get_mapping_file_revision_single_table',
+    'get_mapping_file_revision_rows_single_table',
+    'diff_mapping_file_revisions_single_table',
+    'insert_sql_job',
+    'update_sql_job',
+    'get_sql_job',
+    'list_sql_jobs'
 ]
@@ -0,0 +1,108 @@
+
+import json
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Optional
+import logging
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+# Change types written to mapping_change_log:
+#   file_saved     a mapping file was created, replaced or rolled back; data has its new version, row count,
+#                  source and revision
+#   row_status     a row's status and reviewer were set; data has them and the row's new version
+#   row_comment    a comment was added to a row; data is the comment
+#   rows_restored  archived rows were restored into a file; data has their row ids and the file's new version
+#                  and revision
+#   log_truncated  entries up to data['through'] were pruned
+ChangeEntry = Tuple[str, Optional[str], Optional[str], Optional[Dict[str, Any]]]
+
+def record_mapping_changes_single_table(cursor, changes: List[ChangeEntry]):
+    """Append (change_type, mapping_file_name, mapping_row_id, data) entries to the change log.
+    
+    Does not commit - call it in the transaction that makes the change, so both commit or neither does.
+    """
+    if not changes:
+        return
+    
+    cursor.fast_executemany = True
+    cursor.executemany("""
+        INSERT INTO mapping_change_log (change_type, mapping_file_name, mapping_row_id, payload)
+        VALUES (?, ?, ?, ?)
+    """, [(change_type, file_name, row_id, json.dumps(data, default=str) if data is not None else None)
+          for change_type, file_name, row_id, data in changes])
+
+def _change_from_row(row) -> Dict[str, Any]:
+    return {
+        'seq': int(row[0]),
+        'change_type': row[1],
+        'mapping_file_name': row[2],
+        'row_id': str(row[3]) if row[3] else None,
+        'data': json.loads(row[4]) if row[4] else None,
+        'created_at': row[5].isoformat() if row[5] else None
+    }
+
+def _check_not_truncated(cursor, since: int):
+    cursor.execute("SELECT TOP 1 CAST(seq AS BIGINT) FROM mapping_change_log ORDER BY seq")
+    oldest = cursor.fetchone()
+    if oldest is None or since >= oldest[0]:
+        return
+    # Only clients that fell behind the oldest entry get here, so the marker lookup can afford a scan
+    cursor.execute("SELECT TOP 1 payload FROM mapping_change_log WHERE change_type = 'log_truncated' ORDER BY seq DESC")
+    marker = cursor.fetchone()
+    if marker and since < json.loads(marker[0])['through']:
+        raise HTTPException(status_code=410, detail="Changes after since have been pruned; reload the mapping files")
+
+def get_mapping_changes_single_table(conn, since: Optional[int] = None, limit: int = 500) -> Dict[str, Any]:
+    """Get up to limit committed changes after seq since, oldest first.
+    
+    Returns changes, next_since (pass it as since to continue) and has_more. Without since no changes are
+    returned, only the current position to follow from. Raises a 410 if entries after since were pruned.
+    """
+    cursor = conn.cursor()
+    
+    # Everything below MIN_ACTIVE_ROWVERSION() has committed; later seqs may belong to open transactions
+    cursor.execute("SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1")
+    head = cursor.fetchone()[0]
+    if since is None:
+        return {'changes': [], 'next_since': head, 'has_more': False}
+    
+    _check_not_truncated(cursor, since)
+    cursor.execute("""
+        SELECT TOP (?) CAST(seq AS BIGINT), change_type, mapping_file_name, mapping_row_id, payload, created_at
+        FROM mapping_change_log
+        WHERE seq > CAST(CAST(? AS BIGINT) AS BINARY(8)) AND seq <= CAST(CAST(? AS BIGINT) AS BINARY(8))
+        ORDER BY seq
+    """, (limit + 1, since, head))
+    rows = cursor.fetchall()
+    
+    changes = [_change_from_row(row) for row in rows[:limit]]
+    has_more = len(rows) > limit
+    return {
+        'changes': changes,
+        'next_since': changes[-1]['seq'] if has_more else max(since, head),
+        'has_more': has_more
+    }
+
+def prune_mapping_changes_single_table(conn, older_than: datetime) -> int:
+    """Delete change log entries created before older_than and return how many were deleted.
+    
+    Leaves a log_truncated entry, so clients resuming from a pruned position get a 410 instead of a gap.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT CAST(MAX(seq) AS BIGINT) FROM mapping_change_log WHERE created_at < ?", (older_than,))
+    through = cursor.fetchone()[0]
+    if through is None:
+        return 0
+    
+    try:
+        cursor.execute("DELETE FROM mapping_change_log WHERE seq <= CAST(CAST(? AS BIGINT) AS BINARY(8))", (through,))
+        deleted = cursor.rowcount
+        record_mapping_changes_single_table(cursor, [('log_truncated', None, None, {'through': through})])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    logger.info(f"Pruned {deleted} change log entries through seq {through}")
+    return deleted
@@ -1,9 +1,12 @@
 
+import time
 import pyodbc
 from contextlib import contextmanager
 from fastapi import HTTPException
 import logging
 
+from instrumentation import InstrumentedConnection
+
 logger = logging.getLogger(__name__)
 
 @contextmanager
@@ -20,11 +23,31 @@ def get_db_connection():
     connection_string = get_database_connection_string()
     
     try:
-        conn = pyodbc.connect(connection_string)
-        yield conn
+        started = time.perf_counter()
+        # pyodbc.pooling (on by default) lets the ODBC driver manager reuse physical connections
+        conn = InstrumentedConnection(pyodbc.connect(connection_string), time.perf_counter() - started)
     except Exception as e:
         logger.error(f"Database connection failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
+    
+    # Errors raised by the caller propagate unchanged so routes can map them to their own responses
+    try:
+        yield conn
     finally:
-        if 'conn' in locals():
-            conn.close()
+        conn.close()
+
+# ODBC SQLSTATE raised when a statement exceeds the connection's query timeout
+_TIMEOUT_SQLSTATE = 'HYT00'
+
+def set_statement_timeout(conn, seconds: int):
+    """Abort any single statement on this connection that runs longer than seconds"""
+    # pyodbc passes this to the driver as SQL_ATTR_QUERY_TIMEOUT for every statement the connection runs
+    conn.timeout = seconds
+
+def set_autocommit(conn):
+    """Commit each statement on this connection as it completes"""
+    conn.autocommit = True
+
+def is_statement_timeout(error: Exception) -> bool:
+    """Whether error was raised because a statement exceeded the set_statement_timeout limit"""
+    return bool(error.args) and error.args[0] == _TIMEOUT_SQLSTATE
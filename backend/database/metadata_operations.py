@@ -1,31 +1,56 @@
 
-import uuid
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+# metadata_single holds one row per malcode, per table and per column, told apart by metadata_level.
+# Malcode rows have NULL table_name/column_name and table rows have NULL column_name.
+
+def _malcode_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': str(row[0]),
+        'malcode': row[1],
+        'business_description': row[2],
+        'created_at': row[3].isoformat() if row[3] else None,
+        'updated_at': row[4].isoformat() if row[4] else None,
+        'created_by': row[5],
+        'is_active': True
+    }
+
+def _table_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': str(row[0]),
+        'malcode_id': str(row[1]) if row[1] else None,
+        'malcode': row[2],
+        'table_name': row[3],
+        'business_description': row[4],
+        'created_at': row[5].isoformat() if row[5] else None,
+        'updated_at': row[6].isoformat() if row[6] else None,
+        'created_by': row[7],
+        'is_active': True
+    }
+
+_TABLE_SELECT = """
+    SELECT t.id, m.id, t.malcode, t.table_name, t.table_description, t.created_at, t.updated_at, t.created_by
+    FROM metadata_single t
+    LEFT JOIN metadata_single m
+        ON m.metadata_level = 'malcode' AND m.malcode = t.malcode AND m.is_active = 1
+"""
+
 def search_metadata_single_table(conn, search_term: str) -> List[Dict[str, Any]]:
-    """Search metadata in the single table"""
+    """Search column metadata in the metadata_single table"""
     cursor = conn.cursor()
     search_pattern = f"%{search_term}%"
     
     cursor.execute("""
-        SELECT DISTINCT source_malcode as malcode, source_table_name as table_name, 
-               source_column_name as column_name, source_malcode_description as business_description,
-               source_data_type as data_type
-        FROM mapping_single
-        WHERE (source_malcode LIKE ? OR source_table_name LIKE ? OR source_column_name LIKE ? OR source_malcode_description LIKE ?)
-           AND is_active = 1
-        UNION
-        SELECT DISTINCT target_malcode as malcode, target_table_name as table_name,
-               target_column_name as column_name, target_malcode_description as business_description,
-               target_data_type as data_type
-        FROM mapping_single
-        WHERE (target_malcode LIKE ? OR target_table_name LIKE ? OR target_column_name LIKE ? OR target_malcode_description LIKE ?)
+        SELECT malcode, table_name, column_name, malcode_description as business_description, data_type
+        FROM metadata_single
+        WHERE metadata_level = 'column'
+           AND (malcode LIKE ? OR table_name LIKE ? OR column_name LIKE ? OR malcode_description LIKE ?)
            AND is_active = 1
-    """, (search_pattern, search_pattern, search_pattern, search_pattern,
-          search_pattern, search_pattern, search_pattern, search_pattern))
+        ORDER BY malcode, table_name, column_name
+    """, (search_pattern, search_pattern, search_pattern, search_pattern))
     
     results = []
     for row in cursor.fetchall():
@@ -40,185 +65,355 @@ def search_metadata_single_table(conn, search_term: str) -> List[Dict[str, Any]]
     return results
 
 def get_all_malcodes_single_table(conn) -> List[Dict[str, Any]]:
-    """Get all unique malcodes from single table"""
+    """Get all malcodes from the metadata_single table"""
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT DISTINCT malcode, malcode_description, MIN(created_at) as created_at, 
-               MAX(updated_at) as updated_at, created_by
-        FROM (
-            SELECT source_malcode as malcode, source_malcode_description as malcode_description,
-                   created_at, updated_at, created_by
-            FROM mapping_single WHERE is_active = 1
-            UNION
-            SELECT target_malcode as malcode, target_malcode_description as malcode_description,
-                   created_at, updated_at, created_by
-            FROM mapping_single WHERE is_active = 1
-        ) combined
-        GROUP BY malcode, malcode_description, created_by
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND is_active = 1
         ORDER BY malcode
     """)
     
-    malcodes = []
-    for row in cursor.fetchall():
-        malcodes.append({
-            'id': str(uuid.uuid4()),  # Generate ID for compatibility
-            'malcode': row[0],
-            'business_description': row[1],
-            'created_at': row[2].isoformat() if row[2] else None,
-            'updated_at': row[3].isoformat() if row[3] else None,
-            'created_by': row[4],
-            'is_active': True
-        })
+    return [_malcode_from_row(row) for row in cursor.fetchall()]
+
+def get_malcode_single_table(conn, malcode: str) -> Optional[Dict[str, Any]]:
+    """Get a malcode by name, or None if it does not exist"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND malcode = ? AND is_active = 1
+    """, (malcode,))
     
-    return malcodes
+    row = cursor.fetchone()
+    return _malcode_from_row(row) if row else None
 
-def get_tables_by_malcode_single_table(conn, malcode: str) -> List[Dict[str, Any]]:
-    """Get all tables for a specific malcode from single table"""
+def get_malcode_by_id_single_table(conn, malcode_id: str) -> Optional[Dict[str, Any]]:
+    """Get a malcode by its metadata_single row ID, or None if it does not exist"""
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT DISTINCT table_name, table_description, MIN(created_at) as created_at,
-               MAX(updated_at) as updated_at, created_by
-        FROM (
-            SELECT source_table_name as table_name, source_table_description as table_description,
-                   created_at, updated_at, created_by
-            FROM mapping_single WHERE source_malcode = ? AND is_active = 1
-            UNION
-            SELECT target_table_name as table_name, target_table_description as table_description,
-                   created_at, updated_at, created_by
-            FROM mapping_single WHERE target_malcode = ? AND is_active = 1
-        ) combined
-        GROUP BY table_name, table_description, created_by
-        ORDER BY table_name
-    """, (malcode, malcode))
-    
-    tables = []
-    for row in cursor.fetchall():
-        tables.append({
-            'id': str(uuid.uuid4()),  # Generate ID for compatibility
-            'malcode_id': str(uuid.uuid4()),  # Generate malcode_id for compatibility
-            'table_name': row[0],
-            'business_description': row[1],
-            'created_at': row[2].isoformat() if row[2] else None,
-            'updated_at': row[3].isoformat() if row[3] else None,
-            'created_by': row[4],
-            'is_active': True
-        })
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE id = TRY_CONVERT(UNIQUEIDENTIFIER, ?) AND metadata_level = 'malcode' AND is_active = 1
+    """, (malcode_id,))
+    
+    row = cursor.fetchone()
+    return _malcode_from_row(row) if row else None
+
+def get_tables_by_malcode_single_table(conn, malcode: str) -> List[Dict[str, Any]]:
+    """Get all tables for a specific malcode from the metadata_single table"""
+    cursor = conn.cursor()
     
-    return tables
+    cursor.execute(_TABLE_SELECT + """
+        WHERE t.metadata_level = 'table' AND t.malcode = ? AND t.is_active = 1
+        ORDER BY t.table_name
+    """, (malcode,))
+    
+    return [_table_from_row(row) for row in cursor.fetchall()]
+
+def get_table_by_id_single_table(conn, table_id: str) -> Optional[Dict[str, Any]]:
+    """Get a table by its metadata_single row ID, or None if it does not exist"""
+    cursor = conn.cursor()
+    
+    cursor.execute(_TABLE_SELECT + """
+        WHERE t.id = TRY_CONVERT(UNIQUEIDENTIFIER, ?) AND t.metadata_level = 'table' AND t.is_active = 1
+    """, (table_id,))
+    
+    row = cursor.fetchone()
+    return _table_from_row(row) if row else None
 
 def get_columns_by_table_single_table(conn, malcode: str, table_name: str) -> List[Dict[str, Any]]:
-    """Get all columns for a specific table from single table"""
+    """Get all columns for a specific table from the metadata_single table"""
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT DISTINCT column_name, column_description, data_type, is_primary_key, is_nullable,
-               default_value, MIN(created_at) as created_at, MAX(updated_at) as updated_at, created_by
-        FROM (
-            SELECT source_column_name as column_name, source_column_description as column_description,
-                   source_data_type as data_type, source_is_primary_key as is_primary_key,
-                   source_is_nullable as is_nullable, source_default_value as default_value,
-                   created_at, updated_at, created_by
-            FROM mapping_single 
-            WHERE source_malcode = ? AND source_table_name = ? AND is_active = 1
-            UNION
-            SELECT target_column_name as column_name, target_column_description as column_description,
-                   target_data_type as data_type, target_is_primary_key as is_primary_key,
-                   target_is_nullable as is_nullable, target_default_value as default_value,
-                   created_at, updated_at, created_by
-            FROM mapping_single 
-            WHERE target_malcode = ? AND target_table_name = ? AND is_active = 1
-        ) combined
-        GROUP BY column_name, column_description, data_type, is_primary_key, is_nullable, default_value, created_by
-        ORDER BY column_name
-    """, (malcode, table_name, malcode, table_name))
+        SELECT c.id, t.id, c.column_name, c.column_description, c.data_type, c.is_primary_key, c.is_nullable,
+               c.default_value, c.created_at, c.updated_at, c.created_by
+        FROM metadata_single c
+        LEFT JOIN metadata_single t
+            ON t.metadata_level = 'table' AND t.malcode = c.malcode AND t.table_name = c.table_name
+            AND t.is_active = 1
+        WHERE c.metadata_level = 'column' AND c.malcode = ? AND c.table_name = ? AND c.is_active = 1
+        ORDER BY c.column_name
+    """, (malcode, table_name))
     
     columns = []
     for row in cursor.fetchall():
         columns.append({
-            'id': str(uuid.uuid4()),  # Generate ID for compatibility
-            'table_id': str(uuid.uuid4()),  # Generate table_id for compatibility
-            'column_name': row[0],
-            'business_description': row[1],
-            'data_type': row[2],
-            'is_primary_key': row[3] or False,
-            'is_nullable': row[4] if row[4] is not None else True,
-            'default_value': row[5],
-            'created_at': row[6].isoformat() if row[6] else None,
-            'updated_at': row[7].isoformat() if row[7] else None,
-            'created_by': row[8],
+            'id': str(row[0]),
+            'table_id': str(row[1]) if row[1] else None,
+            'column_name': row[2],
+            'business_description': row[3],
+            'data_type': row[4],
+            'is_primary_key': row[5] or False,
+            'is_nullable': row[6] if row[6] is not None else True,
+            'default_value': row[7],
+            'created_at': row[8].isoformat() if row[8] else None,
+            'updated_at': row[9].isoformat() if row[9] else None,
+            'created_by': row[10],
             'is_active': True
         })
     
     return columns
 
+def _ensure_parent_metadata_single_table(cursor, malcodes: Dict[str, str], tables: Dict[Tuple[str, str], str]):
+    """Insert malcode and table level rows that are missing for the given keys (mapped to created_by)"""
+    # HOLDLOCK keeps the key range locked from the match to the insert, so concurrent saves referencing the same
+    # new malcode or table can't both insert it and fail on the unique index
+    if malcodes:
+        cursor.executemany("""
+            MERGE metadata_single WITH (HOLDLOCK) AS target
+            USING (SELECT ? AS malcode, ? AS created_by) AS source
+            ON target.metadata_level = 'malcode' AND target.malcode = source.malcode
+            WHEN MATCHED AND target.is_active = 0 THEN
+                UPDATE SET is_active = 1, updated_at = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (metadata_level, malcode, created_by, created_at, updated_at, is_active)
+                VALUES ('malcode', source.malcode, source.created_by, GETDATE(), GETDATE(), 1);
+        """, list(malcodes.items()))
+    
+    if tables:
+        cursor.executemany("""
+            MERGE metadata_single WITH (HOLDLOCK) AS target
+            USING (SELECT ? AS malcode, ? AS table_name, ? AS created_by) AS source
+            ON target.metadata_level = 'table' AND target.malcode = source.malcode
+               AND target.table_name = source.table_name
+            WHEN MATCHED AND target.is_active = 0 THEN
+                UPDATE SET is_active = 1, updated_at = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (metadata_level, malcode, table_name, created_by, created_at, updated_at, is_active)
+                VALUES ('table', source.malcode, source.table_name, source.created_by, GETDATE(), GETDATE(), 1);
+        """, [key + (created_by,) for key, created_by in tables.items()])
+
+def upsert_column_metadata_single_table(cursor, columns: List[Tuple[str, str, str, str, str]]):
+    """Insert any (malcode, table, column, data_type, created_by) entries missing from metadata_single.
+    
+    Missing malcode and table level rows are created as well. Existing entries keep their catalogue
+    descriptions; soft-deleted ones are reactivated. Does not commit - the caller owns the transaction.
+    """
+    # Deduplicate on the unique key so a single MERGE batch never touches the same target row twice
+    unique_columns = {}
+    malcodes = {}
+    tables = {}
+    for malcode, table_name, column_name, data_type, created_by in columns:
+        created_by = created_by or 'system'
+        unique_columns.setdefault((malcode, table_name, column_name), (data_type or 'string', created_by))
+        malcodes.setdefault(malcode, created_by)
+        tables.setdefault((malcode, table_name), created_by)
+    
+    if not unique_columns:
+        return
+    
+    cursor.fast_executemany = True
+    _ensure_parent_metadata_single_table(cursor, malcodes, tables)
+    # HOLDLOCK: see _ensure_parent_metadata_single_table
+    cursor.executemany("""
+        MERGE metadata_single WITH (HOLDLOCK) AS target
+        USING (SELECT ? AS malcode, ? AS table_name, ? AS column_name, ? AS data_type, ? AS created_by) AS source
+        ON target.metadata_level = 'column'
+           AND target.malcode = source.malcode
+           AND target.table_name = source.table_name
+           AND target.column_name = source.column_name
+        WHEN MATCHED AND target.is_active = 0 THEN
+            UPDATE SET is_active = 1, updated_at = GETDATE()
+        WHEN NOT MATCHED THEN
+            INSERT (metadata_level, malcode, table_name, column_name, data_type, created_by,
+                    created_at, updated_at, is_active)
+            VALUES ('column', source.malcode, source.table_name, source.column_name, source.data_type,
+                    source.created_by, GETDATE(), GETDATE(), 1);
+    """, [key + value for key, value in unique_columns.items()])
+
 def create_malcode_metadata_single_table(conn, malcode: str, description: str, created_by: str) -> str:
-    """Create a new malcode in the metadata_single table"""
+    """Create a new malcode in the metadata_single table and return its ID"""
     cursor = conn.cursor()
     
-    # Insert a new record in metadata_single table for the malcode
     cursor.execute("""
         INSERT INTO metadata_single (
-            malcode, malcode_description, table_name, column_name, 
-            data_type, created_by, created_at, updated_at, is_active
-        ) VALUES (?, ?, 'default_table', 'default_column', 'string', ?, GETDATE(), GETDATE(), 1)
+            metadata_level, malcode, malcode_description, created_by, created_at, updated_at, is_active
+        )
+        OUTPUT INSERTED.id
+        VALUES ('malcode', ?, ?, ?, GETDATE(), GETDATE(), 1)
     """, (malcode, description, created_by))
+    malcode_id = str(cursor.fetchone()[0])
     
     conn.commit()
-    return malcode
+    return malcode_id
 
 def create_table_metadata_single_table(conn, malcode: str, table_name: str, description: str, created_by: str) -> str:
-    """Create a new table in the metadata_single table"""
+    """Create a new table under an existing malcode in the metadata_single table and return its ID"""
     cursor = conn.cursor()
     
-    # Get the malcode description
-    malcode_desc = ""
-    cursor.execute("SELECT malcode_description FROM metadata_single WHERE malcode = ? LIMIT 1", (malcode,))
-    result = cursor.fetchone()
-    if result:
-        malcode_desc = result[0]
-    
-    # Insert a new record in metadata_single table for the table
     cursor.execute("""
         INSERT INTO metadata_single (
-            malcode, malcode_description, table_name, table_description, 
-            column_name, data_type, created_by, created_at, updated_at, is_active
-        ) VALUES (?, ?, ?, ?, 'default_column', 'string', ?, GETDATE(), GETDATE(), 1)
-    """, (malcode, malcode_desc, table_name, description, created_by))
+            metadata_level, malcode, malcode_description, table_name, table_description,
+            created_by, created_at, updated_at, is_active
+        )
+        OUTPUT INSERTED.id
+        SELECT 'table', malcode, malcode_description, ?, ?, ?, GETDATE(), GETDATE(), 1
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND malcode = ?
+    """, (table_name, description, created_by, malcode))
+    result = cursor.fetchone()
+    if not result:
+        conn.rollback()
+        raise ValueError(f"Malcode not found: {malcode}")
     
     conn.commit()
-    return f"{malcode}_{table_name}"
+    return str(result[0])
 
-def create_column_metadata_single_table(conn, malcode: str, table_name: str, column_name: str, 
-                                       data_type: str, description: str, is_primary_key: bool, 
+def create_column_metadata_single_table(conn, malcode: str, table_name: str, column_name: str,
+                                       data_type: str, description: str, is_primary_key: bool,
                                        is_nullable: bool, default_value: str, created_by: str) -> str:
-    """Create a new column in the metadata_single table"""
+    """Create a new column under an existing table in the metadata_single table and return its ID"""
     cursor = conn.cursor()
     
-    # Get the malcode and table descriptions
-    malcode_desc = ""
-    table_desc = ""
-    cursor.execute("""
-        SELECT malcode_description, table_description 
-        FROM metadata_single 
-        WHERE malcode = ? AND table_name = ? 
-        LIMIT 1
-    """, (malcode, table_name))
-    result = cursor.fetchone()
-    if result:
-        malcode_desc = result[0]
-        table_desc = result[1]
-    
-    # Insert a new record in metadata_single table for the column
     cursor.execute("""
         INSERT INTO metadata_single (
-            malcode, malcode_description, table_name, table_description,
-            column_name, column_description, data_type, is_primary_key, 
+            metadata_level, malcode, malcode_description, table_name, table_description,
+            column_name, column_description, data_type, is_primary_key,
             is_nullable, default_value, created_by, created_at, updated_at, is_active
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE(), 1)
-    """, (malcode, malcode_desc, table_name, table_desc, column_name, description, 
-          data_type, is_primary_key, is_nullable, default_value, created_by))
+        )
+        OUTPUT INSERTED.id
+        SELECT 'column', malcode, malcode_description, table_name, table_description,
+               ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE(), 1
+        FROM metadata_single
+        WHERE metadata_level = 'table' AND malcode = ? AND table_name = ?
+    """, (column_name, description, data_type, is_primary_key, is_nullable, default_value, created_by,
+          malcode, table_name))
+    result = cursor.fetchone()
+    if not result:
+        conn.rollback()
+        raise ValueError(f"Table not found: {malcode}.{table_name}")
     
     conn.commit()
-    return f"{malcode}_{table_name}_{column_name}"
+    return str(result[0])
+
+def bulk_merge_metadata_single_table(conn, rows: List[Tuple]) -> Tuple[int, int]:
+    """Set-based upsert of a batch of column metadata rows into metadata_single.
+    
+    Each row is (malcode, malcode_description, table_name, table_description, column_name,
+    column_description, data_type, is_primary_key, is_nullable, default_value, created_by) and
+    keys must be unique within the batch. Malcode and table level rows are merged from the same
+    batch. Returns the (inserted, updated) column counts and commits the batch.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        # Stage the batch in a session-scoped temp table, then MERGE it in one statement per level. HOLDLOCK keeps
+        # concurrent imports, and saves upserting the same keys, from both inserting a row and failing on the
+        # unique index
+        cursor.execute("""
+            IF OBJECT_ID('tempdb..#metadata_import') IS NULL
+                CREATE TABLE #metadata_import (
+                    malcode NVARCHAR(255) NOT NULL,
+                    malcode_description NVARCHAR(MAX),
+                    table_name NVARCHAR(255) NOT NULL,
+                    table_description NVARCHAR(MAX),
+                    column_name NVARCHAR(255) NOT NULL,
+                    column_description NVARCHAR(MAX),
+                    data_type NVARCHAR(100),
+                    is_primary_key BIT,
+                    is_nullable BIT,
+                    default_value NVARCHAR(MAX),
+                    created_by NVARCHAR(255) NOT NULL,
+                    PRIMARY KEY (malcode, table_name, column_name)
+                );
+            ELSE
+                TRUNCATE TABLE #metadata_import;
+        """)
+        
+        cursor.fast_executemany = True
+        cursor.executemany("""
+            INSERT INTO #metadata_import (
+                malcode, malcode_description, table_name, table_description, column_name,
+                column_description, data_type, is_primary_key, is_nullable, default_value, created_by
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        
+        cursor.execute("""
+            SET NOCOUNT ON;
+            DECLARE @actions TABLE (merge_action NVARCHAR(10));
+            
+            MERGE metadata_single WITH (HOLDLOCK) AS target
+            USING (
+                SELECT malcode, MAX(malcode_description) AS malcode_description, MIN(created_by) AS created_by
+                FROM #metadata_import
+                GROUP BY malcode
+            ) AS source
+            ON target.metadata_level = 'malcode' AND target.malcode = source.malcode
+            WHEN MATCHED THEN
+                UPDATE SET
+                    malcode_description = COALESCE(source.malcode_description, target.malcode_description),
+                    is_active = 1,
+                    updated_at = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (metadata_level, malcode, malcode_description, created_by, created_at, updated_at, is_active)
+                VALUES ('malcode', source.malcode, source.malcode_description, source.created_by,
+                        GETDATE(), GETDATE(), 1);
+            
+            MERGE metadata_single WITH (HOLDLOCK) AS target
+            USING (
+                SELECT malcode, table_name, MAX(malcode_description) AS malcode_description,
+                       MAX(table_description) AS table_description, MIN(created_by) AS created_by
+                FROM #metadata_import
+                GROUP BY malcode, table_name
+            ) AS source
+            ON target.metadata_level = 'table' AND target.malcode = source.malcode
+               AND target.table_name = source.table_name
+            WHEN MATCHED THEN
+                UPDATE SET
+                    malcode_description = COALESCE(source.malcode_description, target.malcode_description),
+                    table_description = COALESCE(source.table_description, target.table_description),
+                    is_active = 1,
+                    updated_at = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (metadata_level, malcode, malcode_description, table_name, table_description,
+                        created_by, created_at, updated_at, is_active)
+                VALUES ('table', source.malcode, source.malcode_description, source.table_name,
+                        source.table_description, source.created_by, GETDATE(), GETDATE(), 1);
+            
+            MERGE metadata_single WITH (HOLDLOCK) AS target
+            USING #metadata_import AS source
+            ON target.metadata_level = 'column'
+               AND target.malcode = source.malcode
+               AND target.table_name = source.table_name
+               AND target.column_name = source.column_name
+            WHEN MATCHED THEN
+                UPDATE SET
+                    malcode_description = COALESCE(source.malcode_description, target.malcode_description),
+                    table_description = COALESCE(source.table_description, target.table_description),
+                    column_description = COALESCE(source.column_description, target.column_description),
+                    data_type = COALESCE(source.data_type, target.data_type),
+                    is_primary_key = COALESCE(source.is_primary_key, target.is_primary_key),
+                    is_nullable = COALESCE(source.is_nullable, target.is_nullable),
+                    default_value = COALESCE(source.default_value, target.default_value),
+                    is_active = 1,
+                    updated_at = GETDATE()
+            WHEN NOT MATCHED THEN
+                INSERT (metadata_level, malcode, malcode_description, table_name, table_description, column_name,
+                        column_description, data_type, is_primary_key, is_nullable, default_value,
+                        created_by, created_at, updated_at, is_active)
+                VALUES ('column', source.malcode, source.malcode_description, source.table_name,
+                        source.table_description, source.column_name, source.column_description,
+                        COALESCE(source.data_type, 'string'), COALESCE(source.is_primary_key, 0),
+                        COALESCE(source.is_nullable, 1), source.default_value,
+                        source.created_by, GETDATE(), GETDATE(), 1)
+            OUTPUT $action INTO @actions;
+            
+            SELECT
+                COALESCE(SUM(CASE WHEN merge_action = 'INSERT' THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN merge_action = 'UPDATE' THEN 1 ELSE 0 END), 0)
+            FROM @actions;
+        """)
+        counts = cursor.fetchone()
+        
+        conn.commit()
+        return counts[0], counts[1]
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -0,0 +1,194 @@
+
+from typing import List, Dict, Any, Tuple, Optional
+import logging
+from fastapi import HTTPException
+
+from fast_json import loads, paused_gc
+from mapping_revisions import (
+    REVISION_ROW_COLUMNS, REVISION_FILE_FIELDS, revision_row_keys, revision_row, diff_revision_rows
+)
+
+logger = logging.getLogger(__name__)
+
+def record_mapping_file_revision_single_table(cursor, file_name: str, created_by: Optional[str], source: str,
+                                              restored_from: Optional[int] = None) -> Optional[int]:
+    """Record a mapping file's active rows as its next revision and return the revision number.
+    
+    Only rows that are new since the previous revision are stored, and rows that are gone are marked removed,
+    so history grows with the size of the changes rather than the file. Returns the previous revision if nothing
+    changed, and None for a file with no rows and no history. Does not commit - call it in the transaction that
+    writes the rows.
+    """
+    # Holds the file's key range until commit, so concurrent saves of the file take revision numbers in turn
+    cursor.execute("""
+        SELECT MAX(revision) FROM mapping_file_revisions WITH (UPDLOCK, HOLDLOCK) WHERE mapping_file_name = ?
+    """, (file_name,))
+    head = cursor.fetchone()[0]
+    cursor.execute(f"""
+        SELECT mapping_file_description, source_system, target_system, {REVISION_ROW_COLUMNS}
+        FROM mapping_single
+        WHERE mapping_file_name = ? AND is_active = 1
+    """, (file_name,))
+    rows = cursor.fetchall()
+    file_fields = tuple(rows[0][:3]) if rows else (None, None, None)
+    current = revision_row_keys(tuple(row)[3:] for row in rows)
+    
+    cursor.execute("""
+        SELECT id, row_key FROM mapping_file_revision_rows WHERE mapping_file_name = ? AND removed_in IS NULL
+    """, (file_name,))
+    live = {row_key: int(row_id) for row_id, row_key in cursor.fetchall()}
+    added = [(row_key, data) for row_key, data in current.items() if row_key not in live]
+    removed = [row_id for row_key, row_id in live.items() if row_key not in current]
+    
+    if head is None:
+        if not rows:
+            return None
+    elif not added and not removed:
+        cursor.execute(f"""
+            SELECT {', '.join(REVISION_FILE_FIELDS)} FROM mapping_file_revisions
+            WHERE mapping_file_name = ? AND revision = ?
+        """, (file_name, head))
+        if tuple(cursor.fetchone()) == file_fields:
+            return head
+    
+    revision = (head or 0) + 1
+    cursor.execute(f"""
+        INSERT INTO mapping_file_revisions (
+            mapping_file_name, revision, {', '.join(REVISION_FILE_FIELDS)}, row_count, rows_added, rows_removed,
+            source, restored_from, created_by
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (file_name, revision, *file_fields, len(rows), len(added), len(removed), source, restored_from, created_by))
+    cursor.fast_executemany = True
+    cursor.executemany("""
+        INSERT INTO mapping_file_revision_rows (mapping_file_name, row_key, added_in, row_data) VALUES (?, ?, ?, ?)
+    """, [(file_name, row_key, revision, data) for row_key, data in added])
+    cursor.executemany("UPDATE mapping_file_revision_rows SET removed_in = ? WHERE id = ?",
+                       [(revision, row_id) for row_id in removed])
+    
+    logger.info(f"Recorded revision {revision} of {file_name}: {len(added)} rows added, {len(removed)} removed")
+    return revision
+
+def _revision_from_row(file_name: str, row) -> Dict[str, Any]:
+    return {
+        'name': file_name,
+        'revision': row[0],
+        'description': row[1],
+        'source_system': row[2],
+        'target_system': row[3],
+        'row_count': row[4],
+        'rows_added': row[5],
+        'rows_removed': row[6],
+        'source': row[7],
+        'restored_from': row[8],
+        'created_by': row[9],
+        'created_at': row[10].isoformat() if row[10] else None
+    }
+
+def _get_revision(cursor, file_name: str, revision: int) -> Dict[str, Any]:
+    cursor.execute(f"""
+        SELECT revision, {', '.join(REVISION_FILE_FIELDS)}, row_count, rows_added, rows_removed, source,
+               restored_from, created_by, created_at
+        FROM mapping_file_revisions
+        WHERE mapping_file_name = ? AND revision = ?
+    """, (file_name, revision))
+    row = cursor.fetchone()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Revision {revision} of mapping file {file_name} not found")
+    return _revision_from_row(file_name, row)
+
+def get_mapping_file_revisions_single_table(conn, file_name: str, limit: int = 50,
+                                            before: Optional[int] = None) -> Dict[str, Any]:
+    """Get a page of a mapping file's revisions, newest first, without their rows.
+    
+    Pass the returned next_before as before to get the next (older) page; it is None on the last page.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT TOP (?) revision, {', '.join(REVISION_FILE_FIELDS)}, row_count, rows_added, rows_removed, source,
+               restored_from, created_by, created_at
+        FROM mapping_file_revisions
+        WHERE mapping_file_name = ?{" AND revision < ?" if before is not None else ""}
+        ORDER BY revision DESC
+    """, (limit + 1, file_name, *([before] if before is not None else [])))
+    rows = cursor.fetchall()
+    
+    revisions = [_revision_from_row(file_name, row) for row in rows[:limit]]
+    return {
+        'revisions': revisions,
+        'next_before': revisions[-1]['revision'] if len(rows) > limit else None
+    }
+
+def _iter_revision_row_data(cursor, file_name: str, revision: int):
+    # Rows added at or before the revision and not removed by it
+    cursor.execute("""
+        SELECT row_data
+        FROM mapping_file_revision_rows
+        WHERE mapping_file_name = ? AND added_in <= ? AND (removed_in IS NULL OR removed_in > ?)
+        ORDER BY id
+    """, (file_name, revision, revision))
+    for (data,) in cursor:
+        yield loads(data)
+
+def get_mapping_file_revision_single_table(conn, file_name: str, revision: int) -> Dict[str, Any]:
+    """Get a revision of a mapping file with the rows it had; raises a 404 if there is no such revision"""
+    cursor = conn.cursor()
+    content = _get_revision(cursor, file_name, revision)
+    with paused_gc():
+        content['rows'] = [revision_row(values) for values in _iter_revision_row_data(cursor, file_name, revision)]
+    return content
+
+def get_mapping_file_revision_rows_single_table(cursor, file_name: str, revision: int) -> List[Tuple]:
+    """Get the rows a revision of a mapping file had, as bulk_insert_mapping_rows_single_table rows.
+    
+    Raises a 404 if there is no such revision. Does not commit.
+    """
+    content = _get_revision(cursor, file_name, revision)
+    file_fields = (file_name, content['description'], content['source_system'], content['target_system'])
+    return [file_fields + tuple(values) for values in _iter_revision_row_data(cursor, file_name, revision)]
+
+def diff_mapping_file_revisions_single_table(conn, file_name: str, from_revision: int,
+                                             to_revision: int) -> Dict[str, Any]:
+    """Compare two revisions of a mapping file.
+    
+    Only rows added or removed between the two are read, so the cost follows the size of the change. Returns
+    the file fields that differ, the rows to_revision has that from_revision doesn't (added), the reverse
+    (removed), and rows whose target column was remapped (changed). Raises a 404 if either revision is missing.
+    """
+    cursor = conn.cursor()
+    revisions = (_get_revision(cursor, file_name, from_revision), _get_revision(cursor, file_name, to_revision))
+    low, high = sorted((from_revision, to_revision))
+    # Rows added in (low, high], and rows from before low that were removed in (low, high]
+    cursor.execute("""
+        SELECT added_in, removed_in, row_data
+        FROM mapping_file_revision_rows
+        WHERE mapping_file_name = ? AND added_in > ? AND added_in <= ?
+        UNION ALL
+        SELECT added_in, removed_in, row_data
+        FROM mapping_file_revision_rows
+        WHERE mapping_file_name = ? AND removed_in > ? AND removed_in <= ? AND added_in <= ?
+    """, (file_name, low, high, file_name, low, high, low))
+    
+    def present(added_in, removed_in, revision):
+        return added_in <= revision and (removed_in is None or removed_in > revision)
+    
+    added, removed = [], []
+    for added_in, removed_in, data in cursor.fetchall():
+        in_from = present(added_in, removed_in, from_revision)
+        in_to = present(added_in, removed_in, to_revision)
+        if in_to and not in_from:
+            added.append(revision_row(loads(data)))
+        elif in_from and not in_to:
+            removed.append(revision_row(loads(data)))
+    
+    rows = diff_revision_rows(added, removed)
+    return {
+        'name': file_name,
+        'from_revision': from_revision,
+        'to_revision': to_revision,
+        'file_changes': {field: {'from': revisions[0][field], 'to': revisions[1][field]}
+                         for field in REVISION_FILE_FIELDS if revisions[0][field] != revisions[1][field]},
+        'rows_added': len(rows['added']),
+        'rows_removed': len(rows['removed']),
+        'rows_changed': len(rows['changed']),
+        **rows
+    }
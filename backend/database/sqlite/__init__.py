@@ -0,0 +1,3 @@
+
+# Embedded SQLite storage backend, selected with DATABASE_BACKEND=sqlite.
+# Each module mirrors the SQL Server module of the same name in database/.
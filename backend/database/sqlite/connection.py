@@ -0,0 +1,103 @@
+
+import os
+import time
+import sqlite3
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+from fastapi import HTTPException
+import logging
+
+from instrumentation import InstrumentedConnection
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                           "sql", "sqlite", "create_schema.sql")
+
+# Store datetimes as ISO 8601 text and read TIMESTAMP columns back as datetimes, like pyodbc does
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+_initialized_paths = set()
+_schema_lock = threading.Lock()
+
+def _upgrade_schema(conn):
+    """Add columns introduced after a database file was created; CREATE TABLE IF NOT EXISTS skips them"""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(mapping_single)").fetchall()}
+    if columns and 'row_version' not in columns:
+        conn.execute("ALTER TABLE mapping_single ADD COLUMN row_version INTEGER NOT NULL DEFAULT 0")
+        # rowid is unique and monotonic enough to seed distinct versions for the existing rows
+        conn.execute("UPDATE mapping_single SET row_version = rowid")
+        conn.commit()
+
+def _ensure_schema(conn, database_path: str):
+    """Create the schema the first time this process opens a database file"""
+    if database_path in _initialized_paths:
+        return
+    with _schema_lock:
+        if database_path in _initialized_paths:
+            return
+        _upgrade_schema(conn)
+        with open(SCHEMA_PATH, 'r', encoding='utf-8') as file:
+            conn.executescript(file.read())
+        # WAL lets readers run alongside the single writer; it is persisted in the database file
+        conn.execute("PRAGMA journal_mode = WAL")
+        _initialized_paths.add(database_path)
+        logger.info(f"SQLite database ready: {database_path}")
+
+@contextmanager
+def get_db_connection():
+    """Get a connection to the embedded SQLite database, creating its schema if needed"""
+    from config import SQLITE_DATABASE_PATH
+    
+    try:
+        started = time.perf_counter()
+        conn = InstrumentedConnection(
+            sqlite3.connect(SQLITE_DATABASE_PATH, detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+                            check_same_thread=False, timeout=30),
+            time.perf_counter() - started
+        )
+        conn.execute("PRAGMA synchronous = NORMAL")
+        # Off by default in SQLite; mapping_row_comments relies on ON DELETE CASCADE
+        conn.execute("PRAGMA foreign_keys = ON")
+        _ensure_schema(conn, SQLITE_DATABASE_PATH)
+    except Exception as e:
+        if 'conn' in locals():
+            conn.close()
+        logger.error(f"Database connection failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
+    
+    # Errors raised by the caller propagate unchanged so routes can map them to their own responses
+    try:
+        yield conn
+    finally:
+        try:
+            # A write that failed partway leaves its transaction open, holding the database's write lock
+            conn.rollback()
+        finally:
+            conn.close()
+
+# SQLite instructions between checks of the statement deadline
+_PROGRESS_HANDLER_INSTRUCTIONS = 10000
+
+def set_statement_timeout(conn, seconds: int):
+    """Abort any single statement on this connection that runs longer than seconds"""
+    # SQLite has no query timeout; the trace callback restarts the clock as each statement begins and the
+    # progress handler interrupts the statement (sqlite3.OperationalError 'interrupted') once it runs over
+    deadline = [time.monotonic() + seconds]
+    
+    def restart_clock(statement):
+        deadline[0] = time.monotonic() + seconds
+    
+    conn.set_trace_callback(restart_clock)
+    conn.set_progress_handler(lambda: time.monotonic() > deadline[0], _PROGRESS_HANDLER_INSTRUCTIONS)
+
+def set_autocommit(conn):
+    """Commit each statement on this connection as it completes"""
+    # Python 3.11's sqlite3 has no autocommit attribute; no isolation level means no implicit BEGIN
+    conn.isolation_level = None
+
+def is_statement_timeout(error: Exception) -> bool:
+    """Whether error was raised because a statement exceeded the set_statement_timeout limit"""
+    return isinstance(error, sqlite3.OperationalError) and str(error) == 'interrupted'
@@ -0,0 +1,98 @@
+
+# SQLite implementation of database/job_operations.py
+
+import json
+from typing import List, Dict, Any, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+_JOB_COLUMNS = """
+    id, job_type, operation, status, statement_count, statements_completed, statement_timeout_seconds,
+    transactional, submitted_by, submitted_at, started_at, finished_at, error_message
+"""
+
+def _job_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': str(row[0]),
+        'job_type': row[1],
+        'operation': row[2],
+        'status': row[3],
+        'statement_count': row[4],
+        'statements_completed': row[5],
+        'statement_timeout_seconds': row[6],
+        'transactional': bool(row[7]),
+        'submitted_by': row[8],
+        'submitted_at': row[9].isoformat() if row[9] else None,
+        'started_at': row[10].isoformat() if row[10] else None,
+        'finished_at': row[11].isoformat() if row[11] else None,
+        'error': row[12]
+    }
+
+def insert_sql_job(conn, job: Dict[str, Any], sql_script: str):
+    """Record a newly submitted job in the job history"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO sql_jobs (
+            id, job_type, operation, status, sql_script, statement_count, statement_timeout_seconds,
+            transactional, submitted_by
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (
+        job['id'], job['job_type'], job['operation'], job['status'], sql_script, job['statement_count'],
+        job['statement_timeout_seconds'], job['transactional'], job['submitted_by']
+    ))
+    conn.commit()
+
+def update_sql_job(conn, job: Dict[str, Any], results: Optional[List[Dict[str, Any]]] = None):
+    """Persist a job's status and progress, and its results once it has finished"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE sql_jobs
+        SET status = ?, statements_completed = ?, started_at = ?, finished_at = ?, error_message = ?,
+            results = COALESCE(?, results)
+        WHERE id = ?
+    """, (
+        job['status'], job['statements_completed'], job['started_at'], job['finished_at'], job['error'],
+        json.dumps(results, default=str) if results is not None else None,
+        job['id']
+    ))
+    conn.commit()
+
+def get_sql_job(conn, job_id: str, include_results: bool = False) -> Optional[Dict[str, Any]]:
+    """Get a job from the job history by ID"""
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT {_JOB_COLUMNS}, results
+        FROM sql_jobs
+        WHERE id = ?
+    """, (job_id,))
+    
+    row = cursor.fetchone()
+    if not row:
+        return None
+    
+    job = _job_from_row(row)
+    if include_results:
+        job['results'] = json.loads(row[13]) if row[13] else []
+    return job
+
+def list_sql_jobs(conn, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """List the most recently submitted jobs, optionally filtered by status"""
+    cursor = conn.cursor()
+    if status:
+        cursor.execute(f"""
+            SELECT {_JOB_COLUMNS}
+            FROM sql_jobs
+            WHERE status = ?
+            ORDER BY submitted_at DESC
+            LIMIT ?
+        """, (status, limit))
+    else:
+        cursor.execute(f"""
+            SELECT {_JOB_COLUMNS}
+            FROM sql_jobs
+            ORDER BY submitted_at DESC
+            LIMIT ?
+        """, (limit,))
+    
+    return [_job_from_row(row) for row in cursor.fetchall()]
@@ -0,0 +1,774 @@
+
+# SQLite implementation of database/mapping_operations.py
+
+import uuid
+from datetime import datetime
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+import logging
+from fastapi import HTTPException
+
+from models import MappingFileRequest
+from fast_json import loads, paused_gc
+from mapping_revisions import REVISION_ROW_COLUMNS, revision_content_keys
+from .metadata_operations import upsert_column_metadata_single_table
+from .change_log_operations import record_mapping_changes_single_table
+from .revision_operations import record_mapping_file_revision_single_table, get_mapping_file_revision_rows_single_table
+
+logger = logging.getLogger(__name__)
+
+def save_mapping_file_to_single_table(conn, mapping_file: MappingFileRequest,
+                                      expected_versions: Optional[List[str]] = None
+                                      ) -> Tuple[str, Optional[str], Optional[int]]:
+    """Save mapping file and all its rows to the single mapping table, recording the result as a new revision.
+    
+    With expected_versions the save only goes ahead if the file's current version is one of them ('*' matches
+    any existing file), and raises a 409 otherwise. Returns a file ID, the file's new version and its revision.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        if expected_versions is not None:
+            # Take the write lock first, so the file can't change between the check and the rewrite
+            if not conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            current = _mapping_file_versions(cursor, [mapping_file.name]).get(mapping_file.name)
+            if current is None or ('*' not in expected_versions and current not in expected_versions):
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Mapping file {mapping_file.name} has changed since it was loaded; reload it and try again"
+                )
+        
+        # Delete existing mappings for this file
+        cursor.execute("DELETE FROM mapping_single WHERE mapping_file_name = ?", (mapping_file.name,))
+        
+        # Insert all mapping rows
+        first_version = _reserve_row_versions(cursor, len(mapping_file.rows))
+        for offset, row in enumerate(mapping_file.rows):
+            row_id = str(uuid.uuid4())
+            cursor.execute("""
+                INSERT INTO mapping_single (
+                    id, mapping_file_name, mapping_file_description, source_system, target_system, mapping_status,
+                    source_malcode, source_table_name, source_column_name, source_data_type, source_type,
+                    target_malcode, target_table_name, target_column_name, target_data_type, target_type,
+                    transformation, join_clause, created_by, row_version
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                row_id, mapping_file.name, mapping_file.description, mapping_file.sourceSystem, mapping_file.targetSystem, mapping_file.status,
+                row.sourceColumn.malcode, row.sourceColumn.table, row.sourceColumn.column, row.sourceColumn.dataType, row.sourceColumn.sourceType,
+                row.targetColumn.malcode, row.targetColumn.table, row.targetColumn.column, row.targetColumn.dataType, row.targetColumn.targetType,
+                row.transformation, row.join, row.createdBy, first_version + offset
+            ))
+        
+        # Register every referenced source/target column in the metadata catalogue
+        referenced_columns = []
+        for row in mapping_file.rows:
+            referenced_columns.append((row.sourceColumn.malcode, row.sourceColumn.table, row.sourceColumn.column,
+                                       row.sourceColumn.dataType, row.createdBy))
+            referenced_columns.append((row.targetColumn.malcode, row.targetColumn.table, row.targetColumn.column,
+                                       row.targetColumn.dataType, row.createdBy))
+        upsert_column_metadata_single_table(cursor, referenced_columns)
+        
+        revision = record_mapping_file_revision_single_table(cursor, mapping_file.name, mapping_file.createdBy, 'save')
+        version = _mapping_file_versions(cursor, [mapping_file.name]).get(mapping_file.name)
+        record_mapping_changes_single_table(cursor, [('file_saved', mapping_file.name, None, {
+            'version': version, 'row_count': len(mapping_file.rows), 'source': 'save', 'revision': revision
+        })])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return str(uuid.uuid4()), version, revision  # A file ID, the new version and the revision it was saved as
+
+def rollback_mapping_file_single_table(conn, file_name: str, revision: int, created_by: Optional[str] = None
+                                       ) -> Dict[str, Any]:
+    """Bring a mapping file's rows back to the ones an earlier revision had, recorded as a new revision.
+    
+    Rows are matched to the revision's rows by their mapping: rows the revision also has are kept with their ids,
+    status, reviewer and comments, and only the others are removed or inserted, so rolling back to the file's
+    current content changes nothing. Raises a 404 if there is no such revision. Returns the file's revision
+    afterwards, its version and its row count.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        # Take the write lock first, so no save can change the rows being matched
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        rows = get_mapping_file_revision_rows_single_table(cursor, file_name, revision)
+        cursor.execute(f"""
+            SELECT id, mapping_file_description, source_system, target_system, {REVISION_ROW_COLUMNS}
+            FROM mapping_single
+            WHERE mapping_file_name = ? AND is_active = 1
+        """, (file_name,))
+        live = cursor.fetchall()
+        live_ids = dict(zip(revision_content_keys(row[4:] for row in live), (row[0] for row in live)))
+        row_keys = revision_content_keys(row[4:] for row in rows)
+        kept_keys = set(row_keys)
+        removed = [row_id for row_key, row_id in live_ids.items() if row_key not in kept_keys]
+        added = [row for row_key, row in zip(row_keys, rows) if row_key not in live_ids]
+        file_fields = rows[0][1:4] if rows else None
+        removed_ids = set(removed)
+        fields_changed = file_fields is not None and any(
+            tuple(row[1:4]) != file_fields for row in live if row[0] not in removed_ids
+        )
+        
+        if removed:
+            cursor.executemany("DELETE FROM mapping_single WHERE id = ?", [(row_id,) for row_id in removed])
+        if fields_changed:
+            cursor.execute("""
+                UPDATE mapping_single
+                SET mapping_file_description = ?, source_system = ?, target_system = ?,
+                    updated_at = CURRENT_TIMESTAMP, row_version = ?
+                WHERE mapping_file_name = ? AND is_active = 1
+            """, (*file_fields, _reserve_row_versions(cursor, 1), file_name))
+        bulk_insert_mapping_rows_single_table(cursor, added)
+        # Columns may have been dropped from the catalogue since the revision was saved
+        referenced_columns = []
+        for row in added:
+            referenced_columns.append((row[5], row[6], row[7], row[8], row[17]))
+            referenced_columns.append((row[10], row[11], row[12], row[13], row[17]))
+        upsert_column_metadata_single_table(cursor, referenced_columns)
+        
+        new_revision = record_mapping_file_revision_single_table(cursor, file_name, created_by, 'rollback', revision)
+        version = _mapping_file_versions(cursor, [file_name]).get(file_name)
+        if removed or added or fields_changed:
+            record_mapping_changes_single_table(cursor, [('file_saved', file_name, None, {
+                'version': version, 'row_count': len(rows), 'source': 'rollback', 'revision': new_revision,
+                'restored_from': revision
+            })])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    logger.info(f"Rolled back {file_name} to revision {revision} as revision {new_revision}: "
+                f"{len(added)} rows added, {len(removed)} removed")
+    return {'revision': new_revision, 'restored_from': revision, 'version': version, 'row_count': len(rows)}
+
+def _reserve_row_versions(cursor, count: int) -> int:
+    """Take count new row versions from the database-wide counter and return the first.
+    
+    Does not commit; the reservation is part of the caller's write transaction.
+    """
+    cursor.execute("UPDATE mapping_row_version SET value = value + ? RETURNING value", (count,))
+    return cursor.fetchone()[0] - count + 1
+
+def delete_mapping_file_rows_single_table(cursor, file_name: str) -> int:
+    """Delete every row of a mapping file and return how many were deleted.
+    
+    Does not commit - the caller owns the transaction.
+    """
+    cursor.execute("DELETE FROM mapping_single WHERE mapping_file_name = ?", (file_name,))
+    return cursor.rowcount
+
+def bulk_insert_mapping_rows_single_table(cursor, rows: List[Tuple]) -> int:
+    """Insert a batch of mapping rows in one round trip and return how many were inserted.
+    
+    Each row is (mapping_file_name, mapping_file_description, source_system, target_system, mapping_status,
+    source_malcode, source_table_name, source_column_name, source_data_type, source_type, target_malcode,
+    target_table_name, target_column_name, target_data_type, target_type, transformation, join_clause,
+    created_by, comments). Does not commit - the caller owns the transaction.
+    """
+    if not rows:
+        return 0
+    
+    first_version = _reserve_row_versions(cursor, len(rows))
+    cursor.executemany("""
+        INSERT INTO mapping_single (
+            mapping_file_name, mapping_file_description, source_system, target_system, mapping_status,
+            source_malcode, source_table_name, source_column_name, source_data_type, source_type,
+            target_malcode, target_table_name, target_column_name, target_data_type, target_type,
+            transformation, join_clause, created_by, comments, row_version
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, [row + (first_version + offset,) for offset, row in enumerate(rows)])
+    return len(rows)
+
+def load_mapping_files_from_single_table(conn, file_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Load the given mapping files (all when None) with their rows from the single table"""
+    if file_names is not None and not file_names:
+        return []
+    cursor = conn.cursor()
+    name_filter, params = _file_name_filter(file_names)
+    
+    # Get all unique mapping files
+    cursor.execute(f"""
+        SELECT mapping_file_name, mapping_file_description, source_system, target_system, mapping_status,
+               created_by, MIN(created_at) AS "created_at [TIMESTAMP]", MAX(updated_at) AS "updated_at [TIMESTAMP]"
+        FROM mapping_single
+        WHERE is_active = 1{name_filter}
+        GROUP BY mapping_file_name, mapping_file_description, source_system, target_system, mapping_status, created_by
+    """, params)
+    
+    file_rows = cursor.fetchall()
+    
+    # All files' rows in one query rather than one query per file, read straight off the cursor
+    cursor.execute(f"""
+        SELECT mapping_file_name, id, source_malcode, source_table_name, source_column_name, source_data_type,
+               source_type, target_malcode, target_table_name, target_column_name, target_data_type, target_type,
+               transformation, join_clause, mapping_status, created_by, created_at, updated_at,
+               reviewer, reviewed_at, comments, row_version
+        FROM mapping_single
+        WHERE is_active = 1{name_filter}
+    """, params)
+    
+    rows_by_file: Dict[str, List[Dict[str, Any]]] = {}
+    # The listing can be 100k rows of dicts, which the garbage collector would keep re-examining
+    with paused_gc():
+        for (file_name, row_id, source_malcode, source_table, source_column, source_data_type, source_type,
+             target_malcode, target_table, target_column, target_data_type, target_type, transformation, join_clause,
+             status, created_by, created_at, updated_at, reviewer, reviewed_at, comments, version) in cursor:
+            rows = rows_by_file.get(file_name)
+            if rows is None:
+                rows = rows_by_file[file_name] = []
+            rows.append({
+                'id': str(row_id),
+                'sourceColumn': {
+                    'malcode': source_malcode,
+                    'table': source_table,
+                    'column': source_column,
+                    'dataType': source_data_type,
+                    'sourceType': source_type
+                },
+                'targetColumn': {
+                    'malcode': target_malcode,
+                    'table': target_table,
+                    'column': target_column,
+                    'dataType': target_data_type,
+                    'targetType': target_type
+                },
+                'transformation': transformation,
+                'join': join_clause,
+                'status': status,
+                'createdBy': created_by,
+                'createdAt': created_at.isoformat() if created_at else None,
+                'updatedAt': updated_at.isoformat() if updated_at else None,
+                'reviewer': reviewer,
+                'reviewedAt': reviewed_at.isoformat() if reviewed_at else None,
+                # Most rows have no annotations, so skip parsing the empty list
+                'comments': loads(comments) if comments and comments != '[]' else [],
+                'version': version
+            })
+    
+    files = []
+    for file_row in file_rows:
+        file_name = file_row[0]
+        rows = rows_by_file.get(file_name, [])
+        
+        files.append({
+            'id': str(uuid.uuid4()),  # Generate a temporary ID
+            'name': file_name,
+            'description': file_row[1],
+            'sourceSystem': file_row[2],
+            'targetSystem': file_row[3],
+            'status': file_row[4],
+            'createdBy': file_row[5],
+            'createdAt': file_row[6].isoformat() if file_row[6] else None,
+            'updatedAt': file_row[7].isoformat() if file_row[7] else None,
+            # Same value get_mapping_file_versions_single_table reports, but consistent with the rows returned
+            'version': _mapping_file_version(len(rows), max(row['version'] for row in rows)) if rows else None,
+            'rows': rows
+        })
+    
+    return files
+
+def _file_name_filter(file_names: Optional[List[str]]) -> Tuple[str, List[str]]:
+    if file_names is None:
+        return "", []
+    return f" AND mapping_file_name IN ({', '.join('?' * len(file_names))})", list(file_names)
+
+def get_mapping_file_versions_single_table(conn, file_names: Optional[List[str]] = None) -> Dict[str, str]:
+    """Get a version string per active mapping file that changes whenever any of its rows do.
+    
+    Covers all files when file_names is None; files that don't exist are left out.
+    """
+    if file_names is not None and not file_names:
+        return {}
+    return _mapping_file_versions(conn.cursor(), file_names)
+
+def _mapping_file_version(row_count: int, max_row_version: int) -> str:
+    # Row versions only grow, so any insert or update raises the maximum and any removal lowers the count
+    return f"{row_count}-{max_row_version}"
+
+def _mapping_file_versions(cursor, file_names: Optional[List[str]]) -> Dict[str, str]:
+    name_filter, params = _file_name_filter(file_names)
+    cursor.execute(f"""
+        SELECT mapping_file_name, COUNT(*), MAX(row_version)
+        FROM mapping_single
+        WHERE is_active = 1{name_filter}
+        GROUP BY mapping_file_name
+    """, params)
+    return {row[0]: _mapping_file_version(row[1], row[2]) for row in cursor.fetchall()}
+
+def iter_mapping_rows_single_table(conn, file_names: Optional[List[str]] = None,
+                                   batch_size: int = 1000) -> Iterator[Tuple]:
+    """Stream the active rows of the given mapping files (all when None), ordered by file, without
+    loading them all into memory.
+    
+    Each row is (mapping_file_name, source_malcode, source_table_name, source_column_name, source_data_type,
+    source_type, target_malcode, target_table_name, target_column_name, target_data_type, target_type,
+    transformation, join_clause, mapping_status, reviewer, reviewed_at, created_by, created_at, updated_at).
+    """
+    if file_names is not None and not file_names:
+        return
+    cursor = conn.cursor()
+    name_filter, params = _file_name_filter(file_names)
+    cursor.execute(f"""
+        SELECT mapping_file_name, source_malcode, source_table_name, source_column_name, source_data_type, source_type,
+               target_malcode, target_table_name, target_column_name, target_data_type, target_type,
+               transformation, join_clause, mapping_status, reviewer, reviewed_at, created_by, created_at, updated_at
+        FROM mapping_single
+        WHERE is_active = 1{name_filter}
+        ORDER BY mapping_file_name, created_at, id
+    """, params)
+    
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+def iter_lineage_edges_single_table(conn, file_names: Optional[List[str]] = None,
+                                    batch_size: int = 5000) -> Iterator[Tuple]:
+    """Stream the source -> target column edges of the given mapping files (all when None).
+    
+    Each edge is (mapping_file_name, source_malcode, source_table_name, source_column_name,
+    target_malcode, target_table_name, target_column_name).
+    """
+    if file_names is not None and not file_names:
+        return
+    cursor = conn.cursor()
+    name_filter, params = _file_name_filter(file_names)
+    cursor.execute(f"""
+        SELECT mapping_file_name, source_malcode, source_table_name, source_column_name,
+               target_malcode, target_table_name, target_column_name
+        FROM mapping_single
+        WHERE is_active = 1{name_filter}
+    """, params)
+    
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+def _stage_source_columns(cursor, columns: List[Tuple[str, str, str]]):
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS impact_columns (
+            malcode TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            PRIMARY KEY (malcode, table_name, column_name)
+        )
+    """)
+    cursor.execute("DELETE FROM temp.impact_columns")
+    cursor.executemany("INSERT INTO temp.impact_columns (malcode, table_name, column_name) VALUES (?, ?, ?)", columns)
+
+def count_mappings_by_source_columns_single_table(conn, columns: List[Tuple[str, str, str]]) -> List[Tuple]:
+    """Count the active mapping rows and files reading each of the given (malcode, table, column) sources.
+    
+    Returns (malcode, table_name, column_name, row_count, file_count) in the caller's spelling, ordered by
+    column; columns no mapping reads are left out. Keys must be unique within the batch. Names are
+    compared case-sensitively, unlike on SQL Server.
+    """
+    if not columns:
+        return []
+    cursor = conn.cursor()
+    _stage_source_columns(cursor, columns)
+    # CROSS JOIN keeps the staged columns as the outer loop, so each one is a seek on the source column index
+    cursor.execute("""
+        SELECT c.malcode, c.table_name, c.column_name, COUNT(*), COUNT(DISTINCT m.mapping_file_name)
+        FROM temp.impact_columns c
+        CROSS JOIN mapping_single m
+          ON m.source_malcode = c.malcode
+         AND m.source_table_name = c.table_name
+         AND m.source_column_name = c.column_name
+        WHERE m.is_active = 1
+        GROUP BY c.malcode, c.table_name, c.column_name
+        ORDER BY c.malcode, c.table_name, c.column_name
+    """)
+    return [tuple(row) for row in cursor.fetchall()]
+
+def get_mappings_by_source_columns_single_table(conn, columns: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+    """Get the active mapping rows reading any of the given (malcode, table, column) sources, ordered by
+    source column and file. Keys must be unique within the batch.
+    """
+    if not columns:
+        return []
+    cursor = conn.cursor()
+    _stage_source_columns(cursor, columns)
+    cursor.execute("""
+        SELECT c.malcode, c.table_name, c.column_name, m.id, m.mapping_file_name,
+               m.target_malcode, m.target_table_name, m.target_column_name, m.target_data_type,
+               m.transformation, m.mapping_status
+        FROM temp.impact_columns c
+        CROSS JOIN mapping_single m
+          ON m.source_malcode = c.malcode
+         AND m.source_table_name = c.table_name
+         AND m.source_column_name = c.column_name
+        WHERE m.is_active = 1
+        ORDER BY c.malcode, c.table_name, c.column_name, m.mapping_file_name, m.target_table_name, m.target_column_name
+    """)
+    return [{
+        'source': (row[0], row[1], row[2]),
+        'id': str(row[3]),
+        'mapping_file_name': row[4],
+        'target_malcode': row[5],
+        'target_table': row[6],
+        'target_column': row[7],
+        'target_data_type': row[8],
+        'transformation': row[9],
+        'status': row[10]
+    } for row in cursor.fetchall()]
+
+def update_mapping_row_status_single_table(conn, row_id: str, status: str, reviewer: str = None,
+                                           expected_version: Optional[int] = None) -> int:
+    """Update mapping row status in single table and return the row's new version.
+    
+    With expected_version the update only applies if the row still has that version, and raises a 409 otherwise.
+    """
+    cursor = conn.cursor()
+    version_filter = " AND row_version = ?" if expected_version is not None else ""
+    params = [status, reviewer, _reserve_row_versions(cursor, 1), row_id]
+    if expected_version is not None:
+        params.append(expected_version)
+    cursor.execute(f"""
+        UPDATE mapping_single 
+        SET mapping_status = ?, reviewer = ?, reviewed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP,
+            row_version = ?
+        WHERE id = ?{version_filter}
+        RETURNING row_version, mapping_file_name
+    """, params)
+    updated = cursor.fetchone()
+    
+    if updated is None:
+        conn.rollback()
+        if expected_version is not None:
+            cursor.execute("SELECT 1 FROM mapping_single WHERE id = ?", (row_id,))
+            if cursor.fetchone() is not None:
+                raise HTTPException(status_code=409,
+                                    detail="Mapping row has changed since it was loaded; reload it and try again")
+        raise HTTPException(status_code=404, detail="Mapping row not found")
+    
+    record_mapping_changes_single_table(cursor, [('row_status', updated[1], row_id, {
+        'status': status, 'reviewer': reviewer, 'version': updated[0]
+    })])
+    conn.commit()
+    return updated[0]
+
+def bulk_update_mapping_row_status_single_table(conn, status: str, reviewer: Optional[str] = None,
+                                                row_ids: Optional[List[str]] = None, file_name: Optional[str] = None,
+                                                table_name: Optional[str] = None,
+                                                current_status: Optional[str] = None) -> List[Tuple[str, str]]:
+    """Set the status and reviewer of many active rows in one statement and one transaction.
+    
+    Same targeting as the SQL Server implementation. SQLite's RETURNING only sees new values, so the previous
+    statuses are read first inside the same write transaction. Returns (id, previous_status) per updated row.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        # Take the write lock up front so nothing changes between reading and updating
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        if row_ids is not None:
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS review_rows (id TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM temp.review_rows")
+            cursor.executemany("INSERT INTO temp.review_rows (id) VALUES (?)", [(row_id,) for row_id in row_ids])
+            condition = " AND id IN (SELECT id FROM temp.review_rows)"
+            params = []
+        else:
+            condition = " AND mapping_file_name = ?"
+            params = [file_name]
+            if table_name:
+                condition += " AND (source_table_name = ? OR target_table_name = ?)"
+                params += [table_name, table_name]
+            if current_status:
+                condition += " AND mapping_status = ?"
+                params.append(current_status)
+        
+        cursor.execute(f"SELECT id, mapping_status, mapping_file_name FROM mapping_single WHERE is_active = 1{condition}",
+                       params)
+        rows = cursor.fetchall()
+        version = _reserve_row_versions(cursor, 1)
+        cursor.execute(f"""
+            UPDATE mapping_single
+            SET mapping_status = ?, reviewer = ?, reviewed_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP,
+                row_version = ?
+            WHERE is_active = 1{condition}
+        """, [status, reviewer, version, *params])
+        record_mapping_changes_single_table(cursor, [
+            ('row_status', row[2], str(row[0]), {'status': status, 'reviewer': reviewer, 'version': version})
+            for row in rows
+        ])
+        updated = [(str(row[0]), row[1]) for row in rows]
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    return updated
+
+def add_mapping_row_comment_single_table(conn, row_id: str, comment: str, author: Optional[str] = None) -> Dict[str, Any]:
+    """Append a comment to a mapping row with a single insert and return it"""
+    cursor = conn.cursor()
+    
+    # The existence check and the insert are one statement, so concurrent reviewers never overwrite each other
+    cursor.execute("""
+        INSERT INTO mapping_row_comments (mapping_row_id, comment, author)
+        SELECT id, ?, ? FROM mapping_single WHERE id = ?
+        RETURNING id, created_at
+    """, (comment, author, row_id))
+    result = cursor.fetchone()
+    
+    if not result:
+        raise HTTPException(status_code=404, detail="Mapping row not found")
+    
+    saved = {
+        'id': int(result[0]),
+        'comment': comment,
+        'author': author,
+        'createdAt': result[1].isoformat() if result[1] else None
+    }
+    cursor.execute("SELECT mapping_file_name FROM mapping_single WHERE id = ?", (row_id,))
+    record_mapping_changes_single_table(cursor, [('row_comment', cursor.fetchone()[0], row_id, saved)])
+    conn.commit()
+    return saved
+
+def get_mapping_row_comments_single_table(conn, row_id: str, limit: int = 50,
+                                          before_id: Optional[int] = None) -> Dict[str, Any]:
+    """Get a page of a mapping row's comments, newest first.
+    
+    Pass the returned next_before_id as before_id to get the next (older) page; it is None on the last page.
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"""
+        SELECT id, comment, author, created_at
+        FROM mapping_row_comments
+        WHERE mapping_row_id = ?{" AND id < ?" if before_id is not None else ""}
+        ORDER BY id DESC
+        LIMIT ?
+    """, (row_id, *([before_id] if before_id is not None else []), limit + 1))
+    rows = cursor.fetchall()
+    
+    comments = [{
+        'id': int(row[0]),
+        'comment': row[1],
+        'author': row[2],
+        'createdAt': row[3].isoformat() if row[3] else None
+    } for row in rows[:limit]]
+    return {
+        'comments': comments,
+        'next_before_id': comments[-1]['id'] if len(rows) > limit else None
+    }
+
+
+# Every mapping_single column an archived row keeps; is_active and row_version are set again when it is restored
+_ARCHIVE_COLUMNS = """id, mapping_file_name, mapping_file_description, source_system, target_system, mapping_status,
+    source_malcode, source_malcode_description, source_table_name, source_table_description, source_column_name,
+    source_column_description, source_data_type, source_is_primary_key, source_is_nullable, source_default_value,
+    source_type, target_malcode, target_malcode_description, target_table_name, target_table_description,
+    target_column_name, target_column_description, target_data_type, target_is_primary_key, target_is_nullable,
+    target_default_value, target_type, transformation, join_clause, created_by, created_at, updated_at, reviewer,
+    reviewed_at, comments"""
+_ARCHIVE_FILE_COLUMNS = "mapping_file_description, source_system, target_system"
+
+def _reset_archive_rows(cursor):
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS archive_rows (id TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM temp.archive_rows")
+
+def _archive_staged_rows(cursor) -> Dict[str, int]:
+    """Move the mapping_single rows staged in temp.archive_rows to mapping_single_archive, with their comments,
+    and return how many were moved per mapping file. Does not commit."""
+    cursor.execute("""
+        SELECT mapping_file_name, COUNT(*) FROM mapping_single
+        WHERE id IN (SELECT id FROM temp.archive_rows)
+        GROUP BY mapping_file_name
+    """)
+    counts = {row[0]: row[1] for row in cursor.fetchall()}
+    # Comments would go with their rows (ON DELETE CASCADE), so they are archived with them as a JSON array
+    cursor.execute(f"""
+        INSERT INTO mapping_single_archive ({_ARCHIVE_COLUMNS}, archived_comments)
+        SELECT {_ARCHIVE_COLUMNS}, (
+            SELECT json_group_array(json_object('comment', c.comment, 'author', c.author, 'created_at', c.created_at))
+            FROM (SELECT comment, author, created_at FROM mapping_row_comments
+                  WHERE mapping_row_id = mapping_single.id ORDER BY id) c
+        )
+        FROM mapping_single
+        WHERE id IN (SELECT id FROM temp.archive_rows)
+    """)
+    cursor.execute("DELETE FROM mapping_single WHERE id IN (SELECT id FROM temp.archive_rows)")
+    return counts
+
+def archive_inactive_mapping_rows_single_table(conn, older_than: datetime, batch_size: int = 5000) -> Dict[str, int]:
+    """Move mapping rows inactive since before older_than to mapping_single_archive, with their comments.
+    
+    Each batch of batch_size rows is its own short transaction, so writers are never held up for long.
+    Returns how many rows were archived per mapping file.
+    """
+    cursor = conn.cursor()
+    archived: Dict[str, int] = {}
+    
+    while True:
+        try:
+            if not conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
+            _reset_archive_rows(cursor)
+            # A seek on IX_mapping_single_inactive, which only holds inactive rows
+            cursor.execute("""
+                INSERT INTO temp.archive_rows (id)
+                SELECT id FROM mapping_single WHERE is_active = 0 AND updated_at < ? LIMIT ?
+            """, (older_than, batch_size))
+            staged = cursor.rowcount
+            counts = _archive_staged_rows(cursor) if staged else {}
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        
+        for file_name, count in counts.items():
+            archived[file_name] = archived.get(file_name, 0) + count
+        if staged < batch_size:
+            break
+    
+    if archived:
+        logger.info(f"Archived {sum(archived.values())} inactive mapping rows from {len(archived)} files")
+    return archived
+
+def get_archived_mapping_rows_single_table(conn, file_name: Optional[str] = None, limit: int = 100,
+                                           before: Optional[int] = None) -> Dict[str, Any]:
+    """Get a page of archived mapping rows, most recently archived first, optionally of one mapping file.
+    
+    Pass the returned next_before as before to get the next (older) page; it is None on the last page.
+    """
+    cursor = conn.cursor()
+    conditions, params = [], []
+    if file_name is not None:
+        conditions.append("mapping_file_name = ?")
+        params.append(file_name)
+    if before is not None:
+        conditions.append("archive_id < ?")
+        params.append(before)
+    cursor.execute(f"""
+        SELECT archive_id, id, mapping_file_name, source_malcode, source_table_name, source_column_name,
+               source_data_type, source_type, target_malcode, target_table_name, target_column_name, target_data_type,
+               target_type, transformation, join_clause, mapping_status, created_by, created_at, updated_at,
+               reviewer, reviewed_at, archived_at, json_array_length(archived_comments)
+        FROM mapping_single_archive
+        {"WHERE " + " AND ".join(conditions) if conditions else ""}
+        ORDER BY archive_id DESC
+        LIMIT ?
+    """, (*params, limit + 1))
+    rows = cursor.fetchall()
+    
+    archived = [{
+        'archiveId': int(row[0]),
+        'id': str(row[1]),
+        'mappingFileName': row[2],
+        'sourceColumn': {
+            'malcode': row[3],
+            'table': row[4],
+            'column': row[5],
+            'dataType': row[6],
+            'sourceType': row[7]
+        },
+        'targetColumn': {
+            'malcode': row[8],
+            'table': row[9],
+            'column': row[10],
+            'dataType': row[11],
+            'targetType': row[12]
+        },
+        'transformation': row[13],
+        'join': row[14],
+        'status': row[15],
+        'createdBy': row[16],
+        'createdAt': row[17].isoformat() if row[17] else None,
+        'updatedAt': row[18].isoformat() if row[18] else None,
+        'reviewer': row[19],
+        'reviewedAt': row[20].isoformat() if row[20] else None,
+        'archivedAt': row[21].isoformat() if row[21] else None,
+        'commentCount': row[22] or 0
+    } for row in rows[:limit]]
+    return {
+        'rows': archived,
+        'next_before': archived[-1]['archiveId'] if len(rows) > limit else None
+    }
+
+def restore_archived_mapping_rows_single_table(conn, row_ids: Optional[List[str]] = None,
+                                               file_name: Optional[str] = None,
+                                               restored_by: Optional[str] = None) -> Dict[str, Any]:
+    """Move archived mapping rows back into mapping_single as active rows, by row ids or every archived row of
+    a mapping file.
+    
+    Restored rows keep their ids and comments and get new row versions. They take the description and systems of
+    the file they rejoin, so it still loads as one file. Each file gets a new revision and a rows_restored change
+    log entry. Returns the restored row ids and, per file, the rows restored and its new version and revision.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        if not conn.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+        _reset_archive_rows(cursor)
+        if row_ids is not None:
+            cursor.executemany("INSERT OR IGNORE INTO temp.archive_rows (id) VALUES (?)",
+                               [(row_id,) for row_id in row_ids])
+        else:
+            cursor.execute("""
+                INSERT INTO temp.archive_rows (id) SELECT id FROM mapping_single_archive WHERE mapping_file_name = ?
+            """, (file_name,))
+        cursor.execute("""
+            SELECT id, mapping_file_name FROM mapping_single_archive
+            WHERE id IN (SELECT id FROM temp.archive_rows)
+            ORDER BY archive_id
+        """)
+        restored = [(str(row[0]), row[1]) for row in cursor.fetchall()]
+        rows_by_file: Dict[str, List[str]] = {}
+        for row_id, row_file_name in restored:
+            rows_by_file.setdefault(row_file_name, []).append(row_id)
+        
+        files = {}
+        for row_file_name, file_row_ids in rows_by_file.items():
+            cursor.execute(f"""
+                SELECT {_ARCHIVE_FILE_COLUMNS} FROM mapping_single
+                WHERE mapping_file_name = ? AND is_active = 1
+                LIMIT 1
+            """, (row_file_name,))
+            current = cursor.fetchone()
+            columns = _ARCHIVE_COLUMNS.replace(_ARCHIVE_FILE_COLUMNS, '?, ?, ?') if current else _ARCHIVE_COLUMNS
+            first_version = _reserve_row_versions(cursor, len(file_row_ids))
+            cursor.execute(f"""
+                INSERT INTO mapping_single ({_ARCHIVE_COLUMNS}, is_active, updated_at, row_version)
+                SELECT {columns}, 1, CURRENT_TIMESTAMP, ? + ROW_NUMBER() OVER (ORDER BY archive_id) - 1
+                FROM mapping_single_archive
+                WHERE mapping_file_name = ? AND id IN (SELECT id FROM temp.archive_rows)
+            """, (*(current or ()), first_version, row_file_name))
+            files[row_file_name] = {'rows': len(file_row_ids)}
+        
+        cursor.execute("""
+            INSERT INTO mapping_row_comments (mapping_row_id, comment, author, created_at)
+            SELECT a.id, json_extract(j.value, '$.comment'), json_extract(j.value, '$.author'),
+                   json_extract(j.value, '$.created_at')
+            FROM mapping_single_archive a, json_each(a.archived_comments) j
+            WHERE a.id IN (SELECT id FROM temp.archive_rows)
+            ORDER BY a.archive_id, j.key
+        """)
+        cursor.execute("DELETE FROM mapping_single_archive WHERE id IN (SELECT id FROM temp.archive_rows)")
+        
+        changes = []
+        for row_file_name, file_row_ids in rows_by_file.items():
+            revision = record_mapping_file_revision_single_table(cursor, row_file_name, restored_by, 'restore')
+            version = _mapping_file_versions(cursor, [row_file_name]).get(row_file_name)
+            files[row_file_name].update(version=version, revision=revision)
+            changes.append(('rows_restored', row_file_name, None, {
+                'row_ids': file_row_ids, 'version': version, 'revision': revision
+            }))
+        record_mapping_changes_single_table(cursor, changes)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    
+    logger.info(f"Restored {len(restored)} archived mapping rows into {len(files)} files")
+    return {'row_ids': [row_id for row_id, _ in restored], 'files': files}
@@ -0,0 +1,375 @@
+
+# SQLite implementation of database/metadata_operations.py
+
+from typing import List, Dict, Any, Tuple, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# metadata_single holds one row per malcode, per table and per column, told apart by metadata_level.
+# Malcode rows have NULL table_name/column_name and table rows have NULL column_name.
+
+def _malcode_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': str(row[0]),
+        'malcode': row[1],
+        'business_description': row[2],
+        'created_at': row[3].isoformat() if row[3] else None,
+        'updated_at': row[4].isoformat() if row[4] else None,
+        'created_by': row[5],
+        'is_active': True
+    }
+
+def _table_from_row(row) -> Dict[str, Any]:
+    return {
+        'id': str(row[0]),
+        'malcode_id': str(row[1]) if row[1] else None,
+        'malcode': row[2],
+        'table_name': row[3],
+        'business_description': row[4],
+        'created_at': row[5].isoformat() if row[5] else None,
+        'updated_at': row[6].isoformat() if row[6] else None,
+        'created_by': row[7],
+        'is_active': True
+    }
+
+_TABLE_SELECT = """
+    SELECT t.id, m.id, t.malcode, t.table_name, t.table_description, t.created_at, t.updated_at, t.created_by
+    FROM metadata_single t
+    LEFT JOIN metadata_single m
+        ON m.metadata_level = 'malcode' AND m.malcode = t.malcode AND m.is_active = 1
+"""
+
+def search_metadata_single_table(conn, search_term: str) -> List[Dict[str, Any]]:
+    """Search column metadata in the metadata_single table"""
+    cursor = conn.cursor()
+    search_pattern = f"%{search_term}%"
+    
+    cursor.execute("""
+        SELECT malcode, table_name, column_name, malcode_description as business_description, data_type
+        FROM metadata_single
+        WHERE metadata_level = 'column'
+           AND (malcode LIKE ? OR table_name LIKE ? OR column_name LIKE ? OR malcode_description LIKE ?)
+           AND is_active = 1
+        ORDER BY malcode, table_name, column_name
+    """, (search_pattern, search_pattern, search_pattern, search_pattern))
+    
+    results = []
+    for row in cursor.fetchall():
+        results.append({
+            'malcode': row[0],
+            'table_name': row[1],
+            'column_name': row[2],
+            'business_description': row[3],
+            'data_type': row[4]
+        })
+    
+    return results
+
+def get_all_malcodes_single_table(conn) -> List[Dict[str, Any]]:
+    """Get all malcodes from the metadata_single table"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND is_active = 1
+        ORDER BY malcode
+    """)
+    
+    return [_malcode_from_row(row) for row in cursor.fetchall()]
+
+def get_malcode_single_table(conn, malcode: str) -> Optional[Dict[str, Any]]:
+    """Get a malcode by name, or None if it does not exist"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND malcode = ? AND is_active = 1
+    """, (malcode,))
+    
+    row = cursor.fetchone()
+    return _malcode_from_row(row) if row else None
+
+def get_malcode_by_id_single_table(conn, malcode_id: str) -> Optional[Dict[str, Any]]:
+    """Get a malcode by its metadata_single row ID, or None if it does not exist"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT id, malcode, malcode_description, created_at, updated_at, created_by
+        FROM metadata_single
+        WHERE id = ? AND metadata_level = 'malcode' AND is_active = 1
+    """, (malcode_id,))
+    
+    row = cursor.fetchone()
+    return _malcode_from_row(row) if row else None
+
+def get_tables_by_malcode_single_table(conn, malcode: str) -> List[Dict[str, Any]]:
+    """Get all tables for a specific malcode from the metadata_single table"""
+    cursor = conn.cursor()
+    
+    cursor.execute(_TABLE_SELECT + """
+        WHERE t.metadata_level = 'table' AND t.malcode = ? AND t.is_active = 1
+        ORDER BY t.table_name
+    """, (malcode,))
+    
+    return [_table_from_row(row) for row in cursor.fetchall()]
+
+def get_table_by_id_single_table(conn, table_id: str) -> Optional[Dict[str, Any]]:
+    """Get a table by its metadata_single row ID, or None if it does not exist"""
+    cursor = conn.cursor()
+    
+    cursor.execute(_TABLE_SELECT + """
+        WHERE t.id = ? AND t.metadata_level = 'table' AND t.is_active = 1
+    """, (table_id,))
+    
+    row = cursor.fetchone()
+    return _table_from_row(row) if row else None
+
+def get_columns_by_table_single_table(conn, malcode: str, table_name: str) -> List[Dict[str, Any]]:
+    """Get all columns for a specific table from the metadata_single table"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT c.id, t.id, c.column_name, c.column_description, c.data_type, c.is_primary_key, c.is_nullable,
+               c.default_value, c.created_at, c.updated_at, c.created_by
+        FROM metadata_single c
+        LEFT JOIN metadata_single t
+            ON t.metadata_level = 'table' AND t.malcode = c.malcode AND t.table_name = c.table_name
+            AND t.is_active = 1
+        WHERE c.metadata_level = 'column' AND c.malcode = ? AND c.table_name = ? AND c.is_active = 1
+        ORDER BY c.column_name
+    """, (malcode, table_name))
+    
+    columns = []
+    for row in cursor.fetchall():
+        columns.append({
+            'id': str(row[0]),
+            'table_id': str(row[1]) if row[1] else None,
+            'column_name': row[2],
+            'business_description': row[3],
+            'data_type': row[4],
+            'is_primary_key': bool(row[5]),
+            'is_nullable': bool(row[6]) if row[6] is not None else True,
+            'default_value': row[7],
+            'created_at': row[8].isoformat() if row[8] else None,
+            'updated_at': row[9].isoformat() if row[9] else None,
+            'created_by': row[10],
+            'is_active': True
+        })
+    
+    return columns
+
+def _ensure_parent_metadata_single_table(cursor, malcodes: Dict[str, str], tables: Dict[Tuple[str, str], str]):
+    """Insert malcode and table level rows that are missing for the given keys (mapped to created_by)"""
+    if malcodes:
+        cursor.executemany("""
+            INSERT INTO metadata_single (metadata_level, malcode, created_by)
+            VALUES ('malcode', ?, ?)
+            ON CONFLICT (malcode) WHERE metadata_level = 'malcode' DO UPDATE
+                SET is_active = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE metadata_single.is_active = 0
+        """, list(malcodes.items()))
+    
+    if tables:
+        cursor.executemany("""
+            INSERT INTO metadata_single (metadata_level, malcode, table_name, created_by)
+            VALUES ('table', ?, ?, ?)
+            ON CONFLICT (malcode, table_name) WHERE metadata_level = 'table' DO UPDATE
+                SET is_active = 1, updated_at = CURRENT_TIMESTAMP
+                WHERE metadata_single.is_active = 0
+        """, [key + (created_by,) for key, created_by in tables.items()])
+
+def upsert_column_metadata_single_table(cursor, columns: List[Tuple[str, str, str, str, str]]):
+    """Insert any (malcode, table, column, data_type, created_by) entries missing from metadata_single.
+    
+    Missing malcode and table level rows are created as well. Existing entries keep their catalogue
+    descriptions; soft-deleted ones are reactivated. Does not commit - the caller owns the transaction.
+    """
+    unique_columns = {}
+    malcodes = {}
+    tables = {}
+    for malcode, table_name, column_name, data_type, created_by in columns:
+        created_by = created_by or 'system'
+        unique_columns.setdefault((malcode, table_name, column_name), (data_type or 'string', created_by))
+        malcodes.setdefault(malcode, created_by)
+        tables.setdefault((malcode, table_name), created_by)
+    
+    if not unique_columns:
+        return
+    
+    _ensure_parent_metadata_single_table(cursor, malcodes, tables)
+    cursor.executemany("""
+        INSERT INTO metadata_single (metadata_level, malcode, table_name, column_name, data_type, created_by)
+        VALUES ('column', ?, ?, ?, ?, ?)
+        ON CONFLICT (malcode, table_name, column_name) WHERE metadata_level = 'column' DO UPDATE
+            SET is_active = 1, updated_at = CURRENT_TIMESTAMP
+            WHERE metadata_single.is_active = 0
+    """, [key + value for key, value in unique_columns.items()])
+
+def create_malcode_metadata_single_table(conn, malcode: str, description: str, created_by: str) -> str:
+    """Create a new malcode in the metadata_single table and return its ID"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        INSERT INTO metadata_single (metadata_level, malcode, malcode_description, created_by)
+        VALUES ('malcode', ?, ?, ?)
+        RETURNING id
+    """, (malcode, description, created_by))
+    malcode_id = cursor.fetchone()[0]
+    
+    conn.commit()
+    return malcode_id
+
+def create_table_metadata_single_table(conn, malcode: str, table_name: str, description: str, created_by: str) -> str:
+    """Create a new table under an existing malcode in the metadata_single table and return its ID"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        INSERT INTO metadata_single (
+            metadata_level, malcode, malcode_description, table_name, table_description, created_by
+        )
+        SELECT 'table', malcode, malcode_description, ?, ?, ?
+        FROM metadata_single
+        WHERE metadata_level = 'malcode' AND malcode = ?
+        RETURNING id
+    """, (table_name, description, created_by, malcode))
+    result = cursor.fetchone()
+    if not result:
+        conn.rollback()
+        raise ValueError(f"Malcode not found: {malcode}")
+    
+    conn.commit()
+    return result[0]
+
+def create_column_metadata_single_table(conn, malcode: str, table_name: str, column_name: str,
+                                       data_type: str, description: str, is_primary_key: bool,
+                                       is_nullable: bool, default_value: str, created_by: str) -> str:
+    """Create a new column under an existing table in the metadata_single table and return its ID"""
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        INSERT INTO metadata_single (
+            metadata_level, malcode, malcode_description, table_name, table_description,
+            column_name, column_description, data_type, is_primary_key,
+            is_nullable, default_value, created_by
+        )
+        SELECT 'column', malcode, malcode_description, table_name, table_description,
+               ?, ?, ?, ?, ?, ?, ?
+        FROM metadata_single
+        WHERE metadata_level = 'table' AND malcode = ? AND table_name = ?
+        RETURNING id
+    """, (column_name, description, data_type, is_primary_key, is_nullable, default_value, created_by,
+          malcode, table_name))
+    result = cursor.fetchone()
+    if not result:
+        conn.rollback()
+        raise ValueError(f"Table not found: {malcode}.{table_name}")
+    
+    conn.commit()
+    return result[0]
+
+def bulk_merge_metadata_single_table(conn, rows: List[Tuple]) -> Tuple[int, int]:
+    """Set-based upsert of a batch of column metadata rows into metadata_single.
+    
+    Same row layout and semantics as the SQL Server implementation: rows are staged in a temp
+    table and upserted one level at a time. Returns the (inserted, updated) column counts and
+    commits the batch.
+    """
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS metadata_import (
+                malcode TEXT NOT NULL,
+                malcode_description TEXT,
+                table_name TEXT NOT NULL,
+                table_description TEXT,
+                column_name TEXT NOT NULL,
+                column_description TEXT,
+                data_type TEXT,
+                is_primary_key INTEGER,
+                is_nullable INTEGER,
+                default_value TEXT,
+                created_by TEXT NOT NULL,
+                PRIMARY KEY (malcode, table_name, column_name)
+            )
+        """)
+        cursor.execute("DELETE FROM temp.metadata_import")
+        cursor.executemany("""
+            INSERT INTO temp.metadata_import (
+                malcode, malcode_description, table_name, table_description, column_name,
+                column_description, data_type, is_primary_key, is_nullable, default_value, created_by
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        
+        # WHERE true is required by SQLite's parser for INSERT ... SELECT ... ON CONFLICT
+        cursor.execute("""
+            INSERT INTO metadata_single (metadata_level, malcode, malcode_description, created_by)
+            SELECT 'malcode', malcode, MAX(malcode_description), MIN(created_by)
+            FROM temp.metadata_import
+            WHERE true
+            GROUP BY malcode
+            ON CONFLICT (malcode) WHERE metadata_level = 'malcode' DO UPDATE SET
+                malcode_description = COALESCE(excluded.malcode_description, metadata_single.malcode_description),
+                is_active = 1,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        cursor.execute("""
+            INSERT INTO metadata_single (
+                metadata_level, malcode, malcode_description, table_name, table_description, created_by
+            )
+            SELECT 'table', malcode, MAX(malcode_description), table_name, MAX(table_description), MIN(created_by)
+            FROM temp.metadata_import
+            WHERE true
+            GROUP BY malcode, table_name
+            ON CONFLICT (malcode, table_name) WHERE metadata_level = 'table' DO UPDATE SET
+                malcode_description = COALESCE(excluded.malcode_description, metadata_single.malcode_description),
+                table_description = COALESCE(excluded.table_description, metadata_single.table_description),
+                is_active = 1,
+                updated_at = CURRENT_TIMESTAMP
+        """)
+        
+        # Column rows: update the existing ones, then insert the rest, like MERGE's matched/not matched arms
+        cursor.execute("""
+            UPDATE metadata_single AS target
+            SET
+                malcode_description = COALESCE(source.malcode_description, target.malcode_description),
+                table_description = COALESCE(source.table_description, target.table_description),
+                column_description = COALESCE(source.column_description, target.column_description),
+                data_type = COALESCE(source.data_type, target.data_type),
+                is_primary_key = COALESCE(source.is_primary_key, target.is_primary_key),
+                is_nullable = COALESCE(source.is_nullable, target.is_nullable),
+                default_value = COALESCE(source.default_value, target.default_value),
+                is_active = 1,
+                updated_at = CURRENT_TIMESTAMP
+            FROM temp.metadata_import AS source
+            WHERE target.metadata_level = 'column'
+                AND target.malcode = source.malcode
+                AND target.table_name = source.table_name
+                AND target.column_name = source.column_name
+        """)
+        updated = cursor.rowcount
+        
+        cursor.execute("""
+            INSERT INTO metadata_single (
+                metadata_level, malcode, malcode_description, table_name, table_description, column_name,
+                column_description, data_type, is_primary_key, is_nullable, default_value, created_by
+            )
+            SELECT 'column', malcode, malcode_description, table_name, table_description, column_name,
+                   column_description, COALESCE(data_type, 'string'), COALESCE(is_primary_key, 0),
+                   COALESCE(is_nullable, 1), default_value, created_by
+            FROM temp.metadata_import
+            WHERE true
+            ON CONFLICT (malcode, table_name, column_name) WHERE metadata_level = 'column' DO NOTHING
+        """)
+        inserted = cursor.rowcount
+        
+        conn.commit()
+        return inserted, updated
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
@@ -1,7 +1,7 @@
 
 import logging
 from database import get_db_connection
-from sql_executor import execute_sql_script
+from sql_executor import execute_sql_script, DEFAULT_MAX_ROWS
 from table_operations import (
     create_tables,
     create_metadata_tables,
@@ -13,11 +13,11 @@ from table_operations import (
 
 logger = logging.getLogger(__name__)
 
-def execute_custom_sql(sql_script: str):
+def execute_custom_sql(sql_script: str, max_rows: int = DEFAULT_MAX_ROWS):
     """Execute custom SQL script"""
     try:
         with get_db_connection() as conn:
-            results = execute_sql_script(conn, sql_script)
+            results = execute_sql_script(conn, sql_script, max_rows)
             logger.info("Custom SQL executed successfully")
             return results
     except Exception as e:
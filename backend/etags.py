@@ -0,0 +1,59 @@
+
+import json
+import hashlib
+from typing import Dict, List, Optional
+
+from columnar import JSON, COLUMNAR_JSON, ARROW_STREAM
+
+# Clients may cache responses but must revalidate them (If-None-Match) before each use
+CACHE_CONTROL = 'private, no-cache'
+# ETag parts naming the formats other than JSON that negotiate_format can pick
+_MEDIA_TYPE_TAGS = {COLUMNAR_JSON: 'columnar', ARROW_STREAM: 'arrow'}
+
+def version_etag(version) -> str:
+    """Strong ETag for a single mapping row or file version"""
+    return f'"{version}"'
+
+def versions_etag(versions: Dict[str, str]) -> str:
+    """Strong ETag for a set of mapping file versions, such as the full file listing"""
+    key = json.dumps(sorted(versions.items()))
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+def representation_etag(etag: str, media_type: str = JSON, content_encoding: Optional[str] = None) -> str:
+    """The strong ETag of one representation of what etag validates.
+    
+    A strong ETag may only ever name one body, so each format and content coding gets its own tag; plain JSON
+    keeps etag itself. They follow a '+', which versions never contain, so if_match_versions still reads the
+    version out of any representation's tag.
+    """
+    parts = [etag[1:-1]]
+    if media_type != JSON:
+        parts.append(_MEDIA_TYPE_TAGS[media_type])
+    if content_encoding:
+        parts.append(content_encoding)
+    return f'"{"+".join(parts)}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header value matches the ETag (weak comparison, as for GET)"""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or etag in (candidate[2:] if candidate.startswith('W/') else candidate
+                                         for candidate in candidates)
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[str]]:
+    """The versions named by an If-Match header, '*' included, or None when there is no header.
+    
+    If-Match uses strong comparison, so weak ETags are dropped and can never match. The ETag of any
+    representation names its version.
+    """
+    if if_match is None:
+        return None
+    versions = []
+    for candidate in if_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            versions.append('*')
+        elif len(candidate) >= 2 and candidate.startswith('"') and candidate.endswith('"'):
+            versions.append(candidate[1:-1].partition('+')[0])
+    return versions
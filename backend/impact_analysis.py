@@ -0,0 +1,79 @@
+
+import time
+import logging
+from typing import Dict, Any, List, Tuple
+
+from database import count_mappings_by_source_columns_single_table, get_mappings_by_source_columns_single_table
+from lineage import lineage_graph, column_key
+from config import LINEAGE_MAX_DEPTH
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+# Transitive targets listed per changed column; the batch summary counts all of them
+MAX_TARGETS_PER_COLUMN = 1000
+
+def _column_dict(column: Tuple[str, str, str]) -> Dict[str, str]:
+    return {'id': '.'.join(column), 'malcode': column[0], 'table': column[1], 'column': column[2]}
+
+def analyze_impact(conn, columns: List[Tuple[str, str, str]], page: int = 1, page_size: int = DEFAULT_PAGE_SIZE,
+                   max_depth: int = LINEAGE_MAX_DEPTH) -> Dict[str, Any]:
+    """Find what a change to each of the given source columns affects.
+    
+    Mapping rows reading a changed column directly come from an indexed lookup on mapping_single; transitive
+    targets come from the lineage graph. Results are grouped by changed column and paged over the columns that
+    some mapping reads, so every page of the same batch reports the same summary.
+    """
+    started = time.perf_counter()
+    # Deduplicate case-insensitively, keeping the first spelling
+    unique = list({column_key(*column): column for column in reversed(columns)}.values())[::-1]
+    
+    counts = count_mappings_by_source_columns_single_table(conn, unique)
+    referenced = {column_key(*row[:3]) for row in counts}
+    unreferenced = [column for column in unique if column_key(*column) not in referenced]
+    
+    page_counts = counts[(page - 1) * page_size:page * page_size]
+    page_columns = [tuple(row[:3]) for row in page_counts]
+    rows_by_column: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = {}
+    for row in get_mappings_by_source_columns_single_table(conn, page_columns):
+        rows_by_column.setdefault(column_key(*row.pop('source')), []).append(row)
+    
+    lineage_graph.ensure_current()
+    results = []
+    for malcode, table, column, row_count, file_count in page_counts:
+        rows = rows_by_column.get(column_key(malcode, table, column), [])
+        lineage = lineage_graph.traverse(malcode, table, column, 'downstream', max_depth, MAX_TARGETS_PER_COLUMN)
+        results.append({
+            'column': _column_dict((malcode, table, column)),
+            'mapping_row_count': row_count,
+            'mapping_file_count': file_count,
+            'mapping_files': sorted({row['mapping_file_name'] for row in rows}),
+            'mapping_rows': rows,
+            'transitive_targets': lineage['columns'] if lineage else [],
+            'transitive_mapping_files': sorted({name for edge in lineage['edges'] for name in edge['mapping_files']})
+                                        if lineage else [],
+            'transitive_truncated': lineage['truncated'] if lineage else False
+        })
+    
+    reach = lineage_graph.downstream_reach([tuple(row[:3]) for row in counts], max_depth)
+    total_pages = (len(counts) + page_size - 1) // page_size
+    elapsed = time.perf_counter() - started
+    logger.info(f"Impact analysis of {len(unique)} columns: {len(counts)} referenced, page {page}/{total_pages}, "
+                f"{elapsed * 1000:.1f} ms")
+    return {
+        'summary': {
+            'changed_columns': len(unique),
+            'referenced_columns': len(counts),
+            'unreferenced_columns': len(unreferenced),
+            'mapping_rows': sum(row[3] for row in counts),
+            'transitive_targets': reach['affected_columns'],
+            'mapping_files': reach['mapping_files'],
+            'truncated': reach['truncated']
+        },
+        'page': page,
+        'page_size': page_size,
+        'total_pages': total_pages,
+        'results': results,
+        'unreferenced': [_column_dict(column) for column in unreferenced],
+        'elapsed_ms': round(elapsed * 1000, 3)
+    }
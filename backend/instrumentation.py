@@ -0,0 +1,264 @@
+
+import time
+import threading
+import logging
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+from fastapi import Request
+from prometheus_client import Counter, Gauge, Histogram, generate_latest, CONTENT_TYPE_LATEST
+
+from query_stats import record_execution, record_fetch
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond lookups up to slow LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests handled', ['method', 'route', 'status']
+)
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Wall time spent handling HTTP requests', ['method', 'route'],
+    buckets=LATENCY_BUCKETS
+)
+DB_OPERATION_DURATION = Histogram(
+    'db_operation_duration_seconds', 'Time spent in database connect, execute and fetch calls', ['operation'],
+    buckets=LATENCY_BUCKETS
+)
+DB_CONNECTIONS_IN_USE = Gauge(
+    'db_connections_in_use', 'Database connections currently checked out by get_db_connection'
+)
+LLM_REQUEST_DURATION = Histogram(
+    'llm_request_duration_seconds', 'Azure OpenAI call latency', ['deployment', 'outcome'],
+    buckets=LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter(
+    'llm_tokens_total', 'Azure OpenAI tokens consumed', ['deployment', 'type']
+)
+
+# Rows fetched per round trip when iterating a cursor; drivers default arraysize to 1
+ITER_FETCH_SIZE = 1000
+
+# Database operations and the Server-Timing metric each one is reported under
+DB_TIMING_NAMES = {'connect': 'db-connect', 'execute': 'db-exec', 'fetch': 'db-fetch'}
+
+class RequestTimings:
+    """Time spent in the database and LLM while handling one request"""
+    
+    def __init__(self):
+        self.db_seconds = {operation: 0.0 for operation in DB_TIMING_NAMES}
+        self.query_count = 0
+        self.llm_seconds = 0.0
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+    
+    def server_timing(self, total_seconds: float) -> str:
+        """Render the timings as a Server-Timing header value (durations in milliseconds)"""
+        metrics = [f'app;dur={total_seconds * 1000:.1f}']
+        for operation, name in DB_TIMING_NAMES.items():
+            if operation == 'execute':
+                metrics.append(f'{name};dur={self.db_seconds[operation] * 1000:.1f};desc="{self.query_count} queries"')
+            elif self.db_seconds[operation]:
+                metrics.append(f'{name};dur={self.db_seconds[operation] * 1000:.1f}')
+        if self.llm_calls:
+            metrics.append(
+                f'llm;dur={self.llm_seconds * 1000:.1f};'
+                f'desc="{self.llm_calls} calls, {self.prompt_tokens + self.completion_tokens} tokens"'
+            )
+        return ', '.join(metrics)
+
+# The timings of the request being handled; None outside requests (e.g. background SQL jobs)
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+class ConnectionStats:
+    """Process-wide counts and connect latency for connections handed out by get_db_connection"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.in_use = 0
+        self.opened = 0
+        self.connect_seconds_total = 0.0
+        self.connect_seconds_max = 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'in_use': self.in_use,
+                'opened': self.opened,
+                'connect_ms_mean': round(self.connect_seconds_total * 1000 / self.opened, 3) if self.opened else None,
+                'connect_ms_max': round(self.connect_seconds_max * 1000, 3)
+            }
+
+connection_stats = ConnectionStats()
+
+def record_db_operation(operation: str, seconds: float, queries: int = 0):
+    DB_OPERATION_DURATION.labels(operation).observe(seconds)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.db_seconds[operation] += seconds
+        timings.query_count += queries
+
+def record_llm_call(deployment: str, seconds: float, outcome: str, prompt_tokens: int = 0,
+                    completion_tokens: int = 0):
+    LLM_REQUEST_DURATION.labels(deployment, outcome).observe(seconds)
+    if prompt_tokens:
+        LLM_TOKENS.labels(deployment, 'prompt').inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(deployment, 'completion').inc(completion_tokens)
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.llm_seconds += seconds
+        timings.llm_calls += 1
+        timings.prompt_tokens += prompt_tokens
+        timings.completion_tokens += completion_tokens
+
+class InstrumentedCursor:
+    """Cursor wrapper that times execute and fetch calls and records per-statement statistics;
+    everything else goes to the real cursor"""
+    
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._fingerprint = None
+    
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+    
+    def __setattr__(self, name, value):
+        # Options such as fast_executemany must reach the driver's cursor
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+    
+    def __iter__(self):
+        # Rows arrive in fetchmany chunks, each timed and counted, so a large result is never held in full
+        size = max(self.arraysize, ITER_FETCH_SIZE)
+        while True:
+            rows = self.fetchmany(size)
+            if not rows:
+                return
+            yield from rows
+    
+    def _execute(self, method, sql, params, batch_size=None):
+        started = time.perf_counter()
+        failed = True
+        try:
+            method(sql, *params)
+            failed = False
+        finally:
+            seconds = time.perf_counter() - started
+            record_db_operation('execute', seconds, queries=1)
+            self._fingerprint = record_execution(sql, params, seconds, failed, batch_size)
+    
+    def _fetch(self, method, *args):
+        started = time.perf_counter()
+        rows = method(*args)
+        seconds = time.perf_counter() - started
+        record_db_operation('fetch', seconds)
+        if self._fingerprint is not None:
+            # fetchone returns a single row (or None), the others a list of rows
+            record_fetch(self._fingerprint, seconds, len(rows) if isinstance(rows, list) else int(rows is not None))
+        return rows
+    
+    def execute(self, sql, *params):
+        self._execute(self._cursor.execute, sql, params)
+        return self
+    
+    def executemany(self, sql, seq_of_params):
+        batch_size = len(seq_of_params) if hasattr(seq_of_params, '__len__') else None
+        self._execute(self._cursor.executemany, sql, (seq_of_params,), batch_size)
+        return self
+    
+    def nextset(self):
+        # Moving to the next result set makes the server run the next statement of a batch
+        if not hasattr(self._cursor, 'nextset'):
+            # sqlite3 cursors run one statement per execute, so there is never another result set
+            return False
+        started = time.perf_counter()
+        try:
+            return self._cursor.nextset()
+        finally:
+            record_db_operation('execute', time.perf_counter() - started)
+    
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+    
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+    
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+class InstrumentedConnection:
+    """Connection wrapper whose cursors are instrumented.
+    
+    Created right after connecting, with the time the connect took; close() releases it.
+    """
+    
+    def __init__(self, conn, connect_seconds: float):
+        self._conn = conn
+        self._closed = False
+        record_db_operation('connect', connect_seconds)
+        with connection_stats.lock:
+            connection_stats.in_use += 1
+            connection_stats.opened += 1
+            connection_stats.connect_seconds_total += connect_seconds
+            connection_stats.connect_seconds_max = max(connection_stats.connect_seconds_max, connect_seconds)
+        DB_CONNECTIONS_IN_USE.inc()
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+    
+    def __setattr__(self, name, value):
+        # autocommit and timeout are connection properties on pyodbc
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+    
+    def cursor(self):
+        return InstrumentedCursor(self._conn.cursor())
+    
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        with connection_stats.lock:
+            connection_stats.in_use -= 1
+        DB_CONNECTIONS_IN_USE.dec()
+        self._conn.close()
+    
+    def execute(self, sql, *params):
+        # sqlite3 shortcut used by a few callers; pyodbc connections have it too
+        return self.cursor().execute(sql, *params)
+
+def _route_label(request: Request) -> str:
+    # Label by route template rather than raw path so IDs don't explode the series count
+    route = request.scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+async def timing_middleware(request: Request, call_next):
+    """Time each request, record its metrics and report a Server-Timing breakdown"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        _current_timings.reset(token)
+        route = _route_label(request)
+        HTTP_REQUESTS.labels(request.method, route, str(status)).inc()
+        HTTP_REQUEST_DURATION.labels(request.method, route).observe(elapsed)
+    
+    response.headers['Server-Timing'] = timings.server_timing(elapsed)
+    # Let browser dev tools show the breakdown for cross-origin frontend calls
+    response.headers['Timing-Allow-Origin'] = '*'
+    return response
+
+def metrics_payload():
+    """Current metrics in the Prometheus text exposition format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
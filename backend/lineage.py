@@ -0,0 +1,327 @@
+
+import time
+import threading
+import logging
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple, Union, Set, Iterable
+
+from database import get_db_connection, get_mapping_file_versions_single_table, iter_lineage_edges_single_table
+from config import LINEAGE_REFRESH_SECONDS, LINEAGE_MAX_NODES
+
+logger = logging.getLogger(__name__)
+
+DIRECTIONS = ('upstream', 'downstream')
+DEFAULT_DEPTH = 5
+# Files reloaded per query; keeps the IN list well below SQL Server's 2100 parameter limit
+RELOAD_CHUNK_SIZE = 500
+
+ColumnKey = Tuple[str, str, str]
+# The mapping file(s) defining an edge: one file id, or a set once several files share the edge
+EdgeFiles = Union[int, Set[int]]
+
+def column_key(malcode: Optional[str], table: Optional[str], column: Optional[str]) -> ColumnKey:
+    # SQL Server compares names case-insensitively, so the graph does too
+    return ((malcode or '').strip().upper(), (table or '').strip().upper(), (column or '').strip().upper())
+
+class LineageGraph:
+    """In-memory column lineage graph over the active rows of mapping_single.
+    
+    Columns (malcode.table.column) are interned to integer ids with forward and reverse adjacency maps, so
+    traversals never touch the database. The graph is built on first use, reloaded per file after saves in this
+    process and re-synced against the per-file versions every LINEAGE_REFRESH_SECONDS to pick up other writers.
+    """
+    
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+        self._stale = False
+        self._checked_at = 0.0
+        self._built_at = None
+        self._build_seconds = None
+    
+    def _reset(self):
+        self._column_ids: Dict[ColumnKey, int] = {}
+        self._columns: List[Tuple[str, str, str]] = []
+        self._file_ids: Dict[str, int] = {}
+        self._files: List[str] = []
+        self._downstream: Dict[int, Dict[int, EdgeFiles]] = {}
+        self._upstream: Dict[int, Dict[int, EdgeFiles]] = {}
+        # Flat (source, target, source, target, ...) edge ids per file, for removing a file's edges
+        self._file_edges: Dict[int, array] = {}
+        self._versions: Dict[str, str] = {}
+        self._edge_count = 0
+        self._built = False
+    
+    def _column_id(self, malcode: str, table: str, column: str) -> int:
+        key = column_key(malcode, table, column)
+        column_id = self._column_ids.get(key)
+        if column_id is None:
+            column_id = self._column_ids[key] = len(self._columns)
+            self._columns.append((malcode, table, column))
+        return column_id
+    
+    def _file_id(self, file_name: str) -> int:
+        file_id = self._file_ids.get(file_name)
+        if file_id is None:
+            file_id = self._file_ids[file_name] = len(self._files)
+            self._files.append(file_name)
+        return file_id
+    
+    def _link(self, source: int, target: int, file_id: int):
+        targets = self._downstream.setdefault(source, {})
+        files = targets.get(target)
+        if files is None:
+            targets[target] = file_id
+            self._upstream.setdefault(target, {})[source] = file_id
+            self._edge_count += 1
+        elif isinstance(files, set):
+            # Shared with the reverse map, so adding in place updates both
+            files.add(file_id)
+        elif files != file_id:
+            files = {files, file_id}
+            targets[target] = files
+            self._upstream[target][source] = files
+    
+    def _unlink(self, source: int, target: int, file_id: int):
+        targets = self._downstream.get(source)
+        files = targets.get(target) if targets else None
+        if files is None:
+            return
+        if isinstance(files, set):
+            files.discard(file_id)
+            if len(files) == 1:
+                remaining = next(iter(files))
+                targets[target] = remaining
+                self._upstream[target][source] = remaining
+            return
+        if files != file_id:
+            return
+        
+        del targets[target]
+        if not targets:
+            del self._downstream[source]
+        sources = self._upstream[target]
+        del sources[source]
+        if not sources:
+            del self._upstream[target]
+        self._edge_count -= 1
+    
+    def _add_edges(self, rows: Iterable[Tuple]) -> int:
+        count = 0
+        for file_name, source_malcode, source_table, source_column, target_malcode, target_table, target_column in rows:
+            file_id = self._file_id(file_name)
+            source = self._column_id(source_malcode, source_table, source_column)
+            target = self._column_id(target_malcode, target_table, target_column)
+            self._link(source, target, file_id)
+            edges = self._file_edges.get(file_id)
+            if edges is None:
+                edges = self._file_edges[file_id] = array('q')
+            edges.append(source)
+            edges.append(target)
+            count += 1
+        return count
+    
+    def _remove_file(self, file_name: str):
+        file_id = self._file_ids.get(file_name)
+        edges = self._file_edges.pop(file_id, None) if file_id is not None else None
+        if edges:
+            for i in range(0, len(edges), 2):
+                self._unlink(edges[i], edges[i + 1], file_id)
+        self._versions.pop(file_name, None)
+    
+    def _load_files(self, conn, file_names: List[str]):
+        for start in range(0, len(file_names), RELOAD_CHUNK_SIZE):
+            chunk = file_names[start:start + RELOAD_CHUNK_SIZE]
+            versions = get_mapping_file_versions_single_table(conn, chunk)
+            for file_name in chunk:
+                self._remove_file(file_name)
+            self._add_edges(iter_lineage_edges_single_table(conn, [name for name in chunk if name in versions]))
+            self._versions.update(versions)
+    
+    def _build(self, conn):
+        started = time.perf_counter()
+        self._reset()
+        # Versions are read first, so rows changed while the edges stream in are reloaded on the next sync
+        self._versions = get_mapping_file_versions_single_table(conn)
+        edges = self._add_edges(iter_lineage_edges_single_table(conn))
+        self._built = True
+        self._build_seconds = time.perf_counter() - started
+        self._built_at = datetime.now(timezone.utc)
+        logger.info(f"Built lineage graph: {len(self._column_ids)} columns, {self._edge_count} edges from "
+                    f"{edges} mapping rows in {len(self._versions)} files ({self._build_seconds:.2f}s)")
+    
+    def _sync(self, conn):
+        versions = get_mapping_file_versions_single_table(conn)
+        removed = [name for name in self._versions if name not in versions]
+        changed = [name for name, version in versions.items() if self._versions.get(name) != version]
+        for file_name in removed:
+            self._remove_file(file_name)
+        if changed:
+            self._load_files(conn, changed)
+        if removed or changed:
+            logger.info(f"Synced lineage graph: {len(changed)} changed and {len(removed)} removed mapping files")
+    
+    def ensure_current(self, force_rebuild: bool = False):
+        """Build the graph on first use and re-sync it once LINEAGE_REFRESH_SECONDS have passed (0 = never)"""
+        with self._lock:
+            due = LINEAGE_REFRESH_SECONDS > 0 and time.monotonic() - self._checked_at >= LINEAGE_REFRESH_SECONDS
+            if self._built and not self._stale and not due and not force_rebuild:
+                return
+            with get_db_connection() as conn:
+                if self._built and not force_rebuild:
+                    self._sync(conn)
+                else:
+                    self._build(conn)
+            self._checked_at = time.monotonic()
+            self._stale = False
+    
+    def reload_files(self, conn, file_names: List[str]):
+        """Reload the edges of mapping files that were just saved or deleted; a no-op until the graph is built"""
+        with self._lock:
+            if self._built:
+                self._load_files(conn, list(dict.fromkeys(file_names)))
+    
+    def mark_stale(self):
+        """Force a sync against the database before the next query"""
+        self._stale = True
+    
+    def _column_name(self, column_id: int) -> str:
+        return '.'.join(self._columns[column_id])
+    
+    def _column_dict(self, column_id: int) -> Dict[str, Any]:
+        malcode, table, column = self._columns[column_id]
+        return {'id': self._column_name(column_id), 'malcode': malcode, 'table': table, 'column': column}
+    
+    def _file_names(self, files: EdgeFiles) -> List[str]:
+        if isinstance(files, set):
+            return sorted(self._files[file_id] for file_id in files)
+        return [self._files[files]]
+    
+    def _walk(self, roots: List[int], adjacency: Dict[int, Dict[int, EdgeFiles]], max_depth: int, max_nodes: int):
+        """Breadth-first walk from roots; returns the depth of every column reached, the edges followed (in walk
+        direction), whether max_nodes cut it short and the columns at the final depth"""
+        depths = {root: 0 for root in roots}
+        edges = []
+        frontier = list(depths)
+        truncated = False
+        depth = 0
+        while frontier and depth < max_depth:
+            depth += 1
+            next_frontier = []
+            for node in frontier:
+                for neighbour, files in adjacency.get(node, {}).items():
+                    if neighbour not in depths:
+                        if len(depths) - len(roots) >= max_nodes:
+                            truncated = True
+                            continue
+                        depths[neighbour] = depth
+                        next_frontier.append(neighbour)
+                    edges.append((node, neighbour, files))
+            frontier = next_frontier
+        return depths, edges, truncated, frontier
+    
+    def traverse(self, malcode: str, table: str, column: str, direction: str, max_depth: int = DEFAULT_DEPTH,
+                 max_nodes: int = LINEAGE_MAX_NODES) -> Optional[Dict[str, Any]]:
+        """Breadth-first walk up- or downstream of a column, up to max_depth hops and max_nodes columns.
+        
+        Returns None when no mapping references the column.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"direction must be one of: {', '.join(DIRECTIONS)}")
+        started = time.perf_counter()
+        with self._lock:
+            root = self._column_ids.get(column_key(malcode, table, column))
+            if root is None or (root not in self._downstream and root not in self._upstream):
+                return None
+            
+            adjacency = self._downstream if direction == 'downstream' else self._upstream
+            depths, edges, truncated, frontier = self._walk([root], adjacency, max_depth, max_nodes)
+            if direction == 'upstream':
+                edges = [(source, target, files) for target, source, files in edges]
+            
+            result = {
+                'column': self._column_dict(root),
+                'direction': direction,
+                'max_depth': max_depth,
+                'columns': [dict(self._column_dict(node), depth=node_depth)
+                            for node, node_depth in depths.items() if node != root],
+                'edges': [{'source': self._column_name(source), 'target': self._column_name(target),
+                           'mapping_files': self._file_names(files)} for source, target, files in edges],
+                'truncated': truncated,
+                # Columns at the depth limit that still have neighbours mean there is more lineage beyond it
+                'depth_limited': any(node in adjacency for node in frontier)
+            }
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return result
+    
+    def downstream_reach(self, columns: Iterable[Tuple[str, str, str]], max_depth: int = DEFAULT_DEPTH,
+                         max_nodes: int = LINEAGE_MAX_NODES) -> Dict[str, Any]:
+        """Combined downstream reach of many columns in one walk: how many columns they feed and through which
+        mapping files"""
+        with self._lock:
+            roots = list(dict.fromkeys(
+                column_id for column_id in (self._column_ids.get(column_key(*column)) for column in columns)
+                if column_id is not None and column_id in self._downstream
+            ))
+            depths, edges, truncated, frontier = self._walk(roots, self._downstream, max_depth, max_nodes)
+            file_ids = set()
+            for _, _, files in edges:
+                if isinstance(files, set):
+                    file_ids.update(files)
+                else:
+                    file_ids.add(files)
+            return {
+                'affected_columns': len(depths) - len(roots),
+                'mapping_files': sorted(self._files[file_id] for file_id in file_ids),
+                'truncated': truncated,
+                'depth_limited': any(node in self._downstream for node in frontier)
+            }
+    
+    def impact(self, malcode: str, table: str, column: str, max_depth: int = DEFAULT_DEPTH,
+               max_nodes: int = LINEAGE_MAX_NODES) -> Optional[Dict[str, Any]]:
+        """Everything downstream of a column, summarised by depth, mapping file and final target"""
+        result = self.traverse(malcode, table, column, 'downstream', max_depth, max_nodes)
+        if result is None:
+            return None
+        
+        with self._lock:
+            terminal = [entry for entry in result['columns']
+                        if self._column_ids.get(column_key(entry['malcode'], entry['table'], entry['column']))
+                        not in self._downstream]
+        columns_by_depth: Dict[int, int] = {}
+        for entry in result['columns']:
+            columns_by_depth[entry['depth']] = columns_by_depth.get(entry['depth'], 0) + 1
+        result['impact'] = {
+            'affected_columns': len(result['columns']),
+            'affected_tables': len({(entry['malcode'], entry['table']) for entry in result['columns']}),
+            'mapping_files': sorted({name for edge in result['edges'] for name in edge['mapping_files']}),
+            'columns_by_depth': columns_by_depth,
+            'terminal_columns': terminal
+        }
+        return result
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'built': self._built,
+                'columns': len(self._column_ids),
+                'edges': self._edge_count,
+                'mapping_files': len(self._versions),
+                'built_at': self._built_at.isoformat() if self._built_at else None,
+                'build_seconds': round(self._build_seconds, 3) if self._build_seconds is not None else None,
+                'refresh_seconds': LINEAGE_REFRESH_SECONDS
+            }
+
+lineage_graph = LineageGraph()
+
+def notify_mapping_files_changed(conn, file_names: List[str]):
+    """Update the lineage graph after mapping files were written on conn (after the commit).
+    
+    Never fails the write: on error the graph re-syncs before its next query instead.
+    """
+    try:
+        lineage_graph.reload_files(conn, file_names)
+    except Exception as e:
+        logger.warning(f"Failed to update lineage graph for {', '.join(file_names)}: {str(e)}")
+        lineage_graph.mark_stale()
@@ -6,6 +6,14 @@ from routes.mapping_routes import router as mapping_router
 from routes.openai_routes import router as openai_router
 from routes.ddl_routes import router as ddl_router
 from routes.metadata_routes import router as metadata_router
+from routes.job_routes import router as job_router
+from routes.metrics_routes import router as metrics_router
+from routes.admin_routes import router as admin_router
+from routes.lineage_routes import router as lineage_router
+from routes.change_routes import router as change_router
+from instrumentation import timing_middleware
+from sql_jobs import shutdown_jobs
+from mapping_archive import mapping_archiver
 
 app = FastAPI(title="Data Mapping Backend API - Single Table Structure", version="2.0.0")
 
@@ -18,12 +26,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request timing, Server-Timing headers and Prometheus metrics
+app.middleware("http")(timing_middleware)
+
 # Include routers
 app.include_router(health_router)
 app.include_router(mapping_router)
 app.include_router(openai_router)
 app.include_router(ddl_router)
 app.include_router(metadata_router)
+app.include_router(job_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
+app.include_router(lineage_router)
+app.include_router(change_router)
+
+@app.on_event("startup")
+def start_mapping_archiver():
+    mapping_archiver.start()
+
+@app.on_event("shutdown")
+def stop_sql_jobs():
+    # Cancel background SQL jobs so their history is not left as 'running'
+    shutdown_jobs()
+
+@app.on_event("shutdown")
+def stop_mapping_archiver():
+    # Waits for a run in progress; each batch commits on its own, so none is left half done
+    mapping_archiver.stop()
 
 if __name__ == "__main__":
     import uvicorn
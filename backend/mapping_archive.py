@@ -0,0 +1,55 @@
+
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from database import get_db_connection, archive_inactive_mapping_rows_single_table
+from config import MAPPING_ARCHIVE_INTERVAL_SECONDS, MAPPING_ARCHIVE_AFTER_DAYS, MAPPING_ARCHIVE_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+class MappingArchiver:
+    """Moves mapping rows inactive for MAPPING_ARCHIVE_AFTER_DAYS to mapping_single_archive.
+    
+    Runs on request, and every MAPPING_ARCHIVE_INTERVAL_SECONDS on a background thread when that is set. Rows are moved in
+    batches of MAPPING_ARCHIVE_BATCH_SIZE, each its own transaction, so a run never blocks writers for long.
+    """
+    
+    def __init__(self, interval_seconds: float = MAPPING_ARCHIVE_INTERVAL_SECONDS):
+        self._interval_seconds = interval_seconds
+        self._run_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def run_once(self, older_than_days: Optional[float] = None) -> Dict[str, int]:
+        """Archive rows inactive for longer than older_than_days (default MAPPING_ARCHIVE_AFTER_DAYS) and
+        return how many were archived per mapping file. Runs one at a time."""
+        days = MAPPING_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+        with self._run_lock:
+            with get_db_connection() as conn:
+                return archive_inactive_mapping_rows_single_table(
+                    conn, datetime.now() - timedelta(days=days), MAPPING_ARCHIVE_BATCH_SIZE
+                )
+    
+    def _run(self):
+        while not self._stopped.wait(self._interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                # Try again next interval; the rows stay where they are until then
+                logger.error(f"Error archiving inactive mapping rows: {str(e)}")
+    
+    def start(self):
+        if self._interval_seconds <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="mapping-archiver", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+mapping_archiver = MappingArchiver()
@@ -0,0 +1,152 @@
+
+import io
+import os
+import re
+import csv
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Iterator, Dict, List, Optional
+
+from database import get_db_connection, iter_mapping_rows_single_table
+from config import EXPORT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+# Responses append '; charset=utf-8' to text/* media types themselves
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+}
+
+# Column headers, in iter_mapping_rows_single_table order; the names match the upload field names
+EXPORT_COLUMNS = [
+    'mapping_file_name', 'source_malcode', 'source_table', 'source_column', 'source_data_type', 'source_type',
+    'target_malcode', 'target_table', 'target_column', 'target_data_type', 'target_type',
+    'transformation', 'join_clause', 'status', 'reviewer', 'reviewed_at', 'created_by', 'created_at', 'updated_at'
+]
+# Bump when the layout above changes so cached workbooks and client ETags are invalidated
+EXPORT_LAYOUT_VERSION = 1
+
+MAX_EXPORT_FILES = 100
+CSV_FLUSH_ROWS = 1000
+MAX_CACHED_EXPORTS = 20
+
+_INVALID_SHEET_CHARACTERS = re.compile(r'[\[\]:*?/\\]')
+_UNSAFE_FILENAME_CHARACTERS = re.compile(r'[^A-Za-z0-9._-]+')
+_cache_lock = threading.Lock()
+
+def export_etag(versions: Dict[str, str], file_format: str, content_encoding: Optional[str] = None) -> str:
+    """Strong ETag for an export of the mapping files with the given versions"""
+    key = json.dumps([EXPORT_LAYOUT_VERSION, file_format, content_encoding, sorted(versions.items())])
+    return f'"{hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]}"'
+
+def export_filename(file_names: Optional[List[str]], file_format: str) -> str:
+    base = file_names[0] if file_names and len(file_names) == 1 else 'mapping_files'
+    return f"{_UNSAFE_FILENAME_CHARACTERS.sub('_', base).strip('_') or 'mapping_file'}.{file_format}"
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def iter_csv_export(file_names: Optional[List[str]], gzip: bool = False) -> Iterator[bytes]:
+    """Generate a CSV export chunk by chunk straight from the database cursor, optionally gzip-compressed"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def drain() -> bytes:
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+    
+    # The BOM makes Excel open the file as UTF-8
+    buffer.write('\ufeff')
+    writer.writerow(EXPORT_COLUMNS)
+    rows = 0
+    with get_db_connection() as conn:
+        for row in iter_mapping_rows_single_table(conn, file_names):
+            writer.writerow([_csv_value(value) for value in row])
+            rows += 1
+            if rows % CSV_FLUSH_ROWS == 0:
+                chunk = drain()
+                if chunk:
+                    yield chunk
+    
+    yield drain() + (compressor.flush() if compressor else b'')
+    logger.info(f"Exported {rows} mapping rows as CSV{' (gzip)' if gzip else ''}")
+
+def _sheet_title(file_name: str, used: set) -> str:
+    title = _INVALID_SHEET_CHARACTERS.sub('_', file_name).strip("'") or 'Mapping'
+    title = title[:31]
+    suffix = 1
+    while title.lower() in used:
+        suffix += 1
+        title = f"{title[:31 - len(str(suffix)) - 1]}~{suffix}"
+    used.add(title.lower())
+    return title
+
+def _xlsx_value(value):
+    if isinstance(value, str):
+        from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+def _evict_cached_exports():
+    exports = [os.path.join(EXPORT_CACHE_DIR, name) for name in os.listdir(EXPORT_CACHE_DIR) if name.endswith('.xlsx')]
+    if len(exports) <= MAX_CACHED_EXPORTS:
+        return
+    exports.sort(key=os.path.getmtime)
+    for path in exports[:len(exports) - MAX_CACHED_EXPORTS]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def build_xlsx_export(file_names: Optional[List[str]], etag: str) -> str:
+    """Write an XLSX export with one sheet per mapping file and return its path.
+    
+    The workbook is written in openpyxl's write-only mode, which streams rows to disk in constant memory.
+    Workbooks are cached by ETag, so an unchanged export is only generated once.
+    """
+    path = os.path.join(EXPORT_CACHE_DIR, f"{etag.strip(chr(34))}.xlsx")
+    if os.path.exists(path):
+        # Touch it so eviction removes the least recently used exports first
+        os.utime(path)
+        return path
+    
+    from openpyxl import Workbook
+    
+    os.makedirs(EXPORT_CACHE_DIR, exist_ok=True)
+    workbook = Workbook(write_only=True)
+    used_titles = set()
+    sheet = None
+    current_file = None
+    rows = 0
+    with get_db_connection() as conn:
+        for row in iter_mapping_rows_single_table(conn, file_names):
+            if sheet is None or row[0] != current_file:
+                current_file = row[0]
+                sheet = workbook.create_sheet(_sheet_title(current_file, used_titles))
+                sheet.append(EXPORT_COLUMNS)
+            sheet.append([_xlsx_value(value) for value in row])
+            rows += 1
+    if sheet is None:
+        workbook.create_sheet('Mappings').append(EXPORT_COLUMNS)
+    
+    # Write under a temporary name so concurrent requests never serve a half-written file
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    workbook.save(temp_path)
+    os.replace(temp_path, path)
+    with _cache_lock:
+        _evict_cached_exports()
+    logger.info(f"Exported {rows} mapping rows as XLSX ({len(used_titles)} sheets)")
+    return path
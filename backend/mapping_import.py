@@ -0,0 +1,207 @@
+
+import json
+import time
+import logging
+from typing import Dict, Any, List, Optional, Tuple, BinaryIO
+
+from database import (
+    delete_mapping_file_rows_single_table,
+    bulk_insert_mapping_rows_single_table,
+    upsert_column_metadata_single_table,
+    get_mapping_file_versions_single_table,
+    record_mapping_changes_single_table,
+    record_mapping_file_revision_single_table
+)
+from metadata_import import iter_tabular_records, clean_text
+
+logger = logging.getLogger(__name__)
+
+# Header spellings accepted for the sample mapping template columns (public/sample_mapping_template.csv)
+MAPPING_FIELD_ALIASES = {
+    'program': 'pod',
+    'domain': 'pod',
+    'mal_code': 'malcode',
+    'management_area': 'malcode',
+    'area_code': 'malcode',
+    'sourcecolumn': 'source_column',
+    'src_column': 'source_column',
+    'source_col': 'source_column',
+    'sourcetable': 'source_table',
+    'src_table': 'source_table',
+    'source_tbl': 'source_table',
+    'targetcolumn': 'target_column',
+    'tgt_column': 'target_column',
+    'target_col': 'target_column',
+    'targettable': 'target_table',
+    'tgt_table': 'target_table',
+    'target_tbl': 'target_table',
+    'transform': 'transformation',
+    'logic': 'transformation',
+    'rule': 'transformation',
+    'join': 'join_clause',
+    'source_datatype': 'source_data_type',
+    'target_datatype': 'target_data_type'
+}
+
+MAPPING_TEMPLATE_FIELDS = ['pod', 'malcode', 'source_column', 'source_table', 'target_column', 'target_table',
+                           'transformation']
+REQUIRED_MAPPING_HEADERS = ['pod', 'source_column', 'source_table', 'target_column', 'target_table']
+
+SUPPORTED_FORMATS = ('csv', 'xlsx')
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_REJECTS = 1000
+
+# Column types the upload UI assigns to every imported row
+DEFAULT_DATA_TYPE = 'VARCHAR'
+DEFAULT_SOURCE_TYPE = 'SRZ_ADLS'
+DEFAULT_TARGET_TYPE = 'CZ_ADLS'
+
+def validate_mapping_headers(headers: List[str]):
+    """Reject files that don't follow the mapping template layout before reading any rows"""
+    missing = [field for field in REQUIRED_MAPPING_HEADERS if field not in headers]
+    if 'malcode' not in headers and not ('source_malcode' in headers and 'target_malcode' in headers):
+        missing.insert(1, 'malcode')
+    if missing:
+        raise ValueError(
+            f"Missing required column(s): {', '.join(missing)}. "
+            f"Expected the template layout: {', '.join(MAPPING_TEMPLATE_FIELDS)}"
+        )
+
+def validate_mapping_record(record: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    """Validate a raw template row and return its cleaned fields"""
+    malcode = clean_text(record.get('malcode'))
+    fields = {
+        'pod': clean_text(record.get('pod')),
+        'malcode': malcode,
+        'source_malcode': clean_text(record.get('source_malcode')) or malcode,
+        'source_table': clean_text(record.get('source_table')),
+        'source_column': clean_text(record.get('source_column')),
+        'source_data_type': clean_text(record.get('source_data_type')) or DEFAULT_DATA_TYPE,
+        'target_malcode': clean_text(record.get('target_malcode')) or malcode,
+        'target_table': clean_text(record.get('target_table')),
+        'target_column': clean_text(record.get('target_column')),
+        'target_data_type': clean_text(record.get('target_data_type')) or DEFAULT_DATA_TYPE,
+        'transformation': clean_text(record.get('transformation')),
+        'join_clause': clean_text(record.get('join_clause'))
+    }
+    
+    missing = [name for name in ('pod', 'source_malcode', 'source_table', 'source_column',
+                                 'target_malcode', 'target_table', 'target_column') if not fields[name]]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    for name, limit in (('source_malcode', 255), ('source_table', 255), ('source_column', 255),
+                        ('target_malcode', 255), ('target_table', 255), ('target_column', 255),
+                        ('source_data_type', 100), ('target_data_type', 100)):
+        if len(fields[name]) > limit:
+            raise ValueError(f"{name} exceeds {limit} characters")
+    return fields
+
+def import_mapping_file(conn, file: BinaryIO, file_format: str, name: str, description: Optional[str] = None,
+                        source_system: Optional[str] = None, target_system: Optional[str] = None,
+                        status: str = 'draft', created_by: str = 'File Import',
+                        batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> Dict[str, Any]:
+    """Stream mapping rows from a CSV/XLSX template file into mapping_single, replacing the named mapping file.
+    
+    Rows are bulk inserted in batches inside one transaction, so the existing file is only replaced if the
+    upload succeeds. Invalid rows are skipped and reported. With dry_run nothing is written.
+    """
+    started = time.perf_counter()
+    cursor = conn.cursor()
+    rows_read = 0
+    inserted = 0
+    deleted = 0
+    batches = 0
+    rejected = 0
+    rejects = []
+    batch: List[Tuple] = []
+    referenced_columns = []
+    
+    def reject(row_number: int, error: str):
+        nonlocal rejected
+        rejected += 1
+        if len(rejects) < MAX_REPORTED_REJECTS:
+            rejects.append({'row': row_number, 'error': error})
+    
+    def flush():
+        nonlocal inserted, batches
+        if not dry_run:
+            inserted += bulk_insert_mapping_rows_single_table(cursor, batch)
+            # Register every referenced source/target column in the metadata catalogue
+            upsert_column_metadata_single_table(cursor, referenced_columns)
+        else:
+            inserted += len(batch)
+        batches += 1
+        batch.clear()
+        referenced_columns.clear()
+    
+    try:
+        if not dry_run:
+            deleted = delete_mapping_file_rows_single_table(cursor, name)
+        
+        records = iter_tabular_records(file, file_format, MAPPING_FIELD_ALIASES, validate_mapping_headers)
+        for row_number, record in records:
+            rows_read += 1
+            try:
+                fields = validate_mapping_record(record)
+            except ValueError as e:
+                reject(row_number, str(e))
+                continue
+            
+            # Like the upload dialog, default the systems to the first row's tables
+            source_system = source_system or fields['source_table']
+            target_system = target_system or fields['target_table']
+            comments = [f"Pod: {fields['pod']}"]
+            if fields['malcode']:
+                comments.append(f"Malcode: {fields['malcode']}")
+            
+            batch.append((
+                name, description, source_system, target_system, status,
+                fields['source_malcode'], fields['source_table'], fields['source_column'],
+                fields['source_data_type'], DEFAULT_SOURCE_TYPE,
+                fields['target_malcode'], fields['target_table'], fields['target_column'],
+                fields['target_data_type'], DEFAULT_TARGET_TYPE,
+                fields['transformation'], fields['join_clause'], created_by, json.dumps(comments)
+            ))
+            referenced_columns.append((fields['source_malcode'], fields['source_table'], fields['source_column'],
+                                       fields['source_data_type'], created_by))
+            referenced_columns.append((fields['target_malcode'], fields['target_table'], fields['target_column'],
+                                       fields['target_data_type'], created_by))
+            if len(batch) >= batch_size:
+                flush()
+        
+        if batch:
+            flush()
+        if not inserted:
+            raise ValueError("No valid mapping rows found in the file")
+        
+        revision = None
+        if not dry_run:
+            revision = record_mapping_file_revision_single_table(cursor, name, created_by, 'upload')
+            version = get_mapping_file_versions_single_table(conn, [name]).get(name)
+            record_mapping_changes_single_table(cursor, [('file_saved', name, None, {
+                'version': version, 'row_count': inserted, 'source': 'upload', 'revision': revision
+            })])
+            conn.commit()
+    except Exception:
+        if not dry_run:
+            conn.rollback()
+        raise
+    
+    elapsed = time.perf_counter() - started
+    logger.info(f"{'Validated' if dry_run else 'Imported'} {inserted} mapping rows into {name} "
+                f"({rejected} rejected, {deleted} replaced) in {batches} batches, {elapsed:.2f}s")
+    
+    return {
+        'name': name,
+        'dry_run': dry_run,
+        'revision': revision,
+        'rows_read': rows_read,
+        'rows_imported': inserted,
+        'rows_replaced': deleted,
+        'rows_rejected': rejected,
+        'batches': batches,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_read / elapsed, 1) if elapsed > 0 else None,
+        'rejects': rejects,
+        'rejects_truncated': rejected > len(rejects)
+    }
@@ -0,0 +1,107 @@
+
+import json
+import hashlib
+from typing import Dict, Any, List, Iterable, Iterator, Sequence, Tuple
+
+from fast_json import loads
+
+# mapping_single columns a revision records per row, in the order they are stored in row_data.
+# Preceded by the file's name, description and systems they make a bulk_insert_mapping_rows_single_table row.
+REVISION_ROW_COLUMNS = (
+    "mapping_status, source_malcode, source_table_name, source_column_name, source_data_type, source_type, "
+    "target_malcode, target_table_name, target_column_name, target_data_type, target_type, "
+    "transformation, join_clause, created_by, comments"
+)
+# File-level fields kept with each revision
+REVISION_FILE_FIELDS = ('description', 'source_system', 'target_system')
+
+# Keys hash this exact text, so it must not depend on whether orjson is installed
+_row_encoder = json.JSONEncoder(separators=(',', ':'))
+
+def _keyed_rows(rows: Iterable[Sequence]) -> Iterator[Tuple[str, Sequence]]:
+    occurrences: Dict[str, int] = {}
+    for values in rows:
+        # Everything between mapping_status (first) and comments (last)
+        content = _row_encoder.encode(values[1:-1])
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        occurrence = occurrences[digest] = occurrences.get(digest, 0) + 1
+        yield f"{digest}:{occurrence}", values
+
+def revision_row_keys(rows: Iterable[Sequence]) -> Dict[str, str]:
+    """Map each row's revision key to its row_data JSON.
+    
+    The key is a hash of the row's mapping, numbered to tell identical rows apart, so a row that is saved again
+    unchanged keeps its key and is not stored again. Status and comments are review state rather than mapping
+    content and are left out of the key: a save after a review records no revision, and row_data keeps the
+    review state the row had when its mapping last changed.
+    """
+    return {row_key: _row_encoder.encode(values) for row_key, values in _keyed_rows(rows)}
+
+def revision_content_keys(rows: Iterable[Sequence]) -> List[str]:
+    """The revision key of each row, in order, for matching rows to a revision's rows by their mapping"""
+    return [row_key for row_key, _ in _keyed_rows(rows)]
+
+def revision_row(values: Sequence) -> Dict[str, Any]:
+    """A stored revision row in the shape load_mapping_files_from_single_table returns rows, without ids"""
+    (status, source_malcode, source_table, source_column, source_data_type, source_type, target_malcode,
+     target_table, target_column, target_data_type, target_type, transformation, join_clause, created_by,
+     comments) = values
+    return {
+        'sourceColumn': {
+            'malcode': source_malcode,
+            'table': source_table,
+            'column': source_column,
+            'dataType': source_data_type,
+            'sourceType': source_type
+        },
+        'targetColumn': {
+            'malcode': target_malcode,
+            'table': target_table,
+            'column': target_column,
+            'dataType': target_data_type,
+            'targetType': target_type
+        },
+        'transformation': transformation,
+        'join': join_clause,
+        'status': status,
+        'createdBy': created_by,
+        'comments': loads(comments) if comments and comments != '[]' else []
+    }
+
+def _target_column(row: Dict[str, Any]) -> Tuple:
+    target = row['targetColumn']
+    return target['malcode'], target['table'], target['column']
+
+def _changed_fields(before: Dict[str, Any], after: Dict[str, Any]) -> List[str]:
+    fields = []
+    for key, value in before.items():
+        if isinstance(value, dict):
+            fields.extend(f"{key}.{nested}" for nested in value if value[nested] != after[key].get(nested))
+        elif value != after.get(key):
+            fields.append(key)
+    return fields
+
+def diff_revision_rows(added: List[Dict[str, Any]], removed: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Split the rows one revision has and another doesn't into added, removed and changed.
+    
+    A row removed and a row added for the same target column, when it is the only one on each side, are reported
+    as one changed row with its before and after values and the fields that differ.
+    """
+    added_by_target: Dict[Tuple, List[Dict[str, Any]]] = {}
+    removed_by_target: Dict[Tuple, List[Dict[str, Any]]] = {}
+    for row in added:
+        added_by_target.setdefault(_target_column(row), []).append(row)
+    for row in removed:
+        removed_by_target.setdefault(_target_column(row), []).append(row)
+    
+    changed = []
+    for target, before in removed_by_target.items():
+        after = added_by_target.get(target)
+        if len(before) == 1 and after is not None and len(after) == 1:
+            changed.append({'before': before[0], 'after': after[0], 'fields': _changed_fields(before[0], after[0])})
+    paired = {_target_column(change['before']) for change in changed}
+    return {
+        'added': [row for row in added if _target_column(row) not in paired],
+        'removed': [row for row in removed if _target_column(row) not in paired],
+        'changed': changed
+    }
@@ -0,0 +1,295 @@
+
+import io
+import csv
+import json
+import time
+import logging
+from typing import Iterator, Dict, Any, Optional, Tuple, List, Callable, BinaryIO
+
+from database import bulk_merge_metadata_single_table
+
+logger = logging.getLogger(__name__)
+
+METADATA_IMPORT_FIELDS = [
+    'malcode', 'malcode_description', 'table_name', 'table_description', 'column_name',
+    'column_description', 'data_type', 'is_primary_key', 'is_nullable', 'default_value'
+]
+
+# Alternative header spellings accepted in catalogue extracts
+METADATA_FIELD_ALIASES = {
+    'table': 'table_name',
+    'column': 'column_name',
+    'business_description': 'column_description',
+    'datatype': 'data_type',
+    'primary_key': 'is_primary_key',
+    'nullable': 'is_nullable',
+    'default': 'default_value'
+}
+
+SUPPORTED_FORMATS = ('csv', 'xlsx', 'json')
+DEFAULT_BATCH_SIZE = 5000
+MAX_REPORTED_REJECTS = 1000
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+_FALSE_VALUES = {'0', 'false', 'no', 'n', 'f'}
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str] = None) -> Optional[str]:
+    """Infer the import format from the file name or content type"""
+    name = (filename or '').lower()
+    for file_format in SUPPORTED_FORMATS:
+        if name.endswith(f'.{file_format}'):
+            return file_format
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        return 'json'
+    
+    content_type = (content_type or '').lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'spreadsheetml' in content_type:
+        return 'xlsx'
+    if 'json' in content_type:
+        return 'json'
+    return None
+
+def _normalize_header(header: Any, aliases: Dict[str, str] = METADATA_FIELD_ALIASES) -> str:
+    key = str(header or '').strip().lower().replace(' ', '_')
+    return aliases.get(key, key)
+
+def _iter_csv_records(file: BinaryIO, aliases: Dict[str, str] = METADATA_FIELD_ALIASES,
+                      on_headers: Optional[Callable[[List[str]], None]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    try:
+        reader = csv.reader(text)
+        # The header is the first non-blank line
+        header_row = next((values for values in reader if any(v.strip() for v in values)), [])
+        headers = [_normalize_header(h, aliases) for h in header_row]
+        if on_headers:
+            on_headers(headers)
+        for values in reader:
+            if not any(v.strip() for v in values):
+                continue
+            yield reader.line_num, dict(zip(headers, values))
+    finally:
+        # Don't let the wrapper close the underlying upload file
+        text.detach()
+
+def _iter_xlsx_records(file: BinaryIO, aliases: Dict[str, str] = METADATA_FIELD_ALIASES,
+                       on_headers: Optional[Callable[[List[str]], None]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import requires the openpyxl package")
+    
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Not a valid XLSX workbook: {str(e)}")
+    try:
+        rows = enumerate(workbook.active.iter_rows(values_only=True), start=1)
+        header_row = next((values for _, values in rows if any(v is not None and str(v).strip() for v in values)), ())
+        headers = [_normalize_header(h, aliases) for h in header_row]
+        if on_headers:
+            on_headers(headers)
+        for row_number, values in rows:
+            if not any(v is not None and str(v).strip() for v in values):
+                continue
+            yield row_number, dict(zip(headers, values))
+    finally:
+        workbook.close()
+
+def _iter_json_records(file: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Any]]:
+    """Incrementally decode a JSON array of objects or newline-delimited JSON objects"""
+    decoder = json.JSONDecoder()
+    text = io.TextIOWrapper(file, encoding='utf-8-sig')
+    buffer = ''
+    position = 0
+    eof = False
+    try:
+        while True:
+            # Skip separators between objects
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[]':
+                position += 1
+            
+            if position >= len(buffer):
+                if eof:
+                    return
+                buffer = text.read(chunk_size)
+                position = 0
+                eof = not buffer
+                continue
+            
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ValueError(f"Invalid JSON near: {buffer[position:position + 50]!r}")
+                chunk = text.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[position:] + chunk
+                position = 0
+                continue
+            
+            position = end
+            if not isinstance(record, dict):
+                raise ValueError("JSON import must contain objects, one per metadata column")
+            yield {_normalize_header(k): v for k, v in record.items()}
+    finally:
+        text.detach()
+
+def iter_tabular_records(file: BinaryIO, file_format: str, aliases: Dict[str, str],
+                         on_headers: Optional[Callable[[List[str]], None]] = None) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (row_number, record) for each non-blank row of a CSV or XLSX file, one at a time.
+    
+    Records are keyed by normalized header, and row numbers are the file's 1-based line or sheet row.
+    on_headers is called with the normalized header row before the first record.
+    """
+    if file_format == 'csv':
+        return _iter_csv_records(file, aliases, on_headers)
+    if file_format == 'xlsx':
+        return _iter_xlsx_records(file, aliases, on_headers)
+    raise ValueError(f"Unsupported format: {file_format}. Supported formats: csv, xlsx")
+
+def iter_metadata_records(file: BinaryIO, file_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (row_number, record) for each raw metadata record without loading the file into memory.
+    
+    Row numbers are the line or sheet row for tabular formats and the object's position for JSON.
+    """
+    if file_format == 'csv':
+        return _iter_csv_records(file)
+    if file_format == 'xlsx':
+        return _iter_xlsx_records(file)
+    if file_format == 'json':
+        return enumerate(_iter_json_records(file), start=1)
+    raise ValueError(f"Unsupported import format: {file_format}. Supported formats: {', '.join(SUPPORTED_FORMATS)}")
+
+def clean_text(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _parse_bool(value: Any, field: str) -> Optional[bool]:
+    if value is None or isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if not text:
+        return None
+    if text in _TRUE_VALUES:
+        return True
+    if text in _FALSE_VALUES:
+        return False
+    raise ValueError(f"{field} must be a boolean, got {value!r}")
+
+def validate_metadata_record(record: Dict[str, Any], created_by: str) -> Tuple:
+    """Validate a raw record and convert it to a bulk_merge_metadata_single_table row"""
+    malcode = clean_text(record.get('malcode'))
+    table_name = clean_text(record.get('table_name'))
+    column_name = clean_text(record.get('column_name'))
+    data_type = clean_text(record.get('data_type'))
+    
+    missing = [name for name, value in (('malcode', malcode), ('table_name', table_name),
+                                        ('column_name', column_name)) if not value]
+    if missing:
+        raise ValueError(f"Missing required field(s): {', '.join(missing)}")
+    for name, value, limit in (('malcode', malcode, 255), ('table_name', table_name, 255),
+                               ('column_name', column_name, 255), ('data_type', data_type, 100)):
+        if value and len(value) > limit:
+            raise ValueError(f"{name} exceeds {limit} characters")
+    
+    return (
+        malcode, clean_text(record.get('malcode_description')),
+        table_name, clean_text(record.get('table_description')),
+        column_name, clean_text(record.get('column_description')),
+        data_type,
+        _parse_bool(record.get('is_primary_key'), 'is_primary_key'),
+        _parse_bool(record.get('is_nullable'), 'is_nullable'),
+        clean_text(record.get('default_value')),
+        created_by
+    )
+
+def import_metadata_file(conn, file: BinaryIO, file_format: str, created_by: str,
+                         batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """Stream metadata rows from a file and MERGE them into metadata_single in batches.
+    
+    Each batch commits on its own. If the file turns out to be unreadable part way through, the rows read
+    before that point are still imported and the report has completed False and the error; a file that is
+    unreadable from the start raises ValueError and imports nothing.
+    """
+    started = time.perf_counter()
+    rows_read = 0
+    inserted = 0
+    updated = 0
+    batches = 0
+    rejected = 0
+    rejects = []
+    seen_keys: Dict[Tuple[str, str, str], int] = {}
+    batch = []
+    
+    def reject(row_number: int, error: str):
+        nonlocal rejected
+        rejected += 1
+        if len(rejects) < MAX_REPORTED_REJECTS:
+            rejects.append({'row': row_number, 'error': error})
+    
+    def flush():
+        nonlocal inserted, updated, batches
+        batch_inserted, batch_updated = bulk_merge_metadata_single_table(conn, batch)
+        inserted += batch_inserted
+        updated += batch_updated
+        batches += 1
+        batch.clear()
+    
+    records = iter_metadata_records(file, file_format)
+    error = None
+    while True:
+        try:
+            row_number, record = next(records)
+        except StopIteration:
+            break
+        except ValueError as e:
+            if not rows_read:
+                raise
+            # Earlier batches are committed, so report what was imported rather than fail the whole request
+            error = f"Stopped after row {row_number}: {e}"
+            break
+        rows_read += 1
+        try:
+            row = validate_metadata_record(record, created_by)
+        except ValueError as e:
+            reject(row_number, str(e))
+            continue
+        
+        # SQL Server compares names case-insensitively, so A.T.c and a.t.C would collide in the MERGE
+        key = (row[0].casefold(), row[2].casefold(), row[4].casefold())
+        if key in seen_keys:
+            reject(row_number, f"Duplicate of row {seen_keys[key]} for {row[0]}.{row[2]}.{row[4]}")
+            continue
+        seen_keys[key] = row_number
+        
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+    
+    if batch:
+        flush()
+    
+    elapsed = time.perf_counter() - started
+    imported = inserted + updated
+    logger.info(f"Imported {imported} metadata rows ({rejected} rejected) in {batches} batches, {elapsed:.2f}s")
+    if error:
+        logger.warning(f"Metadata import stopped early: {error}")
+    
+    return {
+        'completed': error is None,
+        'error': error,
+        'rows_read': rows_read,
+        'rows_imported': imported,
+        'rows_inserted': inserted,
+        'rows_updated': updated,
+        'rows_rejected': rejected,
+        'batches': batches,
+        'elapsed_seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_read / elapsed, 1) if elapsed > 0 else None,
+        'rejects': rejects,
+        'rejects_truncated': rejected > len(rejects)
+    }
@@ -0,0 +1,238 @@
+
+import os
+import re
+import time
+import logging
+from typing import List, Dict, Any, Optional, NamedTuple
+
+from sql_file_manager import get_sql_script
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql", "migrations")
+MIGRATION_FILE_PATTERN = re.compile(r'^V(\d+)__(\w+)\.sql$')
+MIGRATION_LOCK_RESOURCE = 'schema_migrations'
+MIGRATION_LOCK_TIMEOUT_MS = 30000
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    file_name: str
+    checksum: str
+    statements: List[str]
+    transactional: bool
+    lock_timeout_ms: Optional[int]
+
+class MigrationError(Exception):
+    """Raised when migrations cannot be applied safely"""
+
+def _parse_directives(sql_script: str) -> Dict[str, Any]:
+    """Read '-- migrate:<directive> [value]' header comments from a migration script"""
+    directives = {'transactional': True, 'lock_timeout_ms': None}
+    for match in re.finditer(r'^--\s*migrate:([\w-]+)(?:\s+(\S+))?\s*$', sql_script, re.MULTILINE):
+        directive, value = match.group(1).lower(), match.group(2)
+        if directive == 'no-transaction':
+            directives['transactional'] = False
+        elif directive == 'lock-timeout' and value:
+            directives['lock_timeout_ms'] = int(value)
+        else:
+            raise MigrationError(f"Unknown migration directive: {match.group(0).strip()}")
+    return directives
+
+def load_migrations(migrations_dir: str = MIGRATIONS_DIR) -> List[Migration]:
+    """Load and order all migration scripts from the migrations directory"""
+    migrations = []
+    for file_name in sorted(os.listdir(migrations_dir)):
+        match = MIGRATION_FILE_PATTERN.match(file_name)
+        if not match:
+            continue
+        
+        script = get_sql_script(os.path.join(migrations_dir, file_name))
+        directives = _parse_directives(script.content)
+        migrations.append(Migration(
+            version=int(match.group(1)),
+            name=match.group(2),
+            file_name=file_name,
+            checksum=script.checksum,
+            statements=script.statements,
+            transactional=directives['transactional'],
+            lock_timeout_ms=directives['lock_timeout_ms']
+        ))
+    
+    migrations.sort(key=lambda m: m.version)
+    for previous, current in zip(migrations, migrations[1:]):
+        if previous.version == current.version:
+            raise MigrationError(f"Duplicate migration version {current.version}: "
+                                 f"{previous.file_name} and {current.file_name}")
+    return migrations
+
+def _ensure_history_table(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        IF OBJECT_ID('schema_migrations', 'U') IS NULL
+            CREATE TABLE schema_migrations (
+                version INT PRIMARY KEY,
+                name NVARCHAR(255) NOT NULL,
+                checksum CHAR(64) NOT NULL,
+                applied_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+                execution_ms INT NOT NULL,
+                applied_by NVARCHAR(255) NOT NULL DEFAULT SUSER_SNAME()
+            )
+    """)
+    conn.commit()
+
+def get_applied_migrations(conn) -> Dict[int, Dict[str, Any]]:
+    """Get the migration history keyed by version"""
+    _ensure_history_table(conn)
+    cursor = conn.cursor()
+    cursor.execute("SELECT version, name, checksum, applied_at, execution_ms, applied_by FROM schema_migrations")
+    
+    applied = {}
+    for row in cursor.fetchall():
+        applied[row[0]] = {
+            'version': row[0],
+            'name': row[1],
+            'checksum': row[2],
+            'applied_at': row[3].isoformat() if row[3] else None,
+            'execution_ms': row[4],
+            'applied_by': row[5]
+        }
+    return applied
+
+def get_migration_status(conn) -> List[Dict[str, Any]]:
+    """Compare the migration scripts on disk with the migration history"""
+    applied = get_applied_migrations(conn)
+    status = []
+    
+    for migration in load_migrations():
+        record = applied.pop(migration.version, None)
+        if record is None:
+            state = 'pending'
+        elif record['checksum'] != migration.checksum:
+            state = 'checksum_mismatch'
+        else:
+            state = 'applied'
+        status.append({
+            'version': migration.version,
+            'name': migration.name,
+            'file_name': migration.file_name,
+            'checksum': migration.checksum,
+            'transactional': migration.transactional,
+            'status': state,
+            'applied_at': record['applied_at'] if record else None,
+            'execution_ms': record['execution_ms'] if record else None
+        })
+    
+    # History entries whose script no longer exists on disk
+    for record in applied.values():
+        status.append({**record, 'file_name': None, 'transactional': None, 'status': 'missing'})
+    
+    return sorted(status, key=lambda s: s['version'])
+
+def _acquire_migration_lock(conn):
+    """Serialize migration runs across app instances with a session-scoped application lock"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SET NOCOUNT ON;
+        DECLARE @result INT;
+        EXEC @result = sp_getapplock @Resource = ?, @LockMode = 'Exclusive', @LockOwner = 'Session',
+                                     @LockTimeout = ?;
+        SELECT @result;
+    """, (MIGRATION_LOCK_RESOURCE, MIGRATION_LOCK_TIMEOUT_MS))
+    result = cursor.fetchone()[0]
+    if result < 0:
+        raise MigrationError("Another migration run is in progress")
+
+def _release_migration_lock(conn):
+    cursor = conn.cursor()
+    cursor.execute("EXEC sp_releaseapplock @Resource = ?, @LockOwner = 'Session'", (MIGRATION_LOCK_RESOURCE,))
+
+def _apply_migration(conn, migration: Migration) -> Dict[str, Any]:
+    cursor = conn.cursor()
+    started = time.perf_counter()
+    statement_timings = []
+    
+    conn.autocommit = not migration.transactional
+    try:
+        if migration.lock_timeout_ms is not None:
+            cursor.execute(f"SET LOCK_TIMEOUT {int(migration.lock_timeout_ms)}")
+        
+        for index, statement in enumerate(migration.statements, start=1):
+            statement_started = time.perf_counter()
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                raise Exception(f"{migration.file_name} failed at statement {index}: {str(e)}")
+            statement_timings.append({
+                'statement': index,
+                'duration_ms': round((time.perf_counter() - statement_started) * 1000, 1),
+                'preview': ' '.join(statement.split())[:80]
+            })
+        
+        execution_ms = int((time.perf_counter() - started) * 1000)
+        cursor.execute("""
+            INSERT INTO schema_migrations (version, name, checksum, execution_ms)
+            VALUES (?, ?, ?, ?)
+        """, (migration.version, migration.name, migration.checksum, execution_ms))
+        
+        if migration.transactional:
+            conn.commit()
+    except Exception:
+        if migration.transactional:
+            conn.rollback()
+        raise
+    finally:
+        if migration.lock_timeout_ms is not None:
+            cursor.execute("SET LOCK_TIMEOUT -1")
+        conn.autocommit = False
+    
+    logger.info(f"Applied migration {migration.file_name} in {execution_ms} ms")
+    return {
+        'version': migration.version,
+        'name': migration.name,
+        'execution_ms': execution_ms,
+        'statements': statement_timings
+    }
+
+def apply_migrations(conn, target_version: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+    """Apply pending migrations in version order, up to and including target_version.
+    
+    Refuses to run if an applied migration's script has changed since it was applied. With
+    dry_run the pending migrations and their statements are reported without executing them.
+    """
+    _acquire_migration_lock(conn)
+    try:
+        status = get_migration_status(conn)
+        mismatched = [s['file_name'] for s in status if s['status'] == 'checksum_mismatch']
+        if mismatched:
+            raise MigrationError(f"Applied migrations have been modified: {', '.join(mismatched)}")
+        
+        pending_versions = {s['version'] for s in status if s['status'] == 'pending'}
+        pending = [m for m in load_migrations()
+                   if m.version in pending_versions and (target_version is None or m.version <= target_version)]
+        
+        if dry_run:
+            return {
+                'dry_run': True,
+                'pending': [{
+                    'version': m.version,
+                    'name': m.name,
+                    'transactional': m.transactional,
+                    'statements': m.statements
+                } for m in pending],
+                'applied': []
+            }
+        
+        applied = []
+        started = time.perf_counter()
+        for migration in pending:
+            applied.append(_apply_migration(conn, migration))
+        
+        return {
+            'dry_run': False,
+            'pending': [],
+            'applied': applied,
+            'total_ms': int((time.perf_counter() - started) * 1000)
+        }
+    finally:
+        _release_migration_lock(conn)
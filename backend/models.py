@@ -1,6 +1,9 @@
 
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional, Literal
+
+# Allowed by CHK_mapping_single_status
+MappingStatus = Literal['draft', 'pending', 'approved', 'rejected']
 
 class SourceColumn(BaseModel):
     malcode: str
@@ -33,6 +36,33 @@ class MappingFileRequest(BaseModel):
     createdBy: str
     rows: List[MappingRowRequest]
 
+class ColumnReference(BaseModel):
+    malcode: str
+    table: str
+    column: str
+
+class ImpactAnalysisRequest(BaseModel):
+    columns: List[ColumnReference] = Field(..., min_length=1, max_length=10000)
+    depth: Optional[int] = Field(default=None, ge=1)
+    page: int = Field(default=1, ge=1)
+    pageSize: int = Field(default=100, ge=1, le=1000)
+
+class MappingRowFilter(BaseModel):
+    mappingFileName: str
+    table: Optional[str] = None  # matches the source or the target table
+    currentStatus: Optional[MappingStatus] = None
+
+class BulkReviewRequest(BaseModel):
+    status: MappingStatus
+    reviewer: Optional[str] = None
+    rowIds: Optional[List[str]] = Field(default=None, min_length=1, max_length=50000)
+    filter: Optional[MappingRowFilter] = None
+
+class ArchiveRestoreRequest(BaseModel):
+    rowIds: Optional[List[str]] = Field(default=None, min_length=1, max_length=50000)
+    mappingFileName: Optional[str] = None  # restores every archived row of the file
+    restoredBy: Optional[str] = None
+
 class MappingInfo(BaseModel):
     name: str
     rows: List[Dict[str, Any]]
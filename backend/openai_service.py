@@ -1,11 +1,13 @@
 
 import json
+import time
 import logging
 from typing import List, Dict, Any
 from fastapi import HTTPException
 
 from config import get_openai_client, AZURE_OPENAI_DEPLOYMENT_NAME
 from models import MappingInfo, ValidationResults
+from instrumentation import record_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +17,7 @@ def call_azure_openai(messages: List[Dict[str, str]], max_tokens: int = 2000) ->
     if not client:
         raise HTTPException(status_code=500, detail="Azure OpenAI is not configured")
     
+    started = time.perf_counter()
     try:
         response = client.chat.completions.create(
             model=AZURE_OPENAI_DEPLOYMENT_NAME,
@@ -23,8 +26,15 @@ def call_azure_openai(messages: List[Dict[str, str]], max_tokens: int = 2000) ->
             temperature=0.7,
             top_p=0.9,
         )
+        usage = response.usage
+        record_llm_call(
+            AZURE_OPENAI_DEPLOYMENT_NAME, time.perf_counter() - started, 'success',
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0
+        )
         return response.choices[0].message.content
     except Exception as e:
+        record_llm_call(AZURE_OPENAI_DEPLOYMENT_NAME, time.perf_counter() - started, 'error')
         logger.error(f"Azure OpenAI API call failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Azure OpenAI API call failed: {str(e)}")
 
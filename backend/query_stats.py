@@ -0,0 +1,155 @@
+
+import re
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Dict, Any, Optional
+
+from config import SLOW_QUERY_THRESHOLD_MS
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger('slow_queries')
+
+# Distinct fingerprints tracked; later ones are counted under OVERFLOW_FINGERPRINT
+MAX_FINGERPRINTS = 1000
+OVERFLOW_FINGERPRINT = '<other>'
+MAX_SLOW_QUERIES = 200
+ORDER_BY_FIELDS = ('total_ms', 'count', 'mean_ms', 'max_ms', 'rows')
+
+_COMMENT = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_STRING_LITERAL = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b(?:0x[0-9a-fA-F]+|\d+(?:\.\d+)?)\b')
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_REPEATED_LISTS = re.compile(r'\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+')
+
+@lru_cache(maxsize=4096)
+def fingerprint_sql(sql: str) -> str:
+    """Normalize a statement so executions differing only in literals or list lengths group together"""
+    text = _COMMENT.sub(' ', sql)
+    text = _STRING_LITERAL.sub('?', text)
+    text = _NUMBER_LITERAL.sub('?', text)
+    text = _WHITESPACE.sub(' ', text).strip().rstrip(';').strip()
+    # IN lists and multi-row VALUES vary in length with the data
+    text = _PLACEHOLDER_LIST.sub('(?, ...)', text)
+    return _REPEATED_LISTS.sub('(?, ...), ...', text)
+
+def redact_params(params) -> str:
+    """Describe statement parameters by type and size only, so values never reach the logs"""
+    if params is None:
+        return '[]'
+    if isinstance(params, (list, tuple)) and len(params) == 1 and isinstance(params[0], (list, tuple)):
+        params = params[0]
+    if not isinstance(params, (list, tuple)):
+        params = [params]
+    described = []
+    for value in params:
+        if value is None:
+            described.append('NULL')
+        elif isinstance(value, (str, bytes)):
+            described.append(f"{type(value).__name__}({len(value)})")
+        else:
+            described.append(type(value).__name__)
+    return '[' + ', '.join(described) + ']'
+
+class QueryStats:
+    __slots__ = ('fingerprint', 'count', 'errors', 'total_seconds', 'max_seconds', 'fetch_seconds', 'rows')
+    
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.fetch_seconds = 0.0
+        self.rows = 0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        total_ms = (self.total_seconds + self.fetch_seconds) * 1000
+        return {
+            'fingerprint': self.fingerprint,
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': round(total_ms, 3),
+            'mean_ms': round(total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 3),
+            'fetch_ms': round(self.fetch_seconds * 1000, 3),
+            'rows': self.rows
+        }
+
+_stats: Dict[str, QueryStats] = {}
+_slow_queries = deque(maxlen=MAX_SLOW_QUERIES)
+_stats_lock = threading.Lock()
+_stats_since = time.time()
+
+def _get_stats(fingerprint: str) -> QueryStats:
+    stats = _stats.get(fingerprint)
+    if stats is None:
+        if len(_stats) >= MAX_FINGERPRINTS:
+            fingerprint = OVERFLOW_FINGERPRINT
+            stats = _stats.get(fingerprint)
+        if stats is None:
+            stats = _stats[fingerprint] = QueryStats(fingerprint)
+    return stats
+
+def record_execution(sql: str, params, seconds: float, failed: bool = False, batch_size: Optional[int] = None) -> str:
+    """Record one execute/executemany call and return the statement's fingerprint"""
+    fingerprint = fingerprint_sql(sql)
+    with _stats_lock:
+        stats = _get_stats(fingerprint)
+        stats.count += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if failed:
+            stats.errors += 1
+    
+    if seconds * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+        parameters = f"<{batch_size} parameter sets>" if batch_size is not None else redact_params(params)
+        entry = {
+            'at': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(seconds * 1000, 3),
+            'fingerprint': fingerprint,
+            'parameters': parameters,
+            'failed': failed
+        }
+        _slow_queries.append(entry)
+        slow_query_logger.warning(
+            f"Slow query ({entry['duration_ms']} ms{', failed' if failed else ''}): {fingerprint} params={parameters}"
+        )
+    return fingerprint
+
+def record_fetch(fingerprint: str, seconds: float, rows: int):
+    """Add fetch time and rows returned to the statement that produced them"""
+    with _stats_lock:
+        stats = _get_stats(fingerprint)
+        stats.fetch_seconds += seconds
+        stats.rows += rows
+
+def get_top_queries(limit: int = 20, order_by: str = 'total_ms') -> Dict[str, Any]:
+    """Get the top-N query fingerprints by the given statistic"""
+    if order_by not in ORDER_BY_FIELDS:
+        raise ValueError(f"order_by must be one of: {', '.join(ORDER_BY_FIELDS)}")
+    with _stats_lock:
+        queries = [stats.to_dict() for stats in _stats.values()]
+    queries.sort(key=lambda query: query[order_by], reverse=True)
+    return {
+        'since': datetime.fromtimestamp(_stats_since, timezone.utc).isoformat(),
+        'fingerprints': len(queries),
+        'slow_query_threshold_ms': SLOW_QUERY_THRESHOLD_MS,
+        'queries': queries[:limit]
+    }
+
+def get_slow_queries(limit: int = 50) -> List[Dict[str, Any]]:
+    """Get the most recent slow queries, newest first"""
+    return list(reversed(_slow_queries))[:limit]
+
+def reset_query_stats():
+    global _stats_since
+    with _stats_lock:
+        _stats.clear()
+        _slow_queries.clear()
+        _stats_since = time.time()
+    logger.info("Query statistics reset")
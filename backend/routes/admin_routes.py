@@ -0,0 +1,42 @@
+
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query
+
+from query_stats import ORDER_BY_FIELDS, get_top_queries, get_slow_queries, reset_query_stats
+from mapping_archive import mapping_archiver
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+@router.get("/queries")
+def get_query_statistics(limit: int = Query(default=20, ge=1, le=1000), order_by: str = "total_ms"):
+    """Top-N query fingerprints by total time (or count, mean_ms, max_ms, rows).
+    
+    A high count with a low mean usually points at an N+1 loop.
+    """
+    if order_by not in ORDER_BY_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Invalid order_by. Must be one of: {', '.join(ORDER_BY_FIELDS)}")
+    return get_top_queries(limit, order_by)
+
+@router.get("/queries/slow")
+def get_slow_query_log(limit: int = Query(default=50, ge=1, le=200)):
+    """Most recent statements above SLOW_QUERY_THRESHOLD_MS, newest first, with redacted parameters"""
+    return {"slow_queries": get_slow_queries(limit)}
+
+@router.delete("/queries")
+def reset_query_statistics():
+    """Clear the query statistics and slow-query log"""
+    reset_query_stats()
+    return {"message": "Query statistics reset"}
+
+@router.post("/archive/mapping-rows")
+def archive_mapping_rows(older_than_days: Optional[float] = Query(default=None, ge=0)):
+    """Archive mapping rows inactive for longer than older_than_days (default MAPPING_ARCHIVE_AFTER_DAYS) now,
+    rather than waiting for the next scheduled run"""
+    try:
+        archived = mapping_archiver.run_once(older_than_days)
+        return {"archived": sum(archived.values()), "files": archived}
+    except Exception as e:
+        logger.error(f"Failed to archive mapping rows: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to archive mapping rows: {str(e)}")
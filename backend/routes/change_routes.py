@@ -0,0 +1,83 @@
+
+import json
+import time
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+
+from change_feed import change_feed, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from config import CHANGE_FEED_POLL_SECONDS
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/changes", tags=["changes"])
+
+# Seconds between comment lines that keep idle streams open through proxies
+KEEPALIVE_INTERVAL = 15
+
+def _sse(event_id: Optional[int], event: str, data) -> str:
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+def _changes_after(since: Optional[int], limit: int):
+    try:
+        return change_feed.changes_after(since, limit)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to read the change log: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to read changes: {str(e)}")
+
+@router.get("")
+def get_changes(since: Optional[int] = Query(default=None, ge=0),
+                limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
+    """Changes to mapping files, row statuses and comments after seq since, oldest first.
+    
+    Call without since to get the current position, then pass next_since back as since to get what changed.
+    A 410 means the changes after since were pruned and the client should reload the mapping files.
+    """
+    return _changes_after(since, limit)
+
+@router.get("/stream")
+async def stream_changes(since: Optional[int] = Query(default=None, ge=0),
+                         last_event_id: Optional[int] = Header(default=None)):
+    """Push changes as server-sent events, one 'change' event per change with its seq as the event id.
+    
+    Starts after since, or from now without it; reconnecting clients resume from the Last-Event-ID header.
+    A 'reset' event means the log was pruned past the client's position and it should reload.
+    An 'error' event means the change log could not be read; the stream ends and the client reconnects.
+    """
+    position = last_event_id if last_event_id is not None else since
+    if position is None:
+        position = (await asyncio.to_thread(_changes_after, None, 1))['next_since']
+    
+    async def events():
+        nonlocal position
+        # Lets clients that started from now learn their position before the first change
+        yield _sse(None, "ready", {"since": position})
+        last_sent = time.monotonic()
+        while True:
+            try:
+                page = await asyncio.to_thread(_changes_after, position, MAX_PAGE_SIZE)
+            except HTTPException as e:
+                if e.status_code == 410:
+                    yield _sse(None, "reset", {"detail": e.detail})
+                    break
+                # The response has started, so the failure goes to the client as an event rather than a status;
+                # it reconnects and resumes from the last change it received
+                logger.warning(f"Ending change stream at seq {position}: {e.detail}")
+                yield _sse(None, "error", {"detail": e.detail})
+                break
+            for change in page['changes']:
+                yield _sse(change['seq'], "change", change)
+                last_sent = time.monotonic()
+            position = page['next_since']
+            if page['has_more']:
+                continue
+            if time.monotonic() - last_sent >= KEEPALIVE_INTERVAL:
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+            await asyncio.sleep(CHANGE_FEED_POLL_SECONDS)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
@@ -1,8 +1,8 @@
 
 import logging
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import List, Dict, Any, Optional
 
 from table_operations import (
     create_tables, 
@@ -12,19 +12,35 @@ from table_operations import (
     drop_tables, 
     verify_tables
 )
+from config import DATABASE_BACKEND
 from ddl_manager import execute_custom_sql
+from sql_file_manager import list_sql_scripts
+from migration_runner import get_migration_status, apply_migrations, MigrationError
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/ddl", tags=["ddl"])
 
 class CustomSQLRequest(BaseModel):
     sql_script: str
+    max_rows: int = Field(default=1000, ge=1, le=100000)
 
 class DDLResponse(BaseModel):
     success: bool
     message: str
     results: List[Dict[str, Any]]
 
+class ApplyMigrationsRequest(BaseModel):
+    target_version: Optional[int] = None
+    dry_run: bool = False
+
+def _require_migrations_backend():
+    # Migrations are T-SQL; the SQLite backend creates its schema from sql/sqlite/create_schema.sql instead
+    if DATABASE_BACKEND != 'sqlserver':
+        raise HTTPException(
+            status_code=501,
+            detail=f"Schema migrations need the sqlserver backend (DATABASE_BACKEND={DATABASE_BACKEND})"
+        )
+
 @router.post("/create-tables", response_model=DDLResponse)
 async def create_database_tables():
     """Create all database tables using create_tables.sql"""
@@ -151,12 +167,42 @@ async def verify_database_tables():
         logger.error(f"Failed to verify tables: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to verify tables: {str(e)}")
 
+@router.get("/migrations")
+async def list_migrations():
+    """List schema migrations and whether each is applied, pending or modified since it was applied"""
+    _require_migrations_backend()
+    try:
+        from database import get_db_connection
+        with get_db_connection() as conn:
+            migrations = get_migration_status(conn)
+            return {"migrations": migrations}
+    except Exception as e:
+        logger.error(f"Failed to get migration status: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get migration status: {str(e)}")
+
+@router.post("/migrations/apply")
+def apply_schema_migrations(request: ApplyMigrationsRequest):
+    """Apply pending schema migrations in order, or report them without executing when dry_run is set"""
+    _require_migrations_backend()
+    try:
+        from database import get_db_connection
+        logger.info(f"Applying migrations (target: {request.target_version}, dry run: {request.dry_run})")
+        with get_db_connection() as conn:
+            result = apply_migrations(conn, request.target_version, request.dry_run)
+            return {"success": True, **result}
+    except MigrationError as e:
+        logger.error(f"Migration failed: {str(e)}")
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to apply migrations: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to apply migrations: {str(e)}")
+
 @router.post("/execute-sql", response_model=DDLResponse)
 async def execute_custom_sql_script(request: CustomSQLRequest):
     """Execute custom SQL script"""
     try:
         logger.info(f"Executing custom SQL script (length: {len(request.sql_script)} characters)")
-        results = execute_custom_sql(request.sql_script)
+        results = execute_custom_sql(request.sql_script, request.max_rows)
         return DDLResponse(
             success=True,
             message="SQL script executed successfully",
@@ -181,6 +227,15 @@ async def ddl_health_check():
         logger.error(f"DDL health check failed: {str(e)}")
         raise HTTPException(status_code=500, detail=f"DDL operations unavailable: {str(e)}")
 
+@router.get("/scripts")
+async def list_ddl_scripts():
+    """List the SQL scripts and migrations with their checksums and statement counts"""
+    try:
+        return {"scripts": list_sql_scripts()}
+    except Exception as e:
+        logger.error(f"Failed to list SQL scripts: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list SQL scripts: {str(e)}")
+
 @router.get("/list-files")
 async def list_sql_files():
     """List available SQL files for debugging with enhanced path information"""
@@ -204,14 +259,14 @@ async def list_sql_files():
         # List SQL files
         if os.path.exists(sql_dir):
             files["sql_files"] = [f for f in os.listdir(sql_dir) if f.endswith('.sql')]
-            
+        
         # List all files in backend directory for debugging
         if os.path.exists(table_operations_dir):
             for root, dirs, filenames in os.walk(table_operations_dir):
                 for filename in filenames:
                     rel_path = os.path.relpath(os.path.join(root, filename), table_operations_dir)
                     files["all_backend_files"].append(rel_path)
-            
+        
         return files
     except Exception as e:
         logger.error(f"Failed to list SQL files: {str(e)}")
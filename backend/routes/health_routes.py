@@ -1,30 +1,111 @@
 
+import time
+import asyncio
 import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 
 from database import get_db_connection
-from config import get_openai_client
+from instrumentation import connection_stats
+from config import (
+    DATABASE_BACKEND,
+    AZURE_OPENAI_ENDPOINT,
+    AZURE_OPENAI_KEY,
+    HEALTH_CACHE_SECONDS,
+    HEALTH_CHECK_TIMEOUT_SECONDS
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["health"])
 
-@router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    db_status = "disconnected"
+_started_at = time.monotonic()
+
+# Last dependency check and when it finished (monotonic seconds)
+_last_status: Optional[Dict[str, Any]] = None
+_last_checked_at = 0.0
+# The in-flight refresh shared by concurrent probes, and the database check thread it waits on
+_refresh_task: Optional[asyncio.Task] = None
+_database_check: Optional[asyncio.Future] = None
+
+def _check_database() -> float:
+    """Run a trivial query and return its round-trip time in milliseconds"""
+    started = time.perf_counter()
+    with get_db_connection() as conn:
+        if DATABASE_BACKEND == 'sqlserver':
+            # Query timeout in whole seconds; the probe itself stops waiting after HEALTH_CHECK_TIMEOUT_SECONDS
+            conn.timeout = max(1, round(HEALTH_CHECK_TIMEOUT_SECONDS))
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+    return round((time.perf_counter() - started) * 1000, 3)
+
+async def _refresh_status() -> Dict[str, Any]:
+    global _last_status, _last_checked_at, _database_check
+    
+    # A check stuck on an unresponsive database is waited on again rather than piling up threads
+    if _database_check is None or _database_check.done():
+        _database_check = asyncio.get_running_loop().run_in_executor(None, _check_database)
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            db_status = "connected"
+        latency_ms = await asyncio.wait_for(asyncio.shield(_database_check), HEALTH_CHECK_TIMEOUT_SECONDS)
+        database = {"status": "connected", "latency_ms": latency_ms}
+    except asyncio.TimeoutError:
+        logger.error(f"Database health check timed out after {HEALTH_CHECK_TIMEOUT_SECONDS}s")
+        database = {"status": "timeout", "error": f"No response within {HEALTH_CHECK_TIMEOUT_SECONDS}s"}
     except Exception as e:
         logger.error(f"Database health check failed: {str(e)}")
+        database = {"status": "disconnected", "error": str(e)}
+    
+    _last_status = {
+        "checked_at": datetime.now(timezone.utc).isoformat(),
+        "database": database
+    }
+    _last_checked_at = time.monotonic()
+    return _last_status
+
+async def get_dependency_status() -> Dict[str, Any]:
+    """Dependency status, re-checked at most every HEALTH_CACHE_SECONDS however often it is probed"""
+    global _refresh_task
+    
+    if _last_status is not None and time.monotonic() - _last_checked_at < HEALTH_CACHE_SECONDS:
+        return _last_status
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_status())
+    return await asyncio.shield(_refresh_task)
+
+def _openai_status() -> str:
+    # Only the configuration is checked; constructing a client per probe is wasted work
+    return "configured" if AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY else "not configured"
+
+@router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests. Never touches dependencies."""
+    return {"status": "alive", "uptime_seconds": round(time.monotonic() - _started_at, 1)}
+
+@router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: 200 when the database answers, 503 otherwise"""
+    status = await get_dependency_status()
+    ready = status["database"]["status"] == "connected"
     
-    client = get_openai_client()
+    return JSONResponse(status_code=200 if ready else 503, content={
+        "status": "ready" if ready else "not ready",
+        "checked_at": status["checked_at"],
+        "cache_age_seconds": round(time.monotonic() - _last_checked_at, 3),
+        "database": status["database"],
+        "connections": {"backend": DATABASE_BACKEND, **connection_stats.to_dict()},
+        "openai": _openai_status()
+    })
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint"""
+    status = await get_dependency_status()
     
     return {
         "status": "healthy",
         "service": "Data Mapping Backend API",
-        "database": db_status,
-        "openai": "configured" if client else "not configured"
+        "database": "connected" if status["database"]["status"] == "connected" else "disconnected",
+        "openai": _openai_status()
     }
@@ -0,0 +1,150 @@
+
+import json
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+
+from sql_jobs import (
+    DDL_JOB_SCRIPTS,
+    JOB_STATUSES,
+    JobNotCancellableError,
+    submit_sql_job,
+    submit_ddl_job,
+    get_local_job,
+    get_job,
+    list_jobs,
+    cancel_job
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/ddl/jobs", tags=["ddl"])
+
+# Seconds between checks for new progress events while streaming
+EVENT_POLL_INTERVAL = 0.5
+
+class SQLJobOptions(BaseModel):
+    statement_timeout_seconds: Optional[int] = Field(default=None, ge=1)
+    transactional: bool = True
+    submitted_by: Optional[str] = None
+
+class CustomSQLJobRequest(SQLJobOptions):
+    sql_script: str
+    max_rows: int = Field(default=1000, ge=1, le=100000)
+
+def _sse(event_id: int, event: str, data) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/execute-sql", status_code=202)
+def submit_custom_sql_job(request: CustomSQLJobRequest):
+    """Queue a custom SQL script to run in the background"""
+    try:
+        logger.info(f"Submitting custom SQL job (length: {len(request.sql_script)} characters)")
+        return submit_sql_job(
+            request.sql_script,
+            statement_timeout_seconds=request.statement_timeout_seconds,
+            transactional=request.transactional,
+            max_rows=request.max_rows,
+            submitted_by=request.submitted_by
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to submit SQL job: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit SQL job: {str(e)}")
+
+@router.post("/{operation}", status_code=202)
+def submit_ddl_operation_job(operation: str, request: Optional[SQLJobOptions] = None):
+    """Queue a DDL operation (e.g. create-tables) to run in the background"""
+    if operation not in DDL_JOB_SCRIPTS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown DDL operation: {operation}. Available: {', '.join(DDL_JOB_SCRIPTS)}"
+        )
+    request = request or SQLJobOptions()
+    try:
+        logger.info(f"Submitting DDL job: {operation}")
+        return submit_ddl_job(
+            operation,
+            statement_timeout_seconds=request.statement_timeout_seconds,
+            transactional=request.transactional,
+            submitted_by=request.submitted_by
+        )
+    except FileNotFoundError as e:
+        logger.error(f"SQL file not found: {str(e)}")
+        raise HTTPException(status_code=404, detail=f"SQL file not found: {str(e)}")
+    except Exception as e:
+        logger.error(f"Failed to submit DDL job {operation}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to submit DDL job: {str(e)}")
+
+@router.get("")
+def list_sql_jobs(status: Optional[str] = None, limit: int = Query(default=50, ge=1, le=500)):
+    """List recent jobs, newest first"""
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(JOB_STATUSES)}")
+    try:
+        return {"jobs": list_jobs(status, limit)}
+    except Exception as e:
+        logger.error(f"Failed to list jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to list jobs: {str(e)}")
+
+@router.get("/{job_id}")
+def get_sql_job_status(job_id: str, include_results: bool = False):
+    """Get a job's status and per-statement progress"""
+    try:
+        job = get_job(job_id, include_results)
+    except Exception as e:
+        logger.error(f"Failed to get job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to get job: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/{job_id}/events")
+async def stream_sql_job_events(job_id: str, after: int = Query(default=0, ge=0),
+                                last_event_id: Optional[int] = Header(default=None)):
+    """Stream a job's progress as server-sent events until it finishes.
+    
+    Reconnecting clients resume from the Last-Event-ID header (or the after parameter).
+    """
+    job = get_local_job(job_id)
+    if job is None:
+        # Jobs that ran elsewhere or were evicted from memory only have their final state
+        record = await asyncio.to_thread(get_job, job_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        async def history():
+            yield _sse(0, "status", {"status": record["status"], "error": record["error"]})
+        return StreamingResponse(history(), media_type="text/event-stream")
+    
+    position = last_event_id if last_event_id is not None else after
+    
+    async def events():
+        nonlocal position
+        while True:
+            finished = job.finished
+            for event in job.events_after(position):
+                position = event['id']
+                yield _sse(event['id'], event['event'], event['data'])
+            if finished:
+                break
+            await asyncio.sleep(EVENT_POLL_INTERVAL)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/{job_id}/cancel")
+def cancel_sql_job(job_id: str):
+    """Cancel a queued or running job"""
+    try:
+        job = cancel_job(job_id)
+    except JobNotCancellableError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to cancel job {job_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to cancel job: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,84 @@
+
+import logging
+from fastapi import APIRouter, HTTPException, Query
+
+from config import LINEAGE_MAX_DEPTH
+from database import get_db_connection
+from lineage import lineage_graph, DEFAULT_DEPTH
+from impact_analysis import analyze_impact
+from models import ImpactAnalysisRequest
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/api/lineage", tags=["lineage"])
+
+def _current_graph():
+    try:
+        lineage_graph.ensure_current()
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load lineage graph: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load lineage graph: {str(e)}")
+    return lineage_graph
+
+def _not_found(malcode: str, table: str, column: str):
+    return HTTPException(status_code=404, detail=f"No mappings reference column {malcode}.{table}.{column}")
+
+@router.get("/upstream")
+def get_upstream_lineage(malcode: str, table: str, column: str,
+                         depth: int = Query(default=DEFAULT_DEPTH, ge=1, le=LINEAGE_MAX_DEPTH)):
+    """Columns that feed the given column, directly or through other mappings, up to depth hops"""
+    result = _current_graph().traverse(malcode, table, column, 'upstream', depth)
+    if result is None:
+        raise _not_found(malcode, table, column)
+    return result
+
+@router.get("/downstream")
+def get_downstream_lineage(malcode: str, table: str, column: str,
+                           depth: int = Query(default=DEFAULT_DEPTH, ge=1, le=LINEAGE_MAX_DEPTH)):
+    """Columns fed by the given column, directly or through other mappings, up to depth hops"""
+    result = _current_graph().traverse(malcode, table, column, 'downstream', depth)
+    if result is None:
+        raise _not_found(malcode, table, column)
+    return result
+
+@router.get("/impact")
+def get_lineage_impact(malcode: str, table: str, column: str,
+                       depth: int = Query(default=LINEAGE_MAX_DEPTH, ge=1, le=LINEAGE_MAX_DEPTH)):
+    """Downstream lineage of a column summarised by depth, affected mapping files and final targets"""
+    result = _current_graph().impact(malcode, table, column, depth)
+    if result is None:
+        raise _not_found(malcode, table, column)
+    return result
+
+@router.post("/impact")
+def analyze_batch_impact(request: ImpactAnalysisRequest):
+    """Impact of changing a batch of source columns (up to 10,000): the mapping rows and files reading each column
+    directly and its transitive targets, grouped by column and paged"""
+    depth = min(request.depth or LINEAGE_MAX_DEPTH, LINEAGE_MAX_DEPTH)
+    columns = [(column.malcode, column.table, column.column) for column in request.columns]
+    try:
+        with get_db_connection() as conn:
+            return analyze_impact(conn, columns, request.page, request.pageSize, depth)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to analyze impact: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to analyze impact: {str(e)}")
+
+@router.get("/stats")
+def get_lineage_stats():
+    """Size of the lineage graph and when it was built"""
+    return lineage_graph.stats()
+
+@router.post("/rebuild")
+def rebuild_lineage_graph():
+    """Rebuild the lineage graph from scratch, e.g. after bulk changes made directly in the database"""
+    try:
+        lineage_graph.ensure_current(force_rebuild=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to rebuild lineage graph: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to rebuild lineage graph: {str(e)}")
+    return lineage_graph.stats()
@@ -1,68 +1,530 @@
 
+import os
 import json
+import uuid
 import logging
-from typing import Optional
-from fastapi import APIRouter, HTTPException
+from typing import Optional, List
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Header
+from fastapi.responses import Response, StreamingResponse, FileResponse
 
 from database import (
     get_db_connection, 
     save_mapping_file_to_single_table, 
     load_mapping_files_from_single_table,
     update_mapping_row_status_single_table,
-    add_mapping_row_comment_single_table
+    bulk_update_mapping_row_status_single_table,
+    add_mapping_row_comment_single_table,
+    get_mapping_row_comments_single_table,
+    get_mapping_file_versions_single_table,
+    get_mapping_file_revisions_single_table,
+    get_mapping_file_revision_single_table,
+    diff_mapping_file_revisions_single_table,
+    rollback_mapping_file_single_table,
+    get_archived_mapping_rows_single_table,
+    restore_archived_mapping_rows_single_table
 )
-from models import MappingFileRequest
+from models import MappingFileRequest, BulkReviewRequest, ArchiveRestoreRequest
+from metadata_import import detect_import_format
+from mapping_import import import_mapping_file, SUPPORTED_FORMATS, DEFAULT_BATCH_SIZE
+from mapping_export import (
+    EXPORT_FORMATS, MEDIA_TYPES, MAX_EXPORT_FILES,
+    export_etag, export_filename, iter_csv_export, build_xlsx_export
+)
+from etags import CACHE_CONTROL, version_etag, versions_etag, representation_etag, etag_matches, if_match_versions
+from fast_json import json_response, encoded_response, negotiate_encoding
+from columnar import (
+    COLUMNAR_JSON, ARROW_STREAM, negotiate_format, record_columns, columnar_table, arrow_stream, records_response
+)
+from lineage import notify_mapping_files_changed
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api", tags=["mapping"])
 
 @router.post("/mapping-files")
-async def create_mapping_file(mapping_file: MappingFileRequest):
-    """Create or update a mapping file using single table structure"""
+async def create_mapping_file(mapping_file: MappingFileRequest, response: Response,
+                              if_match: Optional[str] = Header(None)):
+    """Create or update a mapping file using single table structure.
+    
+    Send the file's ETag as If-Match to only overwrite the version you loaded; a 409 means someone else
+    saved it in the meantime.
+    """
     try:
         with get_db_connection() as conn:
-            file_id = save_mapping_file_to_single_table(conn, mapping_file)
-            logger.info(f"Mapping file saved successfully: {mapping_file.name}")
-            return {"id": file_id, "message": "Mapping file saved successfully"}
+            file_id, version, revision = save_mapping_file_to_single_table(conn, mapping_file,
+                                                                           if_match_versions(if_match))
+            notify_mapping_files_changed(conn, [mapping_file.name])
+            logger.info(f"Mapping file saved successfully: {mapping_file.name} (revision {revision})")
+            if version:
+                response.headers['ETag'] = version_etag(version)
+            return {"id": file_id, "version": version, "revision": revision,
+                    "message": "Mapping file saved successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to save mapping file: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to save mapping file: {str(e)}")
 
+@router.post("/mapping-files/upload")
+def upload_mapping_file(
+    file: UploadFile = File(...),
+    name: Optional[str] = Form(None, description="Mapping file name; defaults to the uploaded file name"),
+    description: Optional[str] = Form(None),
+    source_system: Optional[str] = Form(None),
+    target_system: Optional[str] = Form(None),
+    status: str = Form("draft"),
+    created_by: str = Form("File Import"),
+    file_format: Optional[str] = Form(None, description="csv or xlsx; inferred from the file name if omitted"),
+    batch_size: int = Form(DEFAULT_BATCH_SIZE, ge=1, le=50000),
+    dry_run: bool = Form(False, description="Validate the file and report errors without saving")
+):
+    """Create or replace a mapping file from a CSV/XLSX file in the sample mapping template layout"""
+    file_format = (file_format or detect_import_format(file.filename, file.content_type) or '').lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported or unknown file format. Supported formats: {', '.join(SUPPORTED_FORMATS)}"
+        )
+    name = name or os.path.splitext(os.path.basename(file.filename or ''))[0]
+    if not name:
+        raise HTTPException(status_code=400, detail="A mapping file name is required")
+    
+    try:
+        with get_db_connection() as conn:
+            report = import_mapping_file(
+                conn, file.file, file_format, name, description=description, source_system=source_system,
+                target_system=target_system, status=status, created_by=created_by, batch_size=batch_size,
+                dry_run=dry_run
+            )
+            if not dry_run:
+                notify_mapping_files_changed(conn, [name])
+            logger.info(f"Mapping upload of {file.filename}: {report['rows_imported']} imported, "
+                        f"{report['rows_rejected']} rejected, {report['rows_per_second']} rows/s")
+            return report
+    except ValueError as e:
+        logger.error(f"Invalid mapping upload file {file.filename}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid mapping file: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to upload mapping file: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to upload mapping file: {str(e)}")
+
+def _mapping_files_response(files: List[dict], media_type: str, accept_encoding: Optional[str], headers: dict):
+    headers = {**headers, 'Vary': 'Accept'}
+    if media_type == ARROW_STREAM:
+        # One table of every file's rows, tagged with the file name; the files themselves go in the metadata
+        columns = {'mappingFileName': []}
+        for file in files:
+            columns['mappingFileName'].extend([file['name']] * len(file['rows']))
+            for name, values in record_columns(file['rows']).items():
+                columns.setdefault(name, []).extend(values)
+        metadata = {'files': [{key: value for key, value in file.items() if key != 'rows'} for file in files]}
+        return encoded_response(arrow_stream(columns, metadata), ARROW_STREAM, accept_encoding, headers)
+    if media_type == COLUMNAR_JSON:
+        files = [{**file, 'rows': columnar_table(file['rows'])} for file in files]
+    return json_response({"files": files}, accept_encoding, headers, media_type=media_type)
+
 @router.get("/mapping-files")
-async def get_mapping_files():
-    """Get all mapping files from single table structure"""
+def get_mapping_files(if_none_match: Optional[str] = Header(None), accept: Optional[str] = Header(None),
+                      accept_encoding: Optional[str] = Header(None)):
+    """Get all mapping files from single table structure; 304 if none changed since the ETag sent.
+    
+    The listing can run to hundreds of thousands of rows, so it is encoded on the fast JSON path and compressed.
+    Bulk readers can ask for rows as columns instead (columnar JSON or Arrow) through the Accept header.
+    """
+    media_type = negotiate_format(accept)
+    content_encoding = negotiate_encoding(accept_encoding)
     try:
         with get_db_connection() as conn:
+            # Comparing versions is one aggregate query, so unchanged files are never loaded or serialized
+            etag = representation_etag(versions_etag(get_mapping_file_versions_single_table(conn)), media_type,
+                                       content_encoding)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+            
             files = load_mapping_files_from_single_table(conn)
             logger.info(f"Loaded {len(files)} mapping files")
-            return {"files": files}
+            etag = representation_etag(versions_etag({file['name']: file['version'] for file in files}),
+                                       media_type, content_encoding)
+        return _mapping_files_response(files, media_type, accept_encoding,
+                                       {'ETag': etag, 'Cache-Control': CACHE_CONTROL})
     except Exception as e:
         logger.error(f"Failed to load mapping files: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to load mapping files: {str(e)}")
 
+def _export_mapping_files(file_names: Optional[List[str]], file_format: str, if_none_match: Optional[str],
+                          accept_encoding: Optional[str]):
+    file_format = file_format.lower()
+    if file_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format. Supported formats: {', '.join(EXPORT_FORMATS)}"
+        )
+    if file_names is not None:
+        file_names = list(dict.fromkeys(file_names))
+        if len(file_names) > MAX_EXPORT_FILES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_EXPORT_FILES} mapping files can be exported at once"
+            )
+    
+    try:
+        with get_db_connection() as conn:
+            versions = get_mapping_file_versions_single_table(conn, file_names)
+    except Exception as e:
+        logger.error(f"Failed to read mapping file versions: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export mapping files: {str(e)}")
+    missing = [name for name in file_names or [] if name not in versions]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Mapping file(s) not found: {', '.join(missing)}")
+    
+    # XLSX is already a zip archive, so only CSV is compressed
+    content_encoding = negotiate_encoding(accept_encoding, ('gzip',)) if file_format == 'csv' else None
+    etag = export_etag(versions, file_format, content_encoding)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': CACHE_CONTROL,
+        'Vary': 'Accept-Encoding'
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    filename = export_filename(file_names, file_format)
+    if file_format == 'csv':
+        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
+        return StreamingResponse(iter_csv_export(file_names, gzip=bool(content_encoding)),
+                                 media_type=MEDIA_TYPES['csv'], headers=headers)
+    
+    try:
+        path = build_xlsx_export(file_names, etag)
+    except Exception as e:
+        logger.error(f"Failed to export mapping files as XLSX: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to export mapping files: {str(e)}")
+    return FileResponse(path, media_type=MEDIA_TYPES['xlsx'], filename=filename, headers=headers)
+
+@router.get("/mapping-files/export")
+def export_mapping_files(
+    name: Optional[List[str]] = Query(None, description="Mapping file(s) to export; all files if omitted"),
+    file_format: str = Query("csv", alias="format", description="csv or xlsx"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """Export mapping files as CSV (streamed, gzip when accepted) or XLSX (one sheet per file)"""
+    return _export_mapping_files(name, file_format, if_none_match, accept_encoding)
+
+@router.get("/mapping-files/{file_name}/export")
+def export_mapping_file(
+    file_name: str,
+    file_format: str = Query("csv", alias="format", description="csv or xlsx"),
+    if_none_match: Optional[str] = Header(None),
+    accept_encoding: Optional[str] = Header(None)
+):
+    """Export a single mapping file as CSV or XLSX"""
+    return _export_mapping_files([file_name], file_format, if_none_match, accept_encoding)
+
+@router.get("/mapping-files/{file_name}")
+def get_mapping_file(file_name: str, if_none_match: Optional[str] = Header(None), accept: Optional[str] = Header(None),
+                     accept_encoding: Optional[str] = Header(None)):
+    """Get one mapping file with its rows (as columns if Accept asks for it); 304 if it hasn't changed since the
+    ETag sent"""
+    media_type = negotiate_format(accept)
+    content_encoding = negotiate_encoding(accept_encoding)
+    try:
+        with get_db_connection() as conn:
+            version = get_mapping_file_versions_single_table(conn, [file_name]).get(file_name)
+            if version is None:
+                raise HTTPException(status_code=404, detail=f"Mapping file not found: {file_name}")
+            etag = representation_etag(version_etag(version), media_type, content_encoding)
+            if etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+            
+            files = load_mapping_files_from_single_table(conn, [file_name])
+            if not files:
+                raise HTTPException(status_code=404, detail=f"Mapping file not found: {file_name}")
+            etag = representation_etag(version_etag(files[0]['version']), media_type, content_encoding)
+        return records_response(files[0], 'rows', media_type, accept_encoding,
+                                {'ETag': etag, 'Cache-Control': CACHE_CONTROL})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load mapping file {file_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load mapping file: {str(e)}")
+
+@router.get("/mapping-files/{file_name}/revisions")
+def get_mapping_file_revisions(file_name: str, limit: int = Query(default=50, ge=1, le=500),
+                               before: Optional[int] = None):
+    """List a mapping file's revisions newest first, without rows; pass next_before as before for older ones.
+    
+    Every save, upload, rollback and restore of archived rows that changes the file records a revision.
+    """
+    try:
+        with get_db_connection() as conn:
+            page = get_mapping_file_revisions_single_table(conn, file_name, limit, before)
+            # Files not saved since revisions were introduced exist without any
+            if (not page['revisions'] and before is None
+                    and not get_mapping_file_versions_single_table(conn, [file_name])):
+                raise HTTPException(status_code=404, detail=f"Mapping file not found: {file_name}")
+            return page
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load revisions of {file_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load revisions: {str(e)}")
+
+@router.get("/mapping-files/{file_name}/revisions/{revision}")
+def get_mapping_file_revision(file_name: str, revision: int, accept: Optional[str] = Header(None),
+                              accept_encoding: Optional[str] = Header(None)):
+    """Get a revision of a mapping file with the rows it had (as columns if Accept asks for it)"""
+    media_type = negotiate_format(accept)
+    try:
+        with get_db_connection() as conn:
+            content = get_mapping_file_revision_single_table(conn, file_name, revision)
+        # Revisions never change, so clients can keep them without revalidating
+        return records_response(content, 'rows', media_type, accept_encoding,
+                                {'Cache-Control': 'private, max-age=31536000, immutable'})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load revision {revision} of {file_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load revision: {str(e)}")
+
+@router.get("/mapping-files/{file_name}/diff")
+def diff_mapping_file_revisions(file_name: str, from_revision: int = Query(..., alias="from", ge=1),
+                                to_revision: Optional[int] = Query(None, alias="to", ge=1),
+                                accept_encoding: Optional[str] = Header(None)):
+    """Compare two revisions of a mapping file; to defaults to the latest revision.
+    
+    Returns the file fields that changed and the rows added, removed and changed (same target column, other
+    values) going from one to the other.
+    """
+    try:
+        with get_db_connection() as conn:
+            if to_revision is None:
+                latest = get_mapping_file_revisions_single_table(conn, file_name, 1)['revisions']
+                if not latest:
+                    raise HTTPException(status_code=404, detail=f"Mapping file has no revisions: {file_name}")
+                to_revision = latest[0]['revision']
+            diff = diff_mapping_file_revisions_single_table(conn, file_name, from_revision, to_revision)
+        return json_response(diff, accept_encoding)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to diff revisions of {file_name}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to diff revisions: {str(e)}")
+
+@router.post("/mapping-files/{file_name}/revisions/{revision}/rollback")
+def rollback_mapping_file(file_name: str, revision: int, response: Response, rollback_data: Optional[dict] = None):
+    """Restore a mapping file to an earlier revision, recorded as a new revision ({"createdBy": ...} optional).
+    
+    Rows whose mapping the revision also has are kept with their ids, status and comments; only the others are
+    removed or added. Rolling back to the file's current content changes nothing and records no revision.
+    """
+    try:
+        with get_db_connection() as conn:
+            result = rollback_mapping_file_single_table(conn, file_name, revision,
+                                                        (rollback_data or {}).get("createdBy"))
+            notify_mapping_files_changed(conn, [file_name])
+            if result['version']:
+                response.headers['ETag'] = version_etag(result['version'])
+            return {**result, "message": f"Mapping file rolled back to revision {revision}"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to roll back {file_name} to revision {revision}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to roll back mapping file: {str(e)}")
+
 @router.put("/mapping-rows/{row_id}/status")
-async def update_row_status(row_id: str, status_data: dict):
-    """Update mapping row status in single table structure"""
+async def update_row_status(row_id: str, status_data: dict, response: Response,
+                            if_match: Optional[str] = Header(None)):
+    """Update mapping row status in single table structure.
+    
+    Send the row's version as If-Match (or "version" in the body) to only update the version you loaded;
+    a 409 means someone else changed the row in the meantime.
+    """
     try:
         status = status_data.get("status")
         reviewer = status_data.get("reviewer")
+        expected = if_match_versions(if_match)
+        if expected is None and status_data.get("version") is not None:
+            expected = [str(status_data["version"])]
+        expected_version = None
+        if expected is not None and '*' not in expected:
+            if len(expected) != 1 or not expected[0].isdigit():
+                raise HTTPException(status_code=409,
+                                    detail="Mapping row has changed since it was loaded; reload it and try again")
+            expected_version = int(expected[0])
         
         with get_db_connection() as conn:
-            update_mapping_row_status_single_table(conn, row_id, status, reviewer)
-            return {"message": "Status updated successfully"}
+            version = update_mapping_row_status_single_table(conn, row_id, status, reviewer, expected_version)
+            response.headers['ETag'] = version_etag(version)
+            return {"message": "Status updated successfully", "version": version}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to update row status: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to update row status: {str(e)}")
 
+def _canonical_row_id(row_id: str) -> Optional[str]:
+    try:
+        return str(uuid.UUID(row_id))
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+@router.post("/mapping-rows/review")
+async def review_mapping_rows(request: BulkReviewRequest):
+    """Set the status and reviewer of many mapping rows at once, by row ids or by a filter.
+    
+    All rows are updated in one set-based statement and one transaction. Returns an outcome per row:
+    updated (with the previous status), not_found (missing or archived) or invalid_id.
+    """
+    if (request.rowIds is None) == (request.filter is None):
+        raise HTTPException(status_code=400, detail="Provide either rowIds or filter")
+    
+    try:
+        results = []
+        with get_db_connection() as conn:
+            if request.rowIds is not None:
+                # Dedupe and canonicalise so the ids match however the caller formatted them
+                requested = {}
+                for row_id in request.rowIds:
+                    if row_id not in requested:
+                        requested[row_id] = _canonical_row_id(row_id)
+                valid_ids = sorted({row_id for row_id in requested.values() if row_id})
+                updated = bulk_update_mapping_row_status_single_table(
+                    conn, request.status, request.reviewer, row_ids=valid_ids
+                ) if valid_ids else []
+                previous = {_canonical_row_id(row_id): status for row_id, status in updated}
+                for row_id, canonical in requested.items():
+                    if canonical is None:
+                        results.append({'id': row_id, 'outcome': 'invalid_id'})
+                    elif canonical in previous:
+                        results.append({'id': row_id, 'outcome': 'updated', 'previous_status': previous[canonical]})
+                    else:
+                        results.append({'id': row_id, 'outcome': 'not_found'})
+            else:
+                row_filter = request.filter
+                updated = bulk_update_mapping_row_status_single_table(
+                    conn, request.status, request.reviewer, file_name=row_filter.mappingFileName,
+                    table_name=row_filter.table, current_status=row_filter.currentStatus
+                )
+                results = [{'id': row_id, 'outcome': 'updated', 'previous_status': status}
+                           for row_id, status in updated]
+        
+        counts = {outcome: 0 for outcome in ('updated', 'not_found', 'invalid_id')}
+        for result in results:
+            counts[result['outcome']] += 1
+        logger.info(f"Reviewed mapping rows as {request.status}: {counts['updated']} updated, "
+                    f"{counts['not_found']} not found, {counts['invalid_id']} invalid")
+        return {
+            'status': request.status,
+            'updated': counts['updated'],
+            'not_found': counts['not_found'],
+            'invalid': counts['invalid_id'],
+            'results': results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to review mapping rows: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to review mapping rows: {str(e)}")
+
+@router.get("/mapping-rows/archive")
+def get_archived_mapping_rows(mapping_file_name: Optional[str] = None,
+                              limit: int = Query(default=100, ge=1, le=1000), before: Optional[int] = None,
+                              accept_encoding: Optional[str] = Header(None)):
+    """List archived mapping rows, most recently archived first, optionally of one mapping file; pass
+    next_before as before for older ones.
+    
+    Rows inactive for longer than MAPPING_ARCHIVE_AFTER_DAYS are moved here out of the live table by the archiver.
+    """
+    try:
+        with get_db_connection() as conn:
+            page = get_archived_mapping_rows_single_table(conn, mapping_file_name, limit, before)
+        return json_response(page, accept_encoding)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load archived mapping rows: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load archived mapping rows: {str(e)}")
+
+@router.post("/mapping-rows/archive/restore")
+async def restore_archived_mapping_rows(request: ArchiveRestoreRequest):
+    """Move archived mapping rows back into their mapping files as active rows, by row ids or every archived
+    row of a mapping file.
+    
+    Rows keep their ids and comments, and each file they rejoin gets a new revision. Returns an outcome per
+    requested id: restored, not_found (not in the archive) or invalid_id.
+    """
+    if (request.rowIds is None) == (request.mappingFileName is None):
+        raise HTTPException(status_code=400, detail="Provide either rowIds or mappingFileName")
+    
+    try:
+        with get_db_connection() as conn:
+            if request.rowIds is not None:
+                requested = {}
+                for row_id in request.rowIds:
+                    if row_id not in requested:
+                        requested[row_id] = _canonical_row_id(row_id)
+                valid_ids = sorted({row_id for row_id in requested.values() if row_id})
+                result = restore_archived_mapping_rows_single_table(
+                    conn, row_ids=valid_ids, restored_by=request.restoredBy
+                ) if valid_ids else {'row_ids': [], 'files': {}}
+                restored = {_canonical_row_id(row_id) for row_id in result['row_ids']}
+                results = [{'id': row_id, 'outcome': 'invalid_id' if canonical is None
+                            else 'restored' if canonical in restored else 'not_found'}
+                           for row_id, canonical in requested.items()]
+            else:
+                result = restore_archived_mapping_rows_single_table(
+                    conn, file_name=request.mappingFileName, restored_by=request.restoredBy
+                )
+                results = [{'id': row_id, 'outcome': 'restored'} for row_id in result['row_ids']]
+            if result['files']:
+                notify_mapping_files_changed(conn, list(result['files']))
+        
+        counts = {outcome: 0 for outcome in ('restored', 'not_found', 'invalid_id')}
+        for outcome in results:
+            counts[outcome['outcome']] += 1
+        return {
+            'restored': counts['restored'],
+            'not_found': counts['not_found'],
+            'invalid': counts['invalid_id'],
+            'files': result['files'],
+            'results': results
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to restore archived mapping rows: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to restore archived mapping rows: {str(e)}")
+
 @router.post("/mapping-rows/{row_id}/comments")
 async def add_row_comment(row_id: str, comment_data: dict):
-    """Add comment to mapping row in single table structure"""
+    """Append a comment to a mapping row"""
     try:
         comment = comment_data.get("comment", "")
+        author = comment_data.get("author")
+        if not comment or not comment.strip():
+            raise HTTPException(status_code=400, detail="Comment text is required")
         
         with get_db_connection() as conn:
-            add_mapping_row_comment_single_table(conn, row_id, comment)
-            return {"message": "Comment added successfully"}
+            saved = add_mapping_row_comment_single_table(conn, row_id, comment, author)
+            return {"message": "Comment added successfully", "comment": saved}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to add comment: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to add comment: {str(e)}")
+
+@router.get("/mapping-rows/{row_id}/comments")
+def get_row_comments(row_id: str, limit: int = Query(default=50, ge=1, le=500), before_id: Optional[int] = None):
+    """Get a mapping row's comments newest first; pass next_before_id as before_id for older ones"""
+    try:
+        with get_db_connection() as conn:
+            return get_mapping_row_comments_single_table(conn, row_id, limit, before_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to load comments: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to load comments: {str(e)}")
@@ -1,7 +1,7 @@
 
 import logging
 from typing import Optional, List
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Header, UploadFile, File, Form
 from pydantic import BaseModel
 
 from database import (
@@ -9,8 +9,16 @@ from database import (
     search_metadata_single_table, 
     get_all_malcodes_single_table,
     get_tables_by_malcode_single_table,
-    get_columns_by_table_single_table
+    get_columns_by_table_single_table,
+    get_malcode_single_table,
+    get_malcode_by_id_single_table,
+    get_table_by_id_single_table,
+    create_malcode_metadata_single_table,
+    create_table_metadata_single_table,
+    create_column_metadata_single_table
 )
+from metadata_import import import_metadata_file, detect_import_format, SUPPORTED_FORMATS, DEFAULT_BATCH_SIZE
+from columnar import negotiate_format, records_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/metadata", tags=["metadata"])
@@ -38,25 +46,28 @@ class CreateColumnRequest(BaseModel):
     created_by: str
 
 @router.get("/search")
-async def search_metadata(term: str = Query(..., description="Search term")):
+async def search_metadata(term: str = Query(..., description="Search term"), accept: Optional[str] = Header(None),
+                          accept_encoding: Optional[str] = Header(None)):
     """Search metadata across malcodes, tables, and columns using single table structure"""
+    media_type = negotiate_format(accept)
     try:
         with get_db_connection() as conn:
             results = search_metadata_single_table(conn, term)
             logger.info(f"Found {len(results)} metadata search results for term: {term}")
-            return {"results": results}
+            return records_response({"results": results}, "results", media_type, accept_encoding)
     except Exception as e:
         logger.error(f"Failed to search metadata in single table: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search metadata: {str(e)}")
 
 @router.get("/malcodes")
-async def get_all_malcodes():
+async def get_all_malcodes(accept: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Get all malcodes from single table structure"""
+    media_type = negotiate_format(accept)
     try:
         with get_db_connection() as conn:
             malcodes = get_all_malcodes_single_table(conn)
             logger.info(f"Retrieved {len(malcodes)} malcodes from single table")
-            return {"malcodes": malcodes}
+            return records_response({"malcodes": malcodes}, "malcodes", media_type, accept_encoding)
     except Exception as e:
         logger.error(f"Failed to get malcodes from single table: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get malcodes: {str(e)}")
@@ -66,19 +77,10 @@ async def create_malcode(request: CreateMalcodeRequest):
     """Create a new malcode in the metadata_single table"""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Insert a new record in metadata_single table for the malcode
-            cursor.execute("""
-                INSERT INTO metadata_single (
-                    malcode, malcode_description, table_name, column_name, 
-                    data_type, created_by, created_at, updated_at, is_active
-                ) VALUES (?, ?, 'default_table', 'default_column', 'string', ?, GETDATE(), GETDATE(), 1)
-            """, (request.malcode, request.description, request.created_by))
-            
-            conn.commit()
+            malcode_id = create_malcode_metadata_single_table(conn, request.malcode, request.description,
+                                                              request.created_by)
             logger.info(f"Created malcode: {request.malcode}")
-            return {"id": request.malcode, "message": "Malcode created successfully"}
+            return {"id": malcode_id, "message": "Malcode created successfully"}
     except Exception as e:
         logger.error(f"Failed to create malcode: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create malcode: {str(e)}")
@@ -88,8 +90,7 @@ async def get_malcode_by_name(malcode: str):
     """Get a specific malcode by name from single table structure"""
     try:
         with get_db_connection() as conn:
-            malcodes = get_all_malcodes_single_table(conn)
-            found_malcode = next((m for m in malcodes if m['malcode'] == malcode), None)
+            found_malcode = get_malcode_single_table(conn, malcode)
             
             if not found_malcode:
                 raise HTTPException(status_code=404, detail="Malcode not found")
@@ -102,25 +103,27 @@ async def get_malcode_by_name(malcode: str):
         raise HTTPException(status_code=500, detail=f"Failed to get malcode: {str(e)}")
 
 @router.get("/tables")
-async def get_tables(malcode_id: Optional[str] = Query(None), table_name: Optional[str] = Query(None)):
+async def get_tables(malcode_id: Optional[str] = Query(None), table_name: Optional[str] = Query(None),
+                     accept: Optional[str] = Header(None), accept_encoding: Optional[str] = Header(None)):
     """Get tables from single table structure, optionally filtered by malcode_id and table_name"""
+    media_type = negotiate_format(accept)
     try:
         with get_db_connection() as conn:
-            if malcode_id and not table_name:
-                # Get malcode by ID first
-                malcodes = get_all_malcodes_single_table(conn)
-                target_malcode = next((m for m in malcodes if m['id'] == malcode_id), None)
+            if malcode_id:
+                target_malcode = get_malcode_by_id_single_table(conn, malcode_id)
                 
                 if not target_malcode:
-                    return {"tables": []}
+                    return records_response({"tables": []}, "tables", media_type, accept_encoding)
                 
                 tables = get_tables_by_malcode_single_table(conn, target_malcode['malcode'])
+                if table_name:
+                    tables = [t for t in tables if t['table_name'] == table_name]
             else:
                 # Return empty for now - would need more complex logic for other cases
                 tables = []
             
             logger.info(f"Retrieved {len(tables)} tables from single table")
-            return {"tables": tables}
+            return records_response({"tables": tables}, "tables", media_type, accept_encoding)
     except Exception as e:
         logger.error(f"Failed to get tables from single table: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get tables: {str(e)}")
@@ -130,56 +133,37 @@ async def create_table(request: CreateTableRequest):
     """Create a new table in the metadata_single table"""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First, get the malcode name from the malcode_id
-            malcodes = get_all_malcodes_single_table(conn)
-            target_malcode = next((m for m in malcodes if m['id'] == request.malcode_id), None)
+            target_malcode = get_malcode_by_id_single_table(conn, request.malcode_id)
             
             if not target_malcode:
                 raise HTTPException(status_code=404, detail="Malcode not found")
             
-            # Insert a new record in metadata_single table for the table
-            cursor.execute("""
-                INSERT INTO metadata_single (
-                    malcode, malcode_description, table_name, table_description, 
-                    column_name, data_type, created_by, created_at, updated_at, is_active
-                ) VALUES (?, ?, ?, ?, 'default_column', 'string', ?, GETDATE(), GETDATE(), 1)
-            """, (target_malcode['malcode'], target_malcode['business_description'], 
-                  request.table_name, request.description, request.created_by))
-            
-            conn.commit()
+            table_id = create_table_metadata_single_table(conn, target_malcode['malcode'], request.table_name,
+                                                          request.description, request.created_by)
             logger.info(f"Created table: {request.table_name} for malcode: {target_malcode['malcode']}")
-            return {"id": f"{target_malcode['malcode']}_{request.table_name}", "message": "Table created successfully"}
+            return {"id": table_id, "message": "Table created successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create table: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create table: {str(e)}")
 
 @router.get("/columns")
-async def get_columns(table_id: Optional[str] = Query(None)):
+async def get_columns(table_id: Optional[str] = Query(None), accept: Optional[str] = Header(None),
+                      accept_encoding: Optional[str] = Header(None)):
     """Get columns from single table structure, optionally filtered by table_id"""
+    media_type = negotiate_format(accept)
     try:
         with get_db_connection() as conn:
+            columns = []
             if table_id:
-                # Parse table_id to extract malcode and table_name
-                # Table ID format: "table_{hash(malcode_tablename)}"
-                # We need to reverse lookup from all malcodes and tables
-                malcodes = get_all_malcodes_single_table(conn)
-                columns = []
-                
-                for malcode_data in malcodes:
-                    tables = get_tables_by_malcode_single_table(conn, malcode_data['malcode'])
-                    for table in tables:
-                        if table['id'] == table_id:
-                            columns = get_columns_by_table_single_table(conn, malcode_data['malcode'], table['table_name'])
-                            break
-                    if columns:
-                        break
-            else:
-                columns = []
+                target_table = get_table_by_id_single_table(conn, table_id)
+                if target_table:
+                    columns = get_columns_by_table_single_table(conn, target_table['malcode'],
+                                                                target_table['table_name'])
             
             logger.info(f"Retrieved {len(columns)} columns from single table")
-            return {"columns": columns}
+            return records_response({"columns": columns}, "columns", media_type, accept_encoding)
     except Exception as e:
         logger.error(f"Failed to get columns from single table: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get columns: {str(e)}")
@@ -189,43 +173,55 @@ async def create_column(request: CreateColumnRequest):
     """Create a new column in the metadata_single table"""
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First, find the malcode and table_name from the table_id
-            malcodes = get_all_malcodes_single_table(conn)
-            target_malcode = None
-            target_table = None
-            
-            for malcode_data in malcodes:
-                tables = get_tables_by_malcode_single_table(conn, malcode_data['malcode'])
-                for table in tables:
-                    if table['id'] == request.table_id:
-                        target_malcode = malcode_data
-                        target_table = table
-                        break
-                if target_malcode and target_table:
-                    break
+            target_table = get_table_by_id_single_table(conn, request.table_id)
             
-            if not target_malcode or not target_table:
+            if not target_table:
                 raise HTTPException(status_code=404, detail="Table not found")
             
-            # Insert a new record in metadata_single table for the column
-            cursor.execute("""
-                INSERT INTO metadata_single (
-                    malcode, malcode_description, table_name, table_description,
-                    column_name, column_description, data_type, is_primary_key, 
-                    is_nullable, default_value, created_by, created_at, updated_at, is_active
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, GETDATE(), GETDATE(), 1)
-            """, (target_malcode['malcode'], target_malcode['business_description'],
-                  target_table['table_name'], target_table['business_description'],
-                  request.column_name, request.business_description, request.data_type,
-                  request.is_primary_key, request.is_nullable, request.default_value,
-                  request.created_by))
-            
-            conn.commit()
+            column_id = create_column_metadata_single_table(
+                conn, target_table['malcode'], target_table['table_name'], request.column_name,
+                request.data_type, request.business_description, request.is_primary_key,
+                request.is_nullable, request.default_value, request.created_by
+            )
             logger.info(f"Created column: {request.column_name} for table: {target_table['table_name']}")
-            return {"id": f"{target_malcode['malcode']}_{target_table['table_name']}_{request.column_name}", 
-                    "message": "Column created successfully"}
+            return {"id": column_id, "message": "Column created successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to create column: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to create column: {str(e)}")
+
+@router.post("/import")
+def import_metadata(
+    file: UploadFile = File(...),
+    created_by: str = Form("system"),
+    file_format: Optional[str] = Form(None, description="csv, xlsx or json; inferred from the file name if omitted"),
+    batch_size: int = Form(DEFAULT_BATCH_SIZE, ge=1, le=50000)
+):
+    """Bulk import malcode/table/column metadata from a CSV, XLSX or JSON file into metadata_single.
+    
+    Batches commit as they go. A file that can't be read at all is a 400 and imports nothing. If it becomes
+    unreadable part way (bad JSON, a corrupt XLSX row), the import stops there and the rows before it stay
+    imported: the report has completed false, the error, and the counts of what was imported.
+    """
+    file_format = (file_format or detect_import_format(file.filename, file.content_type) or '').lower()
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported or unknown file format. Supported formats: {', '.join(SUPPORTED_FORMATS)}"
+        )
+    
+    try:
+        with get_db_connection() as conn:
+            report = import_metadata_file(conn, file.file, file_format, created_by, batch_size)
+            logger.info(f"Metadata import of {file.filename}: {report['rows_imported']} imported, "
+                        f"{report['rows_rejected']} rejected, {report['rows_per_second']} rows/s")
+            return report
+    except ValueError as e:
+        logger.error(f"Invalid metadata import file {file.filename}: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid metadata import file: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Failed to import metadata: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to import metadata: {str(e)}")
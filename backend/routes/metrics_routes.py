@@ -0,0 +1,13 @@
+
+from fastapi import APIRouter, Response
+
+from instrumentation import metrics_payload
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Prometheus scrape endpoint"""
+    payload, content_type = metrics_payload()
+    # content_type already names its charset; as media_type, Response would append a second one
+    return Response(content=payload, headers={'Content-Type': content_type})
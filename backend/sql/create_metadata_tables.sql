@@ -6,13 +6,15 @@
 DROP TABLE IF EXISTS metadata_single;
 
 -- Create a single denormalized metadata table
+-- Each row is a malcode, a table or a column, distinguished by metadata_level
 CREATE TABLE metadata_single (
     id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+    metadata_level NVARCHAR(10) NOT NULL CONSTRAINT DF_metadata_single_level DEFAULT 'column',
     malcode NVARCHAR(255) NOT NULL,
     malcode_description NVARCHAR(MAX),
-    table_name NVARCHAR(255) NOT NULL,
+    table_name NVARCHAR(255),
     table_description NVARCHAR(MAX),
-    column_name NVARCHAR(255) NOT NULL,
+    column_name NVARCHAR(255),
     column_description NVARCHAR(MAX),
     data_type NVARCHAR(100) DEFAULT 'string',
     is_primary_key BIT DEFAULT 0,
@@ -24,7 +26,12 @@ CREATE TABLE metadata_single (
     is_active BIT DEFAULT 1,
     
     -- Create a unique constraint
-    CONSTRAINT UQ_metadata_single_unique UNIQUE (malcode, table_name, column_name)
+    CONSTRAINT UQ_metadata_single_malcode_table_column UNIQUE (malcode, table_name, column_name),
+    CONSTRAINT CHK_metadata_single_level CHECK (
+        (metadata_level = 'malcode' AND table_name IS NULL AND column_name IS NULL)
+        OR (metadata_level = 'table' AND table_name IS NOT NULL AND column_name IS NULL)
+        OR (metadata_level = 'column' AND table_name IS NOT NULL AND column_name IS NOT NULL)
+    )
 );
 
 -- Insert sample data for testing
@@ -53,8 +60,26 @@ INSERT INTO metadata_single (malcode, malcode_description, table_name, table_des
 ('HR', 'Human resources and employee data', 'DEPARTMENTS', 'Department information', 'DEPT_ID', 'Unique department identifier', 'integer', 1, 0),
 ('HR', 'Human resources and employee data', 'DEPARTMENTS', 'Department information', 'DEPT_NAME', 'Department name', 'string', 0, 0);
 
+-- Derive the malcode and table rows for the sample columns
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, created_by)
+SELECT 'malcode', malcode, MAX(malcode_description), 'system'
+FROM metadata_single
+WHERE metadata_level = 'column'
+GROUP BY malcode;
+
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, table_name, table_description, created_by)
+SELECT 'table', malcode, MAX(malcode_description), table_name, MAX(table_description), 'system'
+FROM metadata_single
+WHERE metadata_level = 'column'
+GROUP BY malcode, table_name;
+
 -- Create indexes for better performance
-CREATE INDEX IX_metadata_single_malcode ON metadata_single(malcode);
+CREATE UNIQUE INDEX IX_metadata_single_malcodes ON metadata_single(malcode)
+    INCLUDE (malcode_description, created_at, updated_at, created_by)
+    WHERE metadata_level = 'malcode' AND is_active = 1;
+CREATE UNIQUE INDEX IX_metadata_single_tables ON metadata_single(malcode, table_name)
+    INCLUDE (table_description, created_at, updated_at, created_by)
+    WHERE metadata_level = 'table' AND is_active = 1;
 CREATE INDEX IX_metadata_single_table_name ON metadata_single(table_name);
 CREATE INDEX IX_metadata_single_column_name ON metadata_single(column_name);
 
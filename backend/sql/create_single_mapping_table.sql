@@ -53,6 +53,7 @@ CREATE TABLE mapping_single (
     reviewed_at DATETIME2,
     comments NVARCHAR(MAX), -- JSON array stored as string
     is_active BIT DEFAULT 1,
+    row_version ROWVERSION NOT NULL, -- changes on every write; used for optimistic concurrency
     
     -- Add constraints
     CONSTRAINT CHK_mapping_single_status CHECK (mapping_status IN ('draft', 'pending', 'approved', 'rejected')),
@@ -61,13 +62,123 @@ CREATE TABLE mapping_single (
 );
 
 -- Create indexes for better performance
-CREATE INDEX IX_mapping_single_source_malcode ON mapping_single(source_malcode);
-CREATE INDEX IX_mapping_single_target_malcode ON mapping_single(target_malcode);
-CREATE INDEX IX_mapping_single_source_table ON mapping_single(source_table_name);
-CREATE INDEX IX_mapping_single_target_table ON mapping_single(target_table_name);
+-- Filtered on is_active = 1 to match the live-row predicate used by every read
 CREATE INDEX IX_mapping_single_mapping_file ON mapping_single(mapping_file_name);
+CREATE INDEX IX_mapping_single_active_file ON mapping_single(mapping_file_name)
+    INCLUDE (mapping_file_description, source_system, target_system, mapping_status, created_by, created_at, updated_at,
+             row_version)
+    WHERE is_active = 1;
+CREATE INDEX IX_mapping_single_active_source_column ON mapping_single(source_malcode, source_table_name, source_column_name)
+    INCLUDE (mapping_file_name, target_malcode, target_table_name, target_column_name)
+    WHERE is_active = 1;
+CREATE INDEX IX_mapping_single_active_target_column ON mapping_single(target_malcode, target_table_name, target_column_name)
+    INCLUDE (mapping_file_name, source_malcode, source_table_name, source_column_name)
+    WHERE is_active = 1;
 CREATE INDEX IX_mapping_single_status ON mapping_single(mapping_status);
 CREATE INDEX IX_mapping_single_created_by ON mapping_single(created_by);
+CREATE INDEX IX_mapping_single_inactive ON mapping_single(updated_at) INCLUDE (mapping_file_name)
+    WHERE is_active = 0;
+
+-- Soft-deleted mapping rows moved out of mapping_single by the archiver, with their comments
+CREATE TABLE mapping_single_archive (
+    archive_id BIGINT IDENTITY(1,1) NOT NULL,
+    id UNIQUEIDENTIFIER NOT NULL,
+    mapping_file_name NVARCHAR(255),
+    mapping_file_description NVARCHAR(MAX),
+    source_system NVARCHAR(255),
+    target_system NVARCHAR(255),
+    mapping_status NVARCHAR(50),
+    source_malcode NVARCHAR(255) NOT NULL,
+    source_malcode_description NVARCHAR(MAX),
+    source_table_name NVARCHAR(255) NOT NULL,
+    source_table_description NVARCHAR(MAX),
+    source_column_name NVARCHAR(255) NOT NULL,
+    source_column_description NVARCHAR(MAX),
+    source_data_type NVARCHAR(100),
+    source_is_primary_key BIT,
+    source_is_nullable BIT,
+    source_default_value NVARCHAR(MAX),
+    source_type NVARCHAR(50),
+    target_malcode NVARCHAR(255) NOT NULL,
+    target_malcode_description NVARCHAR(MAX),
+    target_table_name NVARCHAR(255) NOT NULL,
+    target_table_description NVARCHAR(MAX),
+    target_column_name NVARCHAR(255) NOT NULL,
+    target_column_description NVARCHAR(MAX),
+    target_data_type NVARCHAR(100),
+    target_is_primary_key BIT,
+    target_is_nullable BIT,
+    target_default_value NVARCHAR(MAX),
+    target_type NVARCHAR(50),
+    transformation NVARCHAR(MAX),
+    join_clause NVARCHAR(MAX),
+    created_by NVARCHAR(255) NOT NULL,
+    created_at DATETIME2,
+    updated_at DATETIME2,
+    reviewer NVARCHAR(255),
+    reviewed_at DATETIME2,
+    comments NVARCHAR(MAX),
+    archived_comments NVARCHAR(MAX),
+    archived_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_mapping_single_archive PRIMARY KEY CLUSTERED (archive_id)
+);
+CREATE UNIQUE INDEX UQ_mapping_single_archive_id ON mapping_single_archive(id);
+CREATE INDEX IX_mapping_single_archive_file ON mapping_single_archive(mapping_file_name, archive_id);
+
+-- Append-only reviewer comments, clustered by mapping row
+CREATE TABLE mapping_row_comments (
+    id BIGINT IDENTITY(1,1) NOT NULL,
+    mapping_row_id UNIQUEIDENTIFIER NOT NULL,
+    comment NVARCHAR(MAX) NOT NULL,
+    author NVARCHAR(255) NULL,
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_mapping_row_comments PRIMARY KEY NONCLUSTERED (id),
+    CONSTRAINT FK_mapping_row_comments_row FOREIGN KEY (mapping_row_id)
+        REFERENCES mapping_single(id) ON DELETE CASCADE
+);
+CREATE CLUSTERED INDEX IX_mapping_row_comments_row ON mapping_row_comments(mapping_row_id, id);
+
+-- Append-only change log read by GET /api/changes; seq orders entries by commit
+CREATE TABLE mapping_change_log (
+    seq ROWVERSION NOT NULL,
+    change_type NVARCHAR(50) NOT NULL,
+    mapping_file_name NVARCHAR(255) NULL,
+    mapping_row_id UNIQUEIDENTIFIER NULL,
+    payload NVARCHAR(MAX) NULL,
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_mapping_change_log PRIMARY KEY CLUSTERED (seq)
+);
+CREATE INDEX IX_mapping_change_log_created_at ON mapping_change_log(created_at);
+
+-- Mapping file revisions; each row content is stored once with the revisions that added and removed it
+CREATE TABLE mapping_file_revisions (
+    mapping_file_name NVARCHAR(255) NOT NULL,
+    revision INT NOT NULL,
+    description NVARCHAR(MAX) NULL,
+    source_system NVARCHAR(255) NULL,
+    target_system NVARCHAR(255) NULL,
+    row_count INT NOT NULL,
+    rows_added INT NOT NULL,
+    rows_removed INT NOT NULL,
+    source NVARCHAR(50) NOT NULL,
+    restored_from INT NULL,
+    created_by NVARCHAR(255) NULL,
+    created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+    CONSTRAINT PK_mapping_file_revisions PRIMARY KEY CLUSTERED (mapping_file_name, revision)
+);
+
+CREATE TABLE mapping_file_revision_rows (
+    id BIGINT IDENTITY(1,1) NOT NULL,
+    mapping_file_name NVARCHAR(255) NOT NULL,
+    row_key VARCHAR(50) NOT NULL,
+    added_in INT NOT NULL,
+    removed_in INT NULL,
+    row_data NVARCHAR(MAX) NOT NULL,
+    CONSTRAINT PK_mapping_file_revision_rows PRIMARY KEY NONCLUSTERED (id)
+);
+CREATE CLUSTERED INDEX IX_mapping_file_revision_rows_added ON mapping_file_revision_rows(mapping_file_name, added_in, id);
+CREATE INDEX IX_mapping_file_revision_rows_removed ON mapping_file_revision_rows(mapping_file_name, removed_in)
+    INCLUDE (row_key, added_in);
 
 -- Insert sample mapping data
 INSERT INTO mapping_single (
@@ -6,19 +6,21 @@
 DROP TABLE IF EXISTS metadata_single;
 
 -- Create the metadata_single table with all necessary columns
+-- Each row is a malcode, a table or a column, distinguished by metadata_level
 CREATE TABLE metadata_single (
     id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+    metadata_level NVARCHAR(10) NOT NULL CONSTRAINT DF_metadata_single_level DEFAULT 'column',
     
     -- Malcode information
     malcode NVARCHAR(255) NOT NULL,
     malcode_description NVARCHAR(MAX),
     
-    -- Table information
-    table_name NVARCHAR(255) NOT NULL,
+    -- Table information (NULL on malcode rows)
+    table_name NVARCHAR(255),
     table_description NVARCHAR(MAX),
     
-    -- Column information
-    column_name NVARCHAR(255) NOT NULL,
+    -- Column information (NULL on malcode and table rows)
+    column_name NVARCHAR(255),
     column_description NVARCHAR(MAX),
     data_type NVARCHAR(100) DEFAULT 'string',
     is_primary_key BIT DEFAULT 0,
@@ -32,14 +34,24 @@ CREATE TABLE metadata_single (
     is_active BIT DEFAULT 1,
     
     -- Add constraints and indexes
-    CONSTRAINT UQ_metadata_single_malcode_table_column UNIQUE (malcode, table_name, column_name)
+    CONSTRAINT UQ_metadata_single_malcode_table_column UNIQUE (malcode, table_name, column_name),
+    CONSTRAINT CHK_metadata_single_level CHECK (
+        (metadata_level = 'malcode' AND table_name IS NULL AND column_name IS NULL)
+        OR (metadata_level = 'table' AND table_name IS NOT NULL AND column_name IS NULL)
+        OR (metadata_level = 'column' AND table_name IS NOT NULL AND column_name IS NOT NULL)
+    )
 );
 
 -- Create indexes for better performance
-CREATE INDEX IX_metadata_single_malcode ON metadata_single(malcode);
+-- Filtered indexes keep malcode and table listings proportional to the number of malcodes and tables
+CREATE UNIQUE INDEX IX_metadata_single_malcodes ON metadata_single(malcode)
+    INCLUDE (malcode_description, created_at, updated_at, created_by)
+    WHERE metadata_level = 'malcode' AND is_active = 1;
+CREATE UNIQUE INDEX IX_metadata_single_tables ON metadata_single(malcode, table_name)
+    INCLUDE (table_description, created_at, updated_at, created_by)
+    WHERE metadata_level = 'table' AND is_active = 1;
 CREATE INDEX IX_metadata_single_table ON metadata_single(table_name);
 CREATE INDEX IX_metadata_single_column ON metadata_single(column_name);
-CREATE INDEX IX_metadata_single_active ON metadata_single(is_active);
 
 -- Insert sample metadata that matches the mapping_single data
 INSERT INTO metadata_single (
@@ -72,4 +84,17 @@ INSERT INTO metadata_single (
 ('ORD', 'Order processing and management', 'FACT_ORDERS', 'Orders fact table',
  'ORDER_KEY', 'Order fact key', 'integer', 1, 0, 'system');
 
+-- Derive the malcode and table rows for the sample columns
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, created_by)
+SELECT 'malcode', malcode, MAX(malcode_description), 'system'
+FROM metadata_single
+WHERE metadata_level = 'column'
+GROUP BY malcode;
+
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, table_name, table_description, created_by)
+SELECT 'table', malcode, MAX(malcode_description), table_name, MAX(table_description), 'system'
+FROM metadata_single
+WHERE metadata_level = 'column'
+GROUP BY malcode, table_name;
+
 PRINT 'Single metadata table created successfully with sample data.';
@@ -2,6 +2,23 @@
 -- Azure SQL Database cleanup script
 -- Use this to drop all tables (WARNING: This will delete all data!)
 
+-- The change log, revisions and archive have no foreign keys
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_change_log')
+    DROP TABLE mapping_change_log;
+
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_file_revision_rows')
+    DROP TABLE mapping_file_revision_rows;
+
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_file_revisions')
+    DROP TABLE mapping_file_revisions;
+
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_single_archive')
+    DROP TABLE mapping_single_archive;
+
+-- Drop the row comments first; they reference mapping_single
+IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_row_comments')
+    DROP TABLE mapping_row_comments;
+
 -- Drop the single mapping table if it exists
 IF EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_single')
     DROP TABLE mapping_single;
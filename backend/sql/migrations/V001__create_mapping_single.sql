@@ -0,0 +1,79 @@
+
+-- Baseline: the mapping_single table as created by create_single_mapping_table.sql
+-- Databases that already have the table are left untouched.
+
+IF OBJECT_ID('mapping_single', 'U') IS NULL
+    CREATE TABLE mapping_single (
+        id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+        
+        -- Mapping file information
+        mapping_file_name NVARCHAR(255),
+        mapping_file_description NVARCHAR(MAX),
+        source_system NVARCHAR(255),
+        target_system NVARCHAR(255),
+        mapping_status NVARCHAR(50) DEFAULT 'draft',
+        
+        -- Source column information
+        source_malcode NVARCHAR(255) NOT NULL,
+        source_malcode_description NVARCHAR(MAX),
+        source_table_name NVARCHAR(255) NOT NULL,
+        source_table_description NVARCHAR(MAX),
+        source_column_name NVARCHAR(255) NOT NULL,
+        source_column_description NVARCHAR(MAX),
+        source_data_type NVARCHAR(100) DEFAULT 'string',
+        source_is_primary_key BIT DEFAULT 0,
+        source_is_nullable BIT DEFAULT 1,
+        source_default_value NVARCHAR(MAX),
+        source_type NVARCHAR(50) DEFAULT 'SRZ_ADLS',
+        
+        -- Target column information
+        target_malcode NVARCHAR(255) NOT NULL,
+        target_malcode_description NVARCHAR(MAX),
+        target_table_name NVARCHAR(255) NOT NULL,
+        target_table_description NVARCHAR(MAX),
+        target_column_name NVARCHAR(255) NOT NULL,
+        target_column_description NVARCHAR(MAX),
+        target_data_type NVARCHAR(100) DEFAULT 'string',
+        target_is_primary_key BIT DEFAULT 0,
+        target_is_nullable BIT DEFAULT 1,
+        target_default_value NVARCHAR(MAX),
+        target_type NVARCHAR(50) DEFAULT 'CZ_ADLS',
+        
+        -- Mapping transformation information
+        transformation NVARCHAR(MAX),
+        join_clause NVARCHAR(MAX),
+        
+        -- Audit and review information
+        created_by NVARCHAR(255) NOT NULL DEFAULT 'system',
+        created_at DATETIME2 DEFAULT GETDATE(),
+        updated_at DATETIME2 DEFAULT GETDATE(),
+        reviewer NVARCHAR(255),
+        reviewed_at DATETIME2,
+        comments NVARCHAR(MAX), -- JSON array stored as string
+        is_active BIT DEFAULT 1,
+        
+        CONSTRAINT CHK_mapping_single_status CHECK (mapping_status IN ('draft', 'pending', 'approved', 'rejected')),
+        CONSTRAINT CHK_mapping_single_source_type CHECK (source_type IN ('SRZ_ADLS')),
+        CONSTRAINT CHK_mapping_single_target_type CHECK (target_type IN ('CZ_ADLS', 'SYNAPSE_TABLE'))
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_source_malcode' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_source_malcode ON mapping_single(source_malcode);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_target_malcode' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_target_malcode ON mapping_single(target_malcode);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_source_table' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_source_table ON mapping_single(source_table_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_target_table' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_target_table ON mapping_single(target_table_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_mapping_file' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_mapping_file ON mapping_single(mapping_file_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_status' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_status ON mapping_single(mapping_status);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_created_by' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_created_by ON mapping_single(created_by);
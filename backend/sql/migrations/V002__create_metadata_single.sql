@@ -0,0 +1,36 @@
+
+-- Baseline: the metadata_single table as created by create_single_metadata_table.sql
+-- Databases that already have the table are left untouched.
+
+IF OBJECT_ID('metadata_single', 'U') IS NULL
+    CREATE TABLE metadata_single (
+        id UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(),
+        malcode NVARCHAR(255) NOT NULL,
+        malcode_description NVARCHAR(MAX),
+        table_name NVARCHAR(255) NOT NULL,
+        table_description NVARCHAR(MAX),
+        column_name NVARCHAR(255) NOT NULL,
+        column_description NVARCHAR(MAX),
+        data_type NVARCHAR(100) DEFAULT 'string',
+        is_primary_key BIT DEFAULT 0,
+        is_nullable BIT DEFAULT 1,
+        default_value NVARCHAR(MAX),
+        created_by NVARCHAR(255) NOT NULL DEFAULT 'system',
+        created_at DATETIME2 DEFAULT GETDATE(),
+        updated_at DATETIME2 DEFAULT GETDATE(),
+        is_active BIT DEFAULT 1,
+        
+        CONSTRAINT UQ_metadata_single_malcode_table_column UNIQUE (malcode, table_name, column_name)
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_malcode' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_malcode ON metadata_single(malcode);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_table' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_table ON metadata_single(table_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_column' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_column ON metadata_single(column_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_active' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_active ON metadata_single(is_active);
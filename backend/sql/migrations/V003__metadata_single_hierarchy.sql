@@ -0,0 +1,87 @@
+
+-- Move metadata_single to the malcode/table/column hierarchy
+-- Replaces the 'default_table'/'default_column' placeholder rows with malcode and table level rows.
+-- Every step checks whether it has already been applied, so databases created by the current
+-- create_single_metadata_table.sql pass through unchanged.
+
+-- Add the level discriminator (existing rows are column rows)
+IF COL_LENGTH('metadata_single', 'metadata_level') IS NULL
+    ALTER TABLE metadata_single ADD metadata_level NVARCHAR(10) NOT NULL
+        CONSTRAINT DF_metadata_single_level DEFAULT 'column';
+
+-- Drop the constraints and indexes that block making table_name/column_name nullable
+IF EXISTS (SELECT * FROM sys.key_constraints WHERE name = 'UQ_metadata_single_malcode_table_column')
+    ALTER TABLE metadata_single DROP CONSTRAINT UQ_metadata_single_malcode_table_column;
+
+IF EXISTS (SELECT * FROM sys.key_constraints WHERE name = 'UQ_metadata_single_unique')
+    ALTER TABLE metadata_single DROP CONSTRAINT UQ_metadata_single_unique;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_table' AND object_id = OBJECT_ID('metadata_single'))
+    DROP INDEX IX_metadata_single_table ON metadata_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_table_name' AND object_id = OBJECT_ID('metadata_single'))
+    DROP INDEX IX_metadata_single_table_name ON metadata_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_column' AND object_id = OBJECT_ID('metadata_single'))
+    DROP INDEX IX_metadata_single_column ON metadata_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_column_name' AND object_id = OBJECT_ID('metadata_single'))
+    DROP INDEX IX_metadata_single_column_name ON metadata_single;
+
+IF COLUMNPROPERTY(OBJECT_ID('metadata_single'), 'table_name', 'AllowsNull') = 0
+    ALTER TABLE metadata_single ALTER COLUMN table_name NVARCHAR(255) NULL;
+
+IF COLUMNPROPERTY(OBJECT_ID('metadata_single'), 'column_name', 'AllowsNull') = 0
+    ALTER TABLE metadata_single ALTER COLUMN column_name NVARCHAR(255) NULL;
+
+-- Create a malcode row for every malcode, including ones that only had placeholder rows
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, created_by, created_at, updated_at, is_active)
+SELECT 'malcode', s.malcode, MAX(s.malcode_description), MIN(s.created_by), MIN(s.created_at), MAX(s.updated_at), 1
+FROM metadata_single s
+WHERE s.metadata_level = 'column'
+  AND NOT EXISTS (SELECT 1 FROM metadata_single m WHERE m.metadata_level = 'malcode' AND m.malcode = s.malcode)
+GROUP BY s.malcode;
+
+-- Create a table row for every real table
+INSERT INTO metadata_single (metadata_level, malcode, malcode_description, table_name, table_description,
+                             created_by, created_at, updated_at, is_active)
+SELECT 'table', s.malcode, MAX(s.malcode_description), s.table_name, MAX(s.table_description),
+       MIN(s.created_by), MIN(s.created_at), MAX(s.updated_at), 1
+FROM metadata_single s
+WHERE s.metadata_level = 'column'
+  AND s.table_name <> 'default_table'
+  AND NOT EXISTS (SELECT 1 FROM metadata_single t
+                  WHERE t.metadata_level = 'table' AND t.malcode = s.malcode AND t.table_name = s.table_name)
+GROUP BY s.malcode, s.table_name;
+
+-- Remove the placeholder rows now represented by malcode and table rows
+DELETE FROM metadata_single
+WHERE metadata_level = 'column' AND (column_name = 'default_column' OR table_name = 'default_table');
+
+-- Recreate the constraints and indexes
+IF NOT EXISTS (SELECT * FROM sys.check_constraints WHERE name = 'CHK_metadata_single_level')
+    ALTER TABLE metadata_single ADD CONSTRAINT CHK_metadata_single_level CHECK (
+        (metadata_level = 'malcode' AND table_name IS NULL AND column_name IS NULL)
+        OR (metadata_level = 'table' AND table_name IS NOT NULL AND column_name IS NULL)
+        OR (metadata_level = 'column' AND table_name IS NOT NULL AND column_name IS NOT NULL)
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.key_constraints WHERE name = 'UQ_metadata_single_malcode_table_column')
+    ALTER TABLE metadata_single ADD CONSTRAINT UQ_metadata_single_malcode_table_column
+        UNIQUE (malcode, table_name, column_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_malcodes' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE UNIQUE INDEX IX_metadata_single_malcodes ON metadata_single(malcode)
+        INCLUDE (malcode_description, created_at, updated_at, created_by)
+        WHERE metadata_level = 'malcode' AND is_active = 1;
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_tables' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE UNIQUE INDEX IX_metadata_single_tables ON metadata_single(malcode, table_name)
+        INCLUDE (table_description, created_at, updated_at, created_by)
+        WHERE metadata_level = 'table' AND is_active = 1;
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_table' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_table ON metadata_single(table_name);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_metadata_single_column' AND object_id = OBJECT_ID('metadata_single'))
+    CREATE INDEX IX_metadata_single_column ON metadata_single(column_name);
@@ -0,0 +1,40 @@
+-- migrate:no-transaction
+-- migrate:lock-timeout 10000
+
+-- Add covering, filtered indexes to mapping_single
+-- The indexes match the query shapes in database/mapping_operations.py:
+--   * file listing and per-file row loads filter on is_active and key on mapping_file_name
+--   * source/target column lookups (lineage and impact analysis) key on malcode, table and column
+-- Indexes are built ONLINE, each in its own transaction, so the table stays readable and writable
+-- and no single long-running transaction holds locks across all of the builds.
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_active_file' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_active_file ON mapping_single(mapping_file_name)
+        INCLUDE (mapping_file_description, source_system, target_system, mapping_status, created_by, created_at, updated_at)
+        WHERE is_active = 1
+        WITH (ONLINE = ON);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_active_source_column' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_active_source_column ON mapping_single(source_malcode, source_table_name, source_column_name)
+        INCLUDE (mapping_file_name, target_malcode, target_table_name, target_column_name)
+        WHERE is_active = 1
+        WITH (ONLINE = ON);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_active_target_column' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_active_target_column ON mapping_single(target_malcode, target_table_name, target_column_name)
+        INCLUDE (mapping_file_name, source_malcode, source_table_name, source_column_name)
+        WHERE is_active = 1
+        WITH (ONLINE = ON);
+
+-- The single-column malcode/table indexes are superseded by the composite column indexes above
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_source_malcode' AND object_id = OBJECT_ID('mapping_single'))
+    DROP INDEX IX_mapping_single_source_malcode ON mapping_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_target_malcode' AND object_id = OBJECT_ID('mapping_single'))
+    DROP INDEX IX_mapping_single_target_malcode ON mapping_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_source_table' AND object_id = OBJECT_ID('mapping_single'))
+    DROP INDEX IX_mapping_single_source_table ON mapping_single;
+
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_target_table' AND object_id = OBJECT_ID('mapping_single'))
+    DROP INDEX IX_mapping_single_target_table ON mapping_single;
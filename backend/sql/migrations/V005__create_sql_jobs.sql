@@ -0,0 +1,27 @@
+-- Persisted history of background SQL jobs (DDL scripts and custom SQL, see sql_jobs.py)
+IF OBJECT_ID('sql_jobs', 'U') IS NULL
+    CREATE TABLE sql_jobs (
+        id UNIQUEIDENTIFIER PRIMARY KEY,
+        job_type NVARCHAR(20) NOT NULL, -- 'ddl' or 'sql'
+        operation NVARCHAR(100) NULL, -- DDL operation name, e.g. 'create-tables'
+        status NVARCHAR(20) NOT NULL,
+        sql_script NVARCHAR(MAX) NOT NULL,
+        statement_count INT NOT NULL,
+        statements_completed INT NOT NULL DEFAULT 0,
+        statement_timeout_seconds INT NULL,
+        transactional BIT NOT NULL DEFAULT 1,
+        submitted_by NVARCHAR(255) NULL,
+        submitted_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+        started_at DATETIME2 NULL,
+        finished_at DATETIME2 NULL,
+        error_message NVARCHAR(MAX) NULL,
+        results NVARCHAR(MAX) NULL, -- JSON array of per-statement results
+        CONSTRAINT CHK_sql_jobs_status CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled'))
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_sql_jobs_submitted_at' AND object_id = OBJECT_ID('sql_jobs'))
+    CREATE INDEX IX_sql_jobs_submitted_at ON sql_jobs(submitted_at DESC)
+        INCLUDE (job_type, operation, status, statement_count, statements_completed);
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_sql_jobs_status' AND object_id = OBJECT_ID('sql_jobs'))
+    CREATE INDEX IX_sql_jobs_status ON sql_jobs(status, submitted_at DESC);
@@ -0,0 +1,37 @@
+-- Reviewer comments move from the mapping_single.comments JSON array to an append-only table,
+-- so adding one is a single insert and mapping loads no longer carry them.
+-- The Pod/Malcode annotations written by file uploads stay in mapping_single.comments.
+IF OBJECT_ID('mapping_row_comments', 'U') IS NULL
+    CREATE TABLE mapping_row_comments (
+        id BIGINT IDENTITY(1,1) NOT NULL,
+        mapping_row_id UNIQUEIDENTIFIER NOT NULL,
+        comment NVARCHAR(MAX) NOT NULL,
+        author NVARCHAR(255) NULL,
+        created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_mapping_row_comments PRIMARY KEY NONCLUSTERED (id),
+        -- Comments go with their row when a mapping file is replaced
+        CONSTRAINT FK_mapping_row_comments_row FOREIGN KEY (mapping_row_id)
+            REFERENCES mapping_single(id) ON DELETE CASCADE
+    );
+
+-- Clustered by row, so a row's comments are stored together and paged with one range seek
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_row_comments_row' AND object_id = OBJECT_ID('mapping_row_comments'))
+    CREATE CLUSTERED INDEX IX_mapping_row_comments_row ON mapping_row_comments(mapping_row_id, id);
+
+INSERT INTO mapping_row_comments (mapping_row_id, comment, created_at)
+SELECT m.id, j.value, COALESCE(m.updated_at, m.created_at, GETDATE())
+FROM mapping_single m
+CROSS APPLY OPENJSON(m.comments) j
+WHERE ISJSON(m.comments) = 1
+  AND j.value NOT LIKE 'Pod: %'
+  AND j.value NOT LIKE 'Malcode: %'
+ORDER BY m.id, CAST(j.[key] AS INT);
+
+UPDATE mapping_single
+SET comments = (
+    SELECT '[' + STRING_AGG(CAST('"' + STRING_ESCAPE(j.value, 'json') + '"' AS NVARCHAR(MAX)), ',')
+                 WITHIN GROUP (ORDER BY CAST(j.[key] AS INT)) + ']'
+    FROM OPENJSON(mapping_single.comments) j
+    WHERE j.value LIKE 'Pod: %' OR j.value LIKE 'Malcode: %'
+)
+WHERE ISJSON(comments) = 1 AND comments <> '[]';
@@ -0,0 +1,24 @@
+-- migrate:no-transaction
+-- migrate:lock-timeout 10000
+
+-- Optimistic concurrency for mapping rows and files
+-- row_version changes on every insert and update, so a conditional write can check that the row it
+-- read is unchanged (WHERE row_version = @read_version) and fail with a conflict otherwise.
+-- A mapping file's version is its active row count plus the highest row_version among them.
+-- Adding the column fills in every existing row, so run it outside peak hours on large tables.
+
+IF COL_LENGTH('mapping_single', 'row_version') IS NULL
+    ALTER TABLE mapping_single ADD row_version ROWVERSION NOT NULL;
+
+-- Cover row_version so file versions are aggregated from the filtered index alone
+IF NOT EXISTS (
+    SELECT * FROM sys.index_columns ic
+    JOIN sys.indexes i ON i.object_id = ic.object_id AND i.index_id = ic.index_id
+    WHERE i.name = 'IX_mapping_single_active_file' AND i.object_id = OBJECT_ID('mapping_single')
+      AND COL_NAME(ic.object_id, ic.column_id) = 'row_version'
+)
+    CREATE INDEX IX_mapping_single_active_file ON mapping_single(mapping_file_name)
+        INCLUDE (mapping_file_description, source_system, target_system, mapping_status, created_by, created_at,
+                 updated_at, row_version)
+        WHERE is_active = 1
+        WITH (DROP_EXISTING = ON, ONLINE = ON);
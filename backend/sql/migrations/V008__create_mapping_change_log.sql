@@ -0,0 +1,17 @@
+-- Append-only log of changes to mapping files, row statuses and comments, read by GET /api/changes
+-- seq is a ROWVERSION: readers only return entries below MIN_ACTIVE_ROWVERSION(), which are all committed,
+-- so a client that resumes from the last seq it saw never skips a change that committed late.
+IF OBJECT_ID('mapping_change_log', 'U') IS NULL
+    CREATE TABLE mapping_change_log (
+        seq ROWVERSION NOT NULL,
+        change_type NVARCHAR(50) NOT NULL,
+        mapping_file_name NVARCHAR(255) NULL,
+        mapping_row_id UNIQUEIDENTIFIER NULL, -- no foreign key: entries outlive rows replaced by a save
+        payload NVARCHAR(MAX) NULL, -- JSON object
+        created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_mapping_change_log PRIMARY KEY CLUSTERED (seq)
+    );
+
+-- Pruning deletes by age
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_change_log_created_at' AND object_id = OBJECT_ID('mapping_change_log'))
+    CREATE INDEX IX_mapping_change_log_created_at ON mapping_change_log(created_at);
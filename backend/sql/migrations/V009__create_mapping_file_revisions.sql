@@ -0,0 +1,40 @@
+-- Immutable revisions of each mapping file, recorded by every save, upload and rollback.
+-- A revision's rows are not copied: each distinct row content is stored once, with the revision that added it
+-- and the one that removed it, so history grows with the size of changes. Revision n of a file is every row
+-- with added_in <= n and removed_in NULL or > n; a diff only reads rows added or removed between the two.
+IF OBJECT_ID('mapping_file_revisions', 'U') IS NULL
+    CREATE TABLE mapping_file_revisions (
+        mapping_file_name NVARCHAR(255) NOT NULL,
+        revision INT NOT NULL,
+        description NVARCHAR(MAX) NULL,
+        source_system NVARCHAR(255) NULL,
+        target_system NVARCHAR(255) NULL,
+        row_count INT NOT NULL,
+        rows_added INT NOT NULL,
+        rows_removed INT NOT NULL,
+        source NVARCHAR(50) NOT NULL, -- save, upload or rollback
+        restored_from INT NULL, -- the revision a rollback restored
+        created_by NVARCHAR(255) NULL,
+        created_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_mapping_file_revisions PRIMARY KEY CLUSTERED (mapping_file_name, revision)
+    );
+
+IF OBJECT_ID('mapping_file_revision_rows', 'U') IS NULL
+    CREATE TABLE mapping_file_revision_rows (
+        id BIGINT IDENTITY(1,1) NOT NULL,
+        mapping_file_name NVARCHAR(255) NOT NULL,
+        row_key VARCHAR(50) NOT NULL, -- SHA-1 of row_data, then ':' and which of the identical rows it is
+        added_in INT NOT NULL,
+        removed_in INT NULL,
+        row_data NVARCHAR(MAX) NOT NULL, -- JSON array of the mapping_single row values
+        CONSTRAINT PK_mapping_file_revision_rows PRIMARY KEY NONCLUSTERED (id)
+    );
+
+-- Clustered by file and the revision that added the row, so a revision's rows are read with one range seek
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_file_revision_rows_added' AND object_id = OBJECT_ID('mapping_file_revision_rows'))
+    CREATE CLUSTERED INDEX IX_mapping_file_revision_rows_added ON mapping_file_revision_rows(mapping_file_name, added_in, id);
+
+-- Rows removed between two revisions for diffs; removed_in IS NULL finds the latest revision's rows
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_file_revision_rows_removed' AND object_id = OBJECT_ID('mapping_file_revision_rows'))
+    CREATE INDEX IX_mapping_file_revision_rows_removed ON mapping_file_revision_rows(mapping_file_name, removed_in)
+        INCLUDE (row_key, added_in);
@@ -0,0 +1,60 @@
+-- Archive for soft-deleted mapping rows
+-- Rows inactive for longer than MAPPING_ARCHIVE_AFTER_DAYS are moved here in small batches, with their reviewer
+-- comments, so mapping_single and its indexes only hold rows that are live or recently deactivated. Archived
+-- rows keep their ids and can be restored, which records a mapping_file_revisions revision with source 'restore'.
+
+IF OBJECT_ID('mapping_single_archive', 'U') IS NULL
+    CREATE TABLE mapping_single_archive (
+        archive_id BIGINT IDENTITY(1,1) NOT NULL,
+        id UNIQUEIDENTIFIER NOT NULL,
+        mapping_file_name NVARCHAR(255),
+        mapping_file_description NVARCHAR(MAX),
+        source_system NVARCHAR(255),
+        target_system NVARCHAR(255),
+        mapping_status NVARCHAR(50),
+        source_malcode NVARCHAR(255) NOT NULL,
+        source_malcode_description NVARCHAR(MAX),
+        source_table_name NVARCHAR(255) NOT NULL,
+        source_table_description NVARCHAR(MAX),
+        source_column_name NVARCHAR(255) NOT NULL,
+        source_column_description NVARCHAR(MAX),
+        source_data_type NVARCHAR(100),
+        source_is_primary_key BIT,
+        source_is_nullable BIT,
+        source_default_value NVARCHAR(MAX),
+        source_type NVARCHAR(50),
+        target_malcode NVARCHAR(255) NOT NULL,
+        target_malcode_description NVARCHAR(MAX),
+        target_table_name NVARCHAR(255) NOT NULL,
+        target_table_description NVARCHAR(MAX),
+        target_column_name NVARCHAR(255) NOT NULL,
+        target_column_description NVARCHAR(MAX),
+        target_data_type NVARCHAR(100),
+        target_is_primary_key BIT,
+        target_is_nullable BIT,
+        target_default_value NVARCHAR(MAX),
+        target_type NVARCHAR(50),
+        transformation NVARCHAR(MAX),
+        join_clause NVARCHAR(MAX),
+        created_by NVARCHAR(255) NOT NULL,
+        created_at DATETIME2,
+        updated_at DATETIME2,
+        reviewer NVARCHAR(255),
+        reviewed_at DATETIME2,
+        comments NVARCHAR(MAX),
+        archived_comments NVARCHAR(MAX), -- JSON array of the row's mapping_row_comments, oldest first
+        archived_at DATETIME2 NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_mapping_single_archive PRIMARY KEY CLUSTERED (archive_id)
+    );
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'UQ_mapping_single_archive_id' AND object_id = OBJECT_ID('mapping_single_archive'))
+    CREATE UNIQUE INDEX UQ_mapping_single_archive_id ON mapping_single_archive(id);
+
+-- Listing and restoring a file's archived rows, newest first
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_archive_file' AND object_id = OBJECT_ID('mapping_single_archive'))
+    CREATE INDEX IX_mapping_single_archive_file ON mapping_single_archive(mapping_file_name, archive_id);
+
+-- Only inactive rows, so the archiver finds the next batch without reading live ones
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_mapping_single_inactive' AND object_id = OBJECT_ID('mapping_single'))
+    CREATE INDEX IX_mapping_single_inactive ON mapping_single(updated_at) INCLUDE (mapping_file_name)
+        WHERE is_active = 0;
@@ -0,0 +1,261 @@
+-- SQLite schema for the embedded storage backend (DATABASE_BACKEND=sqlite)
+-- Mirrors mapping_single, mapping_single_archive, mapping_row_comments, mapping_change_log, mapping_file_revisions,
+-- metadata_single and sql_jobs as created by sql/migrations for SQL Server.
+-- Applied automatically when the backend opens its database, so every statement is idempotent.
+
+-- UUIDv4 text ids, matching the UNIQUEIDENTIFIER ids the SQL Server backend returns
+-- Timestamps are stored as ISO 8601 text and declared TIMESTAMP so they are read back as datetimes
+
+CREATE TABLE IF NOT EXISTS mapping_single (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' ||
+        substr(hex(randomblob(2)), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) ||
+        substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))),
+    
+    -- Mapping file information
+    mapping_file_name TEXT,
+    mapping_file_description TEXT,
+    source_system TEXT,
+    target_system TEXT,
+    mapping_status TEXT DEFAULT 'draft',
+    
+    -- Source column information
+    source_malcode TEXT NOT NULL,
+    source_malcode_description TEXT,
+    source_table_name TEXT NOT NULL,
+    source_table_description TEXT,
+    source_column_name TEXT NOT NULL,
+    source_column_description TEXT,
+    source_data_type TEXT DEFAULT 'string',
+    source_is_primary_key INTEGER DEFAULT 0,
+    source_is_nullable INTEGER DEFAULT 1,
+    source_default_value TEXT,
+    source_type TEXT DEFAULT 'SRZ_ADLS',
+    
+    -- Target column information
+    target_malcode TEXT NOT NULL,
+    target_malcode_description TEXT,
+    target_table_name TEXT NOT NULL,
+    target_table_description TEXT,
+    target_column_name TEXT NOT NULL,
+    target_column_description TEXT,
+    target_data_type TEXT DEFAULT 'string',
+    target_is_primary_key INTEGER DEFAULT 0,
+    target_is_nullable INTEGER DEFAULT 1,
+    target_default_value TEXT,
+    target_type TEXT DEFAULT 'CZ_ADLS',
+    
+    -- Mapping transformation information
+    transformation TEXT,
+    join_clause TEXT,
+    
+    -- Audit and review information
+    created_by TEXT NOT NULL DEFAULT 'system',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    reviewer TEXT,
+    reviewed_at TIMESTAMP,
+    comments TEXT, -- JSON array stored as string
+    is_active INTEGER DEFAULT 1,
+    -- Stands in for SQL Server's ROWVERSION; writes take new values from mapping_row_version
+    row_version INTEGER NOT NULL DEFAULT 0,
+    
+    CONSTRAINT CHK_mapping_single_status CHECK (mapping_status IN ('draft', 'pending', 'approved', 'rejected')),
+    CONSTRAINT CHK_mapping_single_source_type CHECK (source_type IN ('SRZ_ADLS')),
+    CONSTRAINT CHK_mapping_single_target_type CHECK (target_type IN ('CZ_ADLS', 'SYNAPSE_TABLE'))
+);
+
+CREATE INDEX IF NOT EXISTS IX_mapping_single_mapping_file ON mapping_single(mapping_file_name);
+CREATE INDEX IF NOT EXISTS IX_mapping_single_active_file ON mapping_single(mapping_file_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS IX_mapping_single_active_source_column
+    ON mapping_single(source_malcode, source_table_name, source_column_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS IX_mapping_single_active_target_column
+    ON mapping_single(target_malcode, target_table_name, target_column_name) WHERE is_active = 1;
+CREATE INDEX IF NOT EXISTS IX_mapping_single_status ON mapping_single(mapping_status);
+CREATE INDEX IF NOT EXISTS IX_mapping_single_created_by ON mapping_single(created_by);
+CREATE INDEX IF NOT EXISTS IX_mapping_single_inactive ON mapping_single(updated_at) WHERE is_active = 0;
+
+-- Database-wide row version counter, like SQL Server's @@DBTS: it only grows, even when rows are deleted
+CREATE TABLE IF NOT EXISTS mapping_row_version (value INTEGER NOT NULL);
+INSERT INTO mapping_row_version (value)
+SELECT COALESCE(MAX(row_version), 0) FROM mapping_single WHERE NOT EXISTS (SELECT 1 FROM mapping_row_version);
+
+-- Writes normally assign row_version themselves; these give any that don't a new one, as ROWVERSION does
+CREATE TRIGGER IF NOT EXISTS TR_mapping_single_insert_row_version AFTER INSERT ON mapping_single
+FOR EACH ROW WHEN NEW.row_version = 0
+BEGIN
+    UPDATE mapping_row_version SET value = value + 1;
+    UPDATE mapping_single SET row_version = (SELECT value FROM mapping_row_version) WHERE rowid = NEW.rowid;
+END;
+CREATE TRIGGER IF NOT EXISTS TR_mapping_single_update_row_version AFTER UPDATE ON mapping_single
+FOR EACH ROW WHEN NEW.row_version = OLD.row_version
+BEGIN
+    UPDATE mapping_row_version SET value = value + 1;
+    UPDATE mapping_single SET row_version = (SELECT value FROM mapping_row_version) WHERE rowid = NEW.rowid;
+END;
+
+-- Soft-deleted mapping rows moved out of mapping_single, with their comments; archive_id keeps archive order
+CREATE TABLE IF NOT EXISTS mapping_single_archive (
+    archive_id INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    mapping_file_name TEXT,
+    mapping_file_description TEXT,
+    source_system TEXT,
+    target_system TEXT,
+    mapping_status TEXT,
+    source_malcode TEXT NOT NULL,
+    source_malcode_description TEXT,
+    source_table_name TEXT NOT NULL,
+    source_table_description TEXT,
+    source_column_name TEXT NOT NULL,
+    source_column_description TEXT,
+    source_data_type TEXT,
+    source_is_primary_key INTEGER,
+    source_is_nullable INTEGER,
+    source_default_value TEXT,
+    source_type TEXT,
+    target_malcode TEXT NOT NULL,
+    target_malcode_description TEXT,
+    target_table_name TEXT NOT NULL,
+    target_table_description TEXT,
+    target_column_name TEXT NOT NULL,
+    target_column_description TEXT,
+    target_data_type TEXT,
+    target_is_primary_key INTEGER,
+    target_is_nullable INTEGER,
+    target_default_value TEXT,
+    target_type TEXT,
+    transformation TEXT,
+    join_clause TEXT,
+    created_by TEXT NOT NULL,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    reviewer TEXT,
+    reviewed_at TIMESTAMP,
+    comments TEXT,
+    archived_comments TEXT, -- JSON array of the row's mapping_row_comments, oldest first
+    archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_mapping_single_archive_id ON mapping_single_archive(id);
+CREATE INDEX IF NOT EXISTS IX_mapping_single_archive_file ON mapping_single_archive(mapping_file_name, archive_id);
+
+-- Append-only reviewer comments; the rowid alias id keeps insertion order
+CREATE TABLE IF NOT EXISTS mapping_row_comments (
+    id INTEGER PRIMARY KEY,
+    mapping_row_id TEXT NOT NULL REFERENCES mapping_single(id) ON DELETE CASCADE,
+    comment TEXT NOT NULL,
+    author TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS IX_mapping_row_comments_row ON mapping_row_comments(mapping_row_id, id);
+
+-- Append-only change log; SQLite has one writer at a time, so AUTOINCREMENT seqs are in commit order
+-- and are never reused after pruning
+CREATE TABLE IF NOT EXISTS mapping_change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    change_type TEXT NOT NULL,
+    mapping_file_name TEXT,
+    mapping_row_id TEXT,
+    payload TEXT, -- JSON object
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS IX_mapping_change_log_created_at ON mapping_change_log(created_at);
+
+-- Mapping file revisions; each row content is stored once with the revision that added it and the one that
+-- removed it, so revision n is every row with added_in <= n and removed_in NULL or > n
+CREATE TABLE IF NOT EXISTS mapping_file_revisions (
+    mapping_file_name TEXT NOT NULL,
+    revision INTEGER NOT NULL,
+    description TEXT,
+    source_system TEXT,
+    target_system TEXT,
+    row_count INTEGER NOT NULL,
+    rows_added INTEGER NOT NULL,
+    rows_removed INTEGER NOT NULL,
+    source TEXT NOT NULL, -- save, upload, rollback or restore
+    restored_from INTEGER,
+    created_by TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (mapping_file_name, revision)
+);
+
+CREATE TABLE IF NOT EXISTS mapping_file_revision_rows (
+    id INTEGER PRIMARY KEY,
+    mapping_file_name TEXT NOT NULL,
+    row_key TEXT NOT NULL, -- SHA-1 of row_data, then ':' and which of the identical rows it is
+    added_in INTEGER NOT NULL,
+    removed_in INTEGER,
+    row_data TEXT NOT NULL -- JSON array of the mapping_single row values
+);
+CREATE INDEX IF NOT EXISTS IX_mapping_file_revision_rows_added ON mapping_file_revision_rows(mapping_file_name, added_in);
+CREATE INDEX IF NOT EXISTS IX_mapping_file_revision_rows_removed
+    ON mapping_file_revision_rows(mapping_file_name, removed_in);
+
+-- Each row is a malcode, a table or a column, distinguished by metadata_level
+CREATE TABLE IF NOT EXISTS metadata_single (
+    id TEXT PRIMARY KEY DEFAULT (lower(hex(randomblob(4)) || '-' || hex(randomblob(2)) || '-4' ||
+        substr(hex(randomblob(2)), 2) || '-' || substr('89ab', 1 + (abs(random()) % 4), 1) ||
+        substr(hex(randomblob(2)), 2) || '-' || hex(randomblob(6)))),
+    metadata_level TEXT NOT NULL DEFAULT 'column',
+    
+    -- Malcode information
+    malcode TEXT NOT NULL,
+    malcode_description TEXT,
+    
+    -- Table information (NULL on malcode rows)
+    table_name TEXT,
+    table_description TEXT,
+    
+    -- Column information (NULL on malcode and table rows)
+    column_name TEXT,
+    column_description TEXT,
+    data_type TEXT DEFAULT 'string',
+    is_primary_key INTEGER DEFAULT 0,
+    is_nullable INTEGER DEFAULT 1,
+    default_value TEXT,
+    
+    -- Audit information
+    created_by TEXT NOT NULL DEFAULT 'system',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    is_active INTEGER DEFAULT 1,
+    
+    CONSTRAINT CHK_metadata_single_level CHECK (
+        (metadata_level = 'malcode' AND table_name IS NULL AND column_name IS NULL)
+        OR (metadata_level = 'table' AND table_name IS NOT NULL AND column_name IS NULL)
+        OR (metadata_level = 'column' AND table_name IS NOT NULL AND column_name IS NOT NULL)
+    )
+);
+
+-- SQLite treats NULLs as distinct in unique indexes, so uniqueness is enforced per level.
+-- These are also the conflict targets of the backend's upserts.
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_metadata_single_malcodes ON metadata_single(malcode)
+    WHERE metadata_level = 'malcode';
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_metadata_single_tables ON metadata_single(malcode, table_name)
+    WHERE metadata_level = 'table';
+CREATE UNIQUE INDEX IF NOT EXISTS UQ_metadata_single_columns ON metadata_single(malcode, table_name, column_name)
+    WHERE metadata_level = 'column';
+CREATE INDEX IF NOT EXISTS IX_metadata_single_table ON metadata_single(table_name);
+CREATE INDEX IF NOT EXISTS IX_metadata_single_column ON metadata_single(column_name);
+
+CREATE TABLE IF NOT EXISTS sql_jobs (
+    id TEXT PRIMARY KEY,
+    job_type TEXT NOT NULL,
+    operation TEXT,
+    status TEXT NOT NULL,
+    sql_script TEXT NOT NULL,
+    statement_count INTEGER NOT NULL,
+    statements_completed INTEGER NOT NULL DEFAULT 0,
+    statement_timeout_seconds INTEGER,
+    transactional INTEGER NOT NULL DEFAULT 1,
+    submitted_by TEXT,
+    submitted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    error_message TEXT,
+    results TEXT,
+    CONSTRAINT CHK_sql_jobs_status CHECK (status IN ('queued', 'running', 'succeeded', 'failed', 'cancelled'))
+);
+
+CREATE INDEX IF NOT EXISTS IX_sql_jobs_submitted_at ON sql_jobs(submitted_at DESC);
+CREATE INDEX IF NOT EXISTS IX_sql_jobs_status ON sql_jobs(status, submitted_at DESC);
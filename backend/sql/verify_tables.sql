@@ -20,7 +20,27 @@ SELECT
 UNION ALL
 SELECT 
     'mapping_single' as table_name,
-    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_single') THEN 'EXISTS' ELSE 'MISSING' END as status;
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_single') THEN 'EXISTS' ELSE 'MISSING' END as status
+UNION ALL
+SELECT 
+    'mapping_row_comments' as table_name,
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_row_comments') THEN 'EXISTS' ELSE 'MISSING' END as status
+UNION ALL
+SELECT 
+    'mapping_change_log' as table_name,
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_change_log') THEN 'EXISTS' ELSE 'MISSING' END as status
+UNION ALL
+SELECT 
+    'mapping_file_revisions' as table_name,
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_file_revisions') THEN 'EXISTS' ELSE 'MISSING' END as status
+UNION ALL
+SELECT 
+    'mapping_file_revision_rows' as table_name,
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_file_revision_rows') THEN 'EXISTS' ELSE 'MISSING' END as status
+UNION ALL
+SELECT 
+    'mapping_single_archive' as table_name,
+    CASE WHEN EXISTS (SELECT * FROM sys.tables WHERE name = 'mapping_single_archive') THEN 'EXISTS' ELSE 'MISSING' END as status;
 
 -- Check table schemas for existing tables
 SELECT 
@@ -33,7 +53,7 @@ SELECT
 FROM sys.tables t
 INNER JOIN sys.columns c ON t.object_id = c.object_id
 INNER JOIN sys.types ty ON c.user_type_id = ty.user_type_id
-WHERE t.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single')
+WHERE t.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single', 'mapping_row_comments', 'mapping_change_log', 'mapping_file_revisions', 'mapping_file_revision_rows', 'mapping_single_archive')
 ORDER BY t.name, c.column_id;
 
 -- Check foreign key relationships
@@ -49,8 +69,8 @@ INNER JOIN sys.tables tr ON fk.referenced_object_id = tr.object_id
 INNER JOIN sys.foreign_key_columns fkc ON fk.object_id = fkc.constraint_object_id
 INNER JOIN sys.columns cp ON fkc.parent_object_id = cp.object_id AND fkc.parent_column_id = cp.column_id
 INNER JOIN sys.columns cr ON fkc.referenced_object_id = cr.object_id AND fkc.referenced_column_id = cr.column_id
-WHERE tp.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single')
-   OR tr.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single');
+WHERE tp.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single', 'mapping_row_comments', 'mapping_change_log', 'mapping_file_revisions', 'mapping_file_revision_rows', 'mapping_single_archive')
+   OR tr.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single', 'mapping_row_comments', 'mapping_change_log', 'mapping_file_revisions', 'mapping_file_revision_rows', 'mapping_single_archive');
 
 -- Check indexes
 SELECT 
@@ -60,7 +80,7 @@ SELECT
     i.is_unique
 FROM sys.indexes i
 INNER JOIN sys.tables t ON i.object_id = t.object_id
-WHERE t.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single')
+WHERE t.name IN ('mapping_files', 'mapping_columns', 'mapping_rows', 'metadata_single', 'mapping_single', 'mapping_row_comments', 'mapping_change_log', 'mapping_file_revisions', 'mapping_file_revision_rows', 'mapping_single_archive')
   AND i.name IS NOT NULL
 ORDER BY t.name, i.name;
 
@@ -1,45 +1,261 @@
 
+import re
+import time
+import sqlite3
 import logging
 
 logger = logging.getLogger(__name__)
 
-def execute_sql_script(conn, sql_script: str) -> list:
-    """Execute SQL script and return results"""
+# Maximum rows returned per result set, and rows pulled from the server per round trip
+DEFAULT_MAX_ROWS = 1000
+FETCH_BATCH_SIZE = 500
+
+_GO_PATTERN = re.compile(r'[ \t]*GO(?:[ \t]+(\d+))?[ \t]*(?:--[^\n]*)?(?:\r?\n|$)', re.IGNORECASE)
+_PRINT_PATTERN = re.compile(r"^PRINT\s+N?'((?:[^']|'')*)'\s*;?$", re.IGNORECASE | re.DOTALL)
+_ROUTINE_PATTERN = re.compile(
+    r'(?:CREATE\s+OR\s+ALTER|CREATE|ALTER)\s+(?:PROC|PROCEDURE|FUNCTION|TRIGGER|VIEW)\b', re.IGNORECASE
+)
+_MESSAGE_PREFIX_PATTERN = re.compile(r'^(?:\[[^\]]*\])+')
+# BEGIN variants that do not open a BEGIN ... END block
+_NON_BLOCK_BEGIN = {'TRAN', 'TRANSACTION', 'DISTRIBUTED', 'DIALOG', 'CONVERSATION'}
+
+def _skip_string(sql: str, i: int, quote: str, close: str = None) -> int:
+    """Return the index just past a quoted token starting at i, honouring doubled-quote escapes"""
+    close = close or quote
+    i += 1
+    while i < len(sql):
+        if sql[i] == close:
+            if i + 1 < len(sql) and sql[i + 1] == close:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    raise ValueError(f"Unterminated {quote} literal in SQL script")
+
+def _skip_block_comment(sql: str, i: int) -> int:
+    """Return the index just past a (possibly nested) /* ... */ comment starting at i"""
+    depth = 0
+    while i < len(sql):
+        if sql.startswith('/*', i):
+            depth += 1
+            i += 2
+        elif sql.startswith('*/', i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    raise ValueError("Unterminated block comment in SQL script")
+
+def _next_word(sql: str, i: int) -> str:
+    match = re.compile(r'\s*(\w+)').match(sql, i)
+    return match.group(1).upper() if match else ''
+
+def split_sql_batches(sql_script: str) -> list:
+    """Split a T-SQL script into the batches separated by its GO lines, as sqlcmd and SSMS do.
+    
+    Each batch is meant to be sent whole, so variables, batch-scoped temp tables and TRY ... CATCH blocks
+    spanning several statements work. GO inside string literals, quoted identifiers and comments does not
+    split; comment-only batches are dropped.
+    """
+    batches = []
+    start = 0
+    has_code = False
+    i = 0
+    n = len(sql_script)
+    
+    def flush(end: int):
+        nonlocal has_code
+        if has_code:
+            batches.append(sql_script[start:end].strip())
+        has_code = False
+    
+    while i < n:
+        # GO batch separators must be alone on their line
+        if i == 0 or sql_script[i - 1] == '\n':
+            go = _GO_PATTERN.match(sql_script, i)
+            if go:
+                if go.group(1) and int(go.group(1)) != 1:
+                    raise ValueError("GO with a repeat count is not supported")
+                flush(i)
+                i = start = go.end()
+                continue
+        
+        char = sql_script[i]
+        if sql_script.startswith('--', i):
+            newline = sql_script.find('\n', i)
+            i = n if newline == -1 else newline + 1
+        elif sql_script.startswith('/*', i):
+            i = _skip_block_comment(sql_script, i)
+        elif char in ("'", '"', '['):
+            has_code = True
+            i = _skip_string(sql_script, i, char, ']' if char == '[' else None)
+        else:
+            has_code = has_code or not char.isspace()
+            i += 1
+    
+    flush(n)
+    return batches
+
+def split_sql_statements(sql_script: str) -> list:
+    """Split a T-SQL script into individual statements.
+    
+    Only for the scripts under sql/, which are written to run a statement at a time (a migration may add a
+    column in one statement and use it in the next, which SQL Server cannot compile as one batch). Scripts
+    from users are split with split_sql_batches.
+    
+    Batches are separated by GO lines. Within a batch, statements end at semicolons that are not
+    inside string literals, quoted identifiers, comments or BEGIN ... END / CASE ... END blocks.
+    Procedure, function, trigger and view definitions run to the end of their batch.
+    Statements keep their terminating semicolon (MERGE requires it); comment-only chunks are dropped.
+    """
+    statements = []
+    start = 0
+    code_start = None  # index of the first non-comment token in the current statement
+    depth = 0
+    i = 0
+    n = len(sql_script)
+    
+    def flush(end: int):
+        nonlocal start, code_start, depth
+        if code_start is not None:
+            statements.append(sql_script[start:end].strip())
+        start = end
+        code_start = None
+    
+    while i < n:
+        # GO batch separators must be alone on their line
+        if i == 0 or sql_script[i - 1] == '\n':
+            go = _GO_PATTERN.match(sql_script, i)
+            if go:
+                if go.group(1) and int(go.group(1)) != 1:
+                    raise ValueError("GO with a repeat count is not supported")
+                flush(i)
+                depth = 0
+                i = start = go.end()
+                continue
+        
+        char = sql_script[i]
+        if sql_script.startswith('--', i):
+            newline = sql_script.find('\n', i)
+            i = n if newline == -1 else newline + 1
+        elif sql_script.startswith('/*', i):
+            i = _skip_block_comment(sql_script, i)
+        elif char in ("'", '"', '['):
+            if code_start is None:
+                code_start = i
+            i = _skip_string(sql_script, i, char, ']' if char == '[' else None)
+        elif char.isalpha() or char in ('_', '@', '#'):
+            match = re.compile(r'[\w@#$]+').match(sql_script, i)
+            word = match.group(0).upper()
+            if code_start is None:
+                code_start = i
+            if word == 'BEGIN' and _next_word(sql_script, match.end()) not in _NON_BLOCK_BEGIN:
+                depth += 1
+            elif word == 'CASE':
+                depth += 1
+            elif word == 'END' and _next_word(sql_script, match.end()) != 'CONVERSATION':
+                depth = max(depth - 1, 0)
+            i = match.end()
+        elif char == ';':
+            i += 1
+            if depth == 0 and (code_start is None or not _ROUTINE_PATTERN.match(sql_script, code_start)):
+                flush(i)
+        else:
+            if not char.isspace() and code_start is None:
+                code_start = i
+            i += 1
+    
+    flush(n)
+    return statements
+
+def _drain_messages(cursor, results: list, statement_index: int):
+    """Turn PRINT/RAISERROR informational messages on the cursor into print results"""
+    for _, message in getattr(cursor, 'messages', None) or []:
+        message = _MESSAGE_PREFIX_PATTERN.sub('', str(message)).strip()
+        if message:
+            logger.info(f"SQL PRINT: {message}")
+            results.append({"type": "print", "statement": statement_index, "message": message})
+
+def _collect_results(cursor, statement: str, statement_index: int, max_rows: int) -> list:
+    """Stream every result set produced by the last execute, walking a batch's statements with nextset, capping
+    rows per set"""
+    results = []
+    while True:
+        _drain_messages(cursor, results, statement_index)
+        if cursor.description:
+            columns = [column[0] for column in cursor.description]
+            rows = []
+            while len(rows) < max_rows:
+                batch = cursor.fetchmany(min(FETCH_BATCH_SIZE, max_rows - len(rows)))
+                if not batch:
+                    break
+                rows.extend(list(row) for row in batch)
+            truncated = len(rows) >= max_rows and cursor.fetchone() is not None
+            results.append({
+                "type": "select",
+                "statement": statement_index,
+                "columns": columns,
+                "rows": rows,
+                "row_count": len(rows),
+                "truncated": truncated
+            })
+        else:
+            results.append({
+                "type": "execute",
+                "statement": statement_index,
+                "message": f"Statement executed successfully: {statement[:50]}...",
+                "rows_affected": cursor.rowcount
+            })
+        if not cursor.nextset():
+            break
+    return results
+
+def _runs_single_statements(cursor) -> bool:
+    """Whether the cursor rejects multi-statement SQL; sqlite3 runs one statement per execute and has no nextset"""
+    return isinstance(getattr(cursor, '_cursor', cursor), sqlite3.Cursor)
+
+def execute_sql_statement(cursor, statement: str, index: int, max_rows: int = DEFAULT_MAX_ROWS) -> list:
+    """Execute one statement or batch of a split script in a single round trip and return the timed results of
+    everything it ran"""
+    print_match = _PRINT_PATTERN.match(statement)
+    if print_match:
+        # Handle literal PRINT statements without a round trip
+        print_msg = print_match.group(1).replace("''", "'")
+        logger.info(f"SQL PRINT: {print_msg}")
+        return [{"type": "print", "statement": index, "message": print_msg}]
+    
+    started = time.perf_counter()
+    if _runs_single_statements(cursor):
+        results = []
+        for part in split_sql_statements(statement):
+            cursor.execute(part)
+            results.extend(_collect_results(cursor, part, index, max_rows))
+    else:
+        cursor.execute(statement)
+        results = _collect_results(cursor, statement, index, max_rows)
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    for result in results:
+        result["duration_ms"] = duration_ms
+    return results
+
+def execute_sql_script(conn, sql_script: str, max_rows: int = DEFAULT_MAX_ROWS) -> list:
+    """Execute SQL script batch by batch and return results"""
+    return execute_sql_statements(conn, split_sql_batches(sql_script), max_rows)
+
+def execute_sql_statements(conn, statements: list, max_rows: int = DEFAULT_MAX_ROWS) -> list:
+    """Execute already split statements or batches in one transaction and return results"""
     cursor = conn.cursor()
     results = []
     
     try:
-        # Split script into individual statements
-        statements = [stmt.strip() for stmt in sql_script.split(';') if stmt.strip()]
-        
-        for statement in statements:
-            if statement.upper().startswith('PRINT'):
-                # Handle PRINT statements
-                print_msg = statement.replace('PRINT', '').strip().strip("'\"")
-                logger.info(f"SQL PRINT: {print_msg}")
-                results.append({"type": "print", "message": print_msg})
-            else:
-                # Execute other statements
-                cursor.execute(statement)
-                
-                # Try to fetch results if it's a SELECT statement
-                if statement.upper().strip().startswith('SELECT'):
-                    rows = cursor.fetchall()
-                    columns = [column[0] for column in cursor.description] if cursor.description else []
-                    results.append({
-                        "type": "select",
-                        "columns": columns,
-                        "rows": [list(row) for row in rows]
-                    })
-                else:
-                    results.append({
-                        "type": "execute",
-                        "message": f"Statement executed successfully: {statement[:50]}..."
-                    })
+        for index, statement in enumerate(statements, start=1):
+            results.extend(execute_sql_statement(cursor, statement, index, max_rows))
         
         conn.commit()
         return results
-        
+    
     except Exception as e:
         conn.rollback()
         logger.error(f"Error executing SQL script: {str(e)}")
@@ -1,45 +1,108 @@
 
 import os
+import hashlib
 import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, NamedTuple
+
+from sql_executor import split_sql_statements
 
 logger = logging.getLogger(__name__)
 
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SQL_DIR = os.path.join(SCRIPT_DIR, "sql")
+
+class SqlScript(NamedTuple):
+    name: str
+    path: str
+    content: str
+    checksum: str
+    statements: List[str]
+    size: int
+    mtime_ns: int
+
+# Parsed scripts keyed by absolute path; an entry is reused while the file's mtime and size are unchanged
+_script_cache: Dict[str, SqlScript] = {}
+_script_cache_lock = threading.Lock()
+
+def _resolve_path(file_path: str) -> str:
+    return file_path if os.path.isabs(file_path) else os.path.join(SCRIPT_DIR, file_path)
+
 def read_sql_file(file_path: str) -> str:
     """Read SQL content from file with robust path resolution"""
     try:
-        # Get the directory where this script is located
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        
-        # If file_path is already absolute, use it as is
-        if os.path.isabs(file_path):
-            full_path = file_path
-        else:
-            # Build path relative to the script directory
-            full_path = os.path.join(script_dir, file_path)
-        
-        logger.info(f"Script directory: {script_dir}")
-        logger.info(f"Attempting to read SQL file: {full_path}")
-        logger.info(f"File exists: {os.path.exists(full_path)}")
+        full_path = _resolve_path(file_path)
+        logger.debug(f"Reading SQL file: {full_path}")
         
         if not os.path.exists(full_path):
             # Log directory contents for debugging
-            sql_dir = os.path.join(script_dir, "sql")
-            if os.path.exists(sql_dir):
-                sql_files = [f for f in os.listdir(sql_dir) if f.endswith('.sql')]
-                logger.info(f"Available SQL files in {sql_dir}: {sql_files}")
+            if os.path.exists(SQL_DIR):
+                sql_files = [f for f in os.listdir(SQL_DIR) if f.endswith('.sql')]
+                logger.info(f"Available SQL files in {SQL_DIR}: {sql_files}")
             else:
-                logger.warning(f"SQL directory does not exist: {sql_dir}")
+                logger.warning(f"SQL directory does not exist: {SQL_DIR}")
             
             raise FileNotFoundError(f"SQL file not found: {full_path}")
         
         with open(full_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-            logger.info(f"Successfully read {len(content)} characters from {full_path}")
-            return content
-            
+            return file.read()
+    
     except FileNotFoundError as e:
         logger.error(f"SQL file not found: {str(e)}")
         raise
     except Exception as e:
         logger.error(f"Error reading SQL file {file_path}: {str(e)}")
         raise Exception(f"Error reading SQL file {file_path}: {str(e)}")
+
+def get_sql_script(file_path: str) -> SqlScript:
+    """Get a SQL file with its statements already split, re-reading it only when it changes on disk"""
+    full_path = _resolve_path(file_path)
+    try:
+        stat = os.stat(full_path)
+    except FileNotFoundError:
+        # Let read_sql_file log what is available and raise
+        read_sql_file(full_path)
+        raise
+    
+    cached = _script_cache.get(full_path)
+    if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+        return cached
+    
+    content = read_sql_file(full_path)
+    script = SqlScript(
+        name=os.path.relpath(full_path, SQL_DIR).replace(os.sep, '/'),
+        path=full_path,
+        content=content,
+        checksum=hashlib.sha256(content.encode('utf-8')).hexdigest(),
+        statements=split_sql_statements(content),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns
+    )
+    with _script_cache_lock:
+        _script_cache[full_path] = script
+    logger.info(f"Loaded SQL script {script.name} ({len(script.statements)} statements)")
+    return script
+
+def list_sql_scripts() -> List[Dict[str, Any]]:
+    """List the scripts under sql/, including migrations, with their checksums and statement counts"""
+    scripts = []
+    for root, _, filenames in os.walk(SQL_DIR):
+        for filename in sorted(filenames):
+            if not filename.endswith('.sql'):
+                continue
+            try:
+                script = get_sql_script(os.path.join(root, filename))
+            except ValueError as e:
+                # A script the splitter rejects is still listed so the problem is visible
+                scripts.append({'name': os.path.relpath(os.path.join(root, filename), SQL_DIR).replace(os.sep, '/'),
+                                'error': str(e)})
+                continue
+            scripts.append({
+                'name': script.name,
+                'checksum': script.checksum,
+                'statement_count': len(script.statements),
+                'size': script.size,
+                'modified_at': datetime.fromtimestamp(script.mtime_ns / 1e9).isoformat()
+            })
+    return sorted(scripts, key=lambda s: s['name'])
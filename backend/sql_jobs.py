@@ -0,0 +1,334 @@
+
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import SQL_JOB_WORKERS, SQL_JOB_DEFAULT_TIMEOUT_SECONDS
+from database import (get_db_connection, insert_sql_job, update_sql_job, get_sql_job, list_sql_jobs,
+                      set_statement_timeout, set_autocommit, is_statement_timeout)
+from sql_file_manager import get_sql_script
+from sql_executor import split_sql_batches, execute_sql_statement, DEFAULT_MAX_ROWS
+
+logger = logging.getLogger(__name__)
+
+# DDL operations that can be submitted as jobs, and the script each one runs
+DDL_JOB_SCRIPTS = {
+    'create-tables': 'create_tables.sql',
+    'create-metadata-tables': 'create_metadata_tables.sql',
+    'create-single-mapping-table': 'create_single_mapping_table.sql',
+    'create-single-metadata-table': 'create_single_metadata_table.sql',
+    'drop-tables': 'drop_tables.sql',
+    'verify-tables': 'verify_tables.sql'
+}
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+# Finished jobs kept in memory for polling and streaming; older ones are served from sql_jobs
+MAX_RETAINED_JOBS = 200
+# Minimum seconds between progress writes to sql_jobs while a job is running
+PROGRESS_PERSIST_INTERVAL = 2.0
+
+class JobNotCancellableError(Exception):
+    """Raised when a job has already finished or is running in another process"""
+
+class SqlJob:
+    """State of a job submitted to this process"""
+    
+    def __init__(self, job_type: str, operation: Optional[str], sql_script: str, statements: List[str],
+                 statement_timeout_seconds: Optional[int], transactional: bool, max_rows: int,
+                 submitted_by: Optional[str]):
+        self.id = str(uuid.uuid4())
+        self.job_type = job_type
+        self.operation = operation
+        self.sql_script = sql_script
+        self.statements = statements
+        self.statement_timeout_seconds = statement_timeout_seconds
+        self.transactional = transactional
+        self.max_rows = max_rows
+        self.submitted_by = submitted_by
+        self.status = 'queued'
+        self.statements_completed = 0
+        self.current_statement = None
+        self.submitted_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self.results = []
+        self.events = []
+        self.cancel_requested = threading.Event()
+        self.cursor = None
+        self.future = None
+        self.lock = threading.Lock()
+        self.last_persisted = 0.0
+    
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+    
+    def add_event(self, event: str, data: Dict[str, Any]):
+        """Append a progress event; event ids are 1-based positions so clients can resume"""
+        with self.lock:
+            self.events.append({'id': len(self.events) + 1, 'event': event, 'data': data})
+    
+    def events_after(self, event_id: int) -> List[Dict[str, Any]]:
+        with self.lock:
+            return self.events[event_id:]
+    
+    def to_dict(self, include_results: bool = False) -> Dict[str, Any]:
+        job = {
+            'id': self.id,
+            'job_type': self.job_type,
+            'operation': self.operation,
+            'status': self.status,
+            'statement_count': len(self.statements),
+            'statements_completed': self.statements_completed,
+            'current_statement': self.current_statement,
+            'statement_timeout_seconds': self.statement_timeout_seconds,
+            'transactional': self.transactional,
+            'submitted_by': self.submitted_by,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'error': self.error
+        }
+        if include_results:
+            job['results'] = list(self.results)
+        return job
+
+_jobs: 'OrderedDict[str, SqlJob]' = OrderedDict()
+_jobs_lock = threading.Lock()
+_executor = None
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _jobs_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SQL_JOB_WORKERS, thread_name_prefix='sql-job')
+        return _executor
+
+def _preview(statement: str) -> str:
+    return ' '.join(statement.split())[:80]
+
+def _persist(job: SqlJob, results: Optional[List[Dict[str, Any]]] = None, force: bool = True):
+    """Write the job's state to sql_jobs; history failures never fail the job itself"""
+    if not force and time.monotonic() - job.last_persisted < PROGRESS_PERSIST_INTERVAL:
+        return
+    job.last_persisted = time.monotonic()
+    try:
+        with get_db_connection() as conn:
+            update_sql_job(conn, job.to_dict(), results)
+    except Exception as e:
+        logger.warning(f"Could not persist progress of job {job.id}: {getattr(e, 'detail', str(e))}")
+
+def _describe_error(job: SqlJob, index: int, error: Exception) -> str:
+    if is_statement_timeout(error):
+        return f"Statement {index} exceeded the {job.statement_timeout_seconds}s statement timeout"
+    return f"Statement {index} failed: {str(error)}"
+
+def _execute_job(conn, job: SqlJob) -> Tuple[str, Optional[str]]:
+    """Run the job's statements one at a time, returning its final status and error"""
+    if job.statement_timeout_seconds:
+        set_statement_timeout(conn, job.statement_timeout_seconds)
+    if not job.transactional:
+        set_autocommit(conn)
+    cursor = conn.cursor()
+    with job.lock:
+        job.cursor = cursor
+    
+    try:
+        for index, statement in enumerate(job.statements, start=1):
+            if job.cancel_requested.is_set():
+                break
+            
+            job.current_statement = {'statement': index, 'preview': _preview(statement)}
+            try:
+                results = execute_sql_statement(cursor, statement, index, job.max_rows)
+            except Exception as e:
+                if job.cancel_requested.is_set():
+                    break
+                if job.transactional:
+                    conn.rollback()
+                return 'failed', _describe_error(job, index, e)
+            
+            job.results.extend(results)
+            job.statements_completed = index
+            job.add_event('statement', {
+                'statement': index,
+                'statement_count': len(job.statements),
+                'preview': _preview(statement),
+                'duration_ms': results[-1].get('duration_ms') if results else None,
+                'results': results
+            })
+            _persist(job, force=False)
+        
+        if job.cancel_requested.is_set():
+            if job.transactional:
+                conn.rollback()
+                return 'cancelled', f"Cancelled at statement {job.statements_completed + 1}; all changes rolled back"
+            return 'cancelled', f"Cancelled after {job.statements_completed} of {len(job.statements)} statements"
+        
+        if job.transactional:
+            conn.commit()
+        return 'succeeded', None
+    finally:
+        with job.lock:
+            job.cursor = None
+        job.current_statement = None
+        cursor.close()
+
+def _finish(job: SqlJob, status: str, error: Optional[str] = None):
+    job.error = error
+    job.finished_at = datetime.now()
+    # The final event must be visible before the job reads as finished to event streams
+    job.add_event('status', {'status': status, 'error': error})
+    job.status = status
+    _persist(job, job.results)
+    
+    if status == 'failed':
+        logger.error(f"SQL job {job.id} failed: {error}")
+    else:
+        logger.info(f"SQL job {job.id} {status} ({job.statements_completed}/{len(job.statements)} statements)")
+    
+    # Drop the oldest finished jobs from memory; their history stays in sql_jobs
+    with _jobs_lock:
+        finished = [job_id for job_id, j in _jobs.items() if j.finished]
+        for job_id in finished[:max(len(_jobs) - MAX_RETAINED_JOBS, 0)]:
+            del _jobs[job_id]
+
+def _run_job(job: SqlJob):
+    if job.cancel_requested.is_set():
+        _finish(job, 'cancelled', "Cancelled before it started")
+        return
+    
+    job.status = 'running'
+    job.started_at = datetime.now()
+    job.add_event('status', {'status': 'running'})
+    _persist(job)
+    logger.info(f"Running SQL job {job.id} ({len(job.statements)} statements)")
+    
+    try:
+        with get_db_connection() as conn:
+            status, error = _execute_job(conn, job)
+    except Exception as e:
+        status, error = 'failed', getattr(e, 'detail', str(e))
+    _finish(job, status, error)
+
+def submit_sql_job(sql_script: str, job_type: str = 'sql', operation: Optional[str] = None,
+                   statement_timeout_seconds: Optional[int] = None, transactional: bool = True,
+                   max_rows: int = DEFAULT_MAX_ROWS, submitted_by: Optional[str] = None,
+                   statements: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Queue a SQL script to run on a background worker and return the new job.
+    
+    The script runs batch by batch (split on GO) unless statements gives it already split.
+    """
+    if statements is None:
+        statements = split_sql_batches(sql_script)
+    if not statements:
+        raise ValueError("SQL script contains no statements")
+    
+    job = SqlJob(job_type, operation, sql_script, statements,
+                 statement_timeout_seconds or SQL_JOB_DEFAULT_TIMEOUT_SECONDS or None,
+                 transactional, max_rows, submitted_by)
+    try:
+        with get_db_connection() as conn:
+            insert_sql_job(conn, job.to_dict(), sql_script)
+    except Exception as e:
+        logger.warning(f"Could not record job {job.id} in sql_jobs: {getattr(e, 'detail', str(e))}")
+    
+    with _jobs_lock:
+        _jobs[job.id] = job
+    job.add_event('status', {'status': 'queued'})
+    job.future = _get_executor().submit(_run_job, job)
+    
+    logger.info(f"Submitted {job_type} job {job.id} ({len(statements)} statements)")
+    return job.to_dict()
+
+def submit_ddl_job(operation: str, **options) -> Dict[str, Any]:
+    """Queue one of the DDL scripts in DDL_JOB_SCRIPTS as a background job"""
+    if operation not in DDL_JOB_SCRIPTS:
+        raise KeyError(operation)
+    script = get_sql_script(os.path.join("sql", DDL_JOB_SCRIPTS[operation]))
+    return submit_sql_job(script.content, job_type='ddl', operation=operation, statements=script.statements,
+                          **options)
+
+def get_local_job(job_id: str) -> Optional[SqlJob]:
+    """Get a job submitted to this process, if it is still held in memory"""
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+def get_job(job_id: str, include_results: bool = False) -> Optional[Dict[str, Any]]:
+    """Get a job's status and progress from memory, falling back to the job history"""
+    job = get_local_job(job_id)
+    if job is not None:
+        return job.to_dict(include_results)
+    with get_db_connection() as conn:
+        return get_sql_job(conn, job_id, include_results)
+
+def list_jobs(status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """List recent jobs, newest first, with live progress for jobs running in this process"""
+    with _jobs_lock:
+        local = {job_id: job.to_dict() for job_id, job in _jobs.items()}
+    
+    try:
+        with get_db_connection() as conn:
+            jobs = {job['id']: job for job in list_sql_jobs(conn, status, limit)}
+    except Exception as e:
+        logger.warning(f"Could not read job history: {getattr(e, 'detail', str(e))}")
+        jobs = {}
+    
+    # In-memory state is more current than the (throttled) persisted progress
+    for job_id, job in local.items():
+        if status is None or job['status'] == status:
+            jobs[job_id] = job
+    
+    return sorted(jobs.values(), key=lambda j: j['submitted_at'], reverse=True)[:limit]
+
+def cancel_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Request cancellation of a queued or running job.
+    
+    Queued jobs never start. A running job has its current statement cancelled on the server and,
+    if it runs in a transaction, everything it did is rolled back.
+    """
+    job = get_local_job(job_id)
+    if job is None:
+        if get_job(job_id) is None:
+            return None
+        raise JobNotCancellableError("Job is not running in this process")
+    if job.finished:
+        raise JobNotCancellableError(f"Job has already {job.status}")
+    
+    job.cancel_requested.set()
+    if job.future is not None and job.future.cancel():
+        _finish(job, 'cancelled', "Cancelled before it started")
+        return job.to_dict()
+    
+    with job.lock:
+        cursor = job.cursor
+    if cursor is not None:
+        try:
+            cursor.cancel()
+        except Exception as e:
+            logger.warning(f"Could not cancel running statement of job {job.id}: {str(e)}")
+    
+    job.add_event('status', {'status': 'cancelling'})
+    logger.info(f"Cancellation requested for SQL job {job.id}")
+    return job.to_dict()
+
+def shutdown_jobs():
+    """Cancel outstanding jobs so they are recorded as cancelled rather than left running"""
+    with _jobs_lock:
+        outstanding = [job for job in _jobs.values() if not job.finished]
+    for job in outstanding:
+        try:
+            cancel_job(job.id)
+        except JobNotCancellableError:
+            pass
+    if _executor is not None:
+        _executor.shutdown(wait=True)
@@ -16,17 +16,7 @@ export const useAzureSqlCommentManager = (
       const backendService = createAzureSqlBackendService();
       await backendService.addMappingRowComment(rowId, comment);
       
-      // Update local state
-      const updatedRows = mappingFile.rows.map(row => {
-        if (row.id === rowId) {
-          const comments = row.comments ? [...row.comments, comment] : [comment];
-          return { ...row, comments };
-        }
-        return row;
-      });
-      
-      setMappingFile({ ...mappingFile, rows: updatedRows });
-      
+      // Comments are loaded per selected row, so only the open row needs updating
       if (selectedRow && selectedRow.id === rowId) {
         const comments = selectedRow.comments ? [...selectedRow.comments, comment] : [comment];
         setSelectedRow({ ...selectedRow, comments });
@@ -46,7 +36,13 @@ export const useAzureSqlCommentManager = (
     }
   };
 
+  const loadRowComments = async (rowId: string): Promise<string[]> => {
+    const backendService = createAzureSqlBackendService();
+    return backendService.getMappingRowComments(rowId);
+  };
+
   return {
-    handleCommentAdd
+    handleCommentAdd,
+    loadRowComments
   };
 };
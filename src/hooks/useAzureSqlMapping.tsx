@@ -22,7 +22,7 @@ export const useAzureSqlMapping = () => {
     setSelectedRow
   );
   
-  const { handleCommentAdd } = useAzureSqlCommentManager(
+  const { handleCommentAdd, loadRowComments } = useAzureSqlCommentManager(
     mappingFile,
     setMappingFile,
     selectedRow,
@@ -36,6 +36,16 @@ export const useAzureSqlMapping = () => {
 
   const handleRowSelect = (row: MappingRow | null) => {
     setSelectedRow(row);
+    if (!row) return;
+    
+    // Reviewer comments are not part of the mapping file load; fetch them when a row is opened
+    loadRowComments(row.id)
+      .then(comments => {
+        setSelectedRow(current => current && current.id === row.id
+          ? { ...current, comments: [...(row.comments || []), ...comments] }
+          : current);
+      })
+      .catch(error => console.error('Error loading comments:', error));
   };
 
   const handleStatusFilterClick = (status: MappingStatus | null) => {
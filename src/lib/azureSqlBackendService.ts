@@ -87,6 +87,19 @@ export class AzureSqlBackendService {
     }
   }
 
+  async getMappingRowComments(rowId: string, limit = 100): Promise<string[]> {
+    const response = await fetch(`${this.baseUrl}/api/mapping-rows/${rowId}/comments?limit=${limit}`);
+
+    if (!response.ok) {
+      const error = await response.text();
+      throw new Error(`Failed to load comments: ${error}`);
+    }
+
+    // The API pages newest first; the review panel lists them oldest first
+    const data = await response.json();
+    return data.comments.map((comment: { comment: string }) => comment.comment).reverse();
+  }
+
   async healthCheck(): Promise<boolean> {
     try {
       const response = await fetch(`${this.baseUrl}/health`);